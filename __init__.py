@@ -3,9 +3,11 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
 from config import Config
+from app.session_routing import RoutingSession
 
 # Ініціалізація розширень Flask
-db = SQLAlchemy()
+# (RoutingSession направляє читання репозиторіїв на репліку, якщо вона налаштована)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 bcrypt = Bcrypt()
 
@@ -16,6 +18,14 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # jsonify серіалізує легкі моделі читання (NoteView, UserView) напряму
+    from app.json_provider import ReadModelJSONProvider
+    app.json = ReadModelJSONProvider(app)
+    
+    # Профіль рушія SQLite: опції пулу потрібні до створення рушія
+    from app.database import configure_engine_options, configure_engine
+    configure_engine_options(app)
+    
     # Ініціалізація розширень з застосунком
     db.init_app(app)
     bcrypt.init_app(app)
@@ -36,15 +46,57 @@ def create_app(config_class=Config):
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(web_bp)
     
-    # Створення таблиць БД при першому запуску
+    # CLI для міграцій схеми (flask db upgrade)
+    from app.migrations import db_cli, migrate
+    app.cli.add_command(db_cli)
+    
+    # Метрики продуктивності (GET /api/metrics)
+    from app.metrics import init_metrics
+    # Журнал повільних запитів (GET /api/slow-queries)
+    from app.slow_queries import init_slow_query_log
+    
     with app.app_context():
-        db.create_all()
+        configure_engine(app)
+        init_metrics(app)
+        init_slow_query_log(app)
+        # Схему оновлює flask db upgrade; автоматично - лише з AUTO_MIGRATE
+        if app.config['AUTO_MIGRATE']:
+            migrate()
+    
+    # Репліку читають лише запити, що не змінюють дані; решта, включно з
+    # читанням перед записом (перевірка власника, унікальності), йде на основну БД
+    from app.session_routing import allow_replica
+    
+    @app.before_request
+    def route_reads_to_replica():
+        from flask import request
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            allow_replica()
+    
+    # Стиснення відповідей і стиснута статика
+    from app.compression import init_compression
+    init_compression(app)
+    
+    # Переповнений пул bcrypt - тимчасова недоступність, а не помилка сервера
+    from app.services.password_hasher import PasswordHasherBusy
+    
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(error):
+        from flask import request, jsonify
+        message = 'Сервер перевантажено, спробуйте пізніше'
+        if request.path.startswith('/api/'):
+            response = jsonify({'error': message})
+        else:
+            response = app.response_class(message, mimetype='text/plain')
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
     
     # Callback для завантаження користувача
     @login_manager.user_loader
     def load_user(user_id):
-        from app.repositories.user_repository import UserRepository
-        return UserRepository.find_by_id(int(user_id))
+        from app.services.user_service import UserService
+        return UserService.get_user_snapshot(int(user_id))
     
     return app
 
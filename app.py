@@ -1,16 +1,65 @@
-from flask import Flask, render_template, session, request, redirect, url_for
+from flask import Flask, Blueprint, render_template, session, request, redirect, url_for, flash, g, Response
 from models import init_db
 from routes.feedback import feedback_bp
 from routes.admin import admin_bp
 from routes.shop import shop_bp
 from routes.api import api_bp
+from cart_store import CartStore
+from orders import OrderQueue, OrderQueueFull
+from db_pool import ConnectionPool
+import atexit
 import bcrypt
+import json
+import os
+import re
+import threading
+import uuid
 
 app = Flask(__name__)
 app.secret_key = 'super_secret_key'  
 
 init_db()
 
+SHOP_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shop.db')
+
+# Кошики зберігаються на сервері, у сесії - лише cart_id
+cart_store = CartStore(SHOP_DB_PATH)
+
+# Замовлення пишуться у outbox shop.db, у таблиці orders їх переносить фоновий потік
+order_queue = OrderQueue(SHOP_DB_PATH)
+order_queue.start()
+atexit.register(order_queue.stop)
+
+# Користувачі user_bp - в окремій БД зі своєю схемою, не в shop.db кошиків і outbox
+USERS_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'users.db')
+USERS_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS users ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL UNIQUE, '
+    'email TEXT NOT NULL UNIQUE, password BLOB NOT NULL)',
+)
+
+# Обмежений пул з'єднань замість connect() / close() навколо кожного запиту
+db_pool = ConnectionPool(USERS_DB_PATH, schema=USERS_SCHEMA)
+atexit.register(db_pool.close_all)
+
+
+def get_db_connection():
+    """З'єднання поточного запиту з пулу (закривати не потрібно)"""
+    return db_pool.connection()
+
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Повернути з'єднання запиту в пул"""
+    db_pool.release()
+
+
+def get_cart_id():
+    """id кошика поточної сесії (створюється при першому зверненні)"""
+    if 'cart_id' not in session:
+        session['cart_id'] = uuid.uuid4().hex
+    return session['cart_id']
+
 
 
 app.register_blueprint(feedback_bp)
@@ -30,34 +79,62 @@ def home():
 def about():
     return render_template('about.html')
 
+# Каталог меню: menu.json читається один раз при запуску і перечитується,
+# лише коли файл змінився. Ціни - цілі числа (грн), у кожної позиції є id
+MENU_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'menu.json')
+catalog = None
+catalog_lock = threading.Lock()
+
+
+def load_catalog(mtime):
+    """Прочитати menu.json і побудувати індекси та JSON для /api/menu"""
+    with open(MENU_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+    menu = {}
+    by_id = {}
+    by_name = {}
+    for category in data['categories']:
+        for item in category['items']:
+            item['price_label'] = f"{item['price']} {data['currency']}"
+            by_id[item['id']] = item
+            by_name[item['name']] = item
+        menu[category['name']] = category['items']
+    return {'mtime': mtime, 'menu': menu, 'by_id': by_id, 'by_name': by_name,
+            'json': json.dumps(menu, ensure_ascii=False).encode('utf-8'),
+            'etag': f'menu-{mtime}'}
+
+
+def get_catalog():
+    """
+    Поточний каталог; при зміні menu.json новий каталог будується окремо й
+    підміняється цілком, тож запити не бачать наполовину оновлених індексів
+    """
+    global catalog
+    mtime = os.path.getmtime(MENU_PATH)
+    current = catalog
+    if current is None or current['mtime'] != mtime:
+        with catalog_lock:
+            current = catalog
+            if current is None or current['mtime'] != mtime:
+                current = catalog = load_catalog(mtime)
+    return current
+
+
 @app.route('/shop')
 def shop():
-    menu_data = {
-        "Піца": [
-            {"name": "Маргарита", "price": "120 грн", "ingredients": "Томатний соус, сир моцарелла, базилік", "image": "static/img/pizza_1.png"},
-            {"name": "Пеппероні", "price": "150 грн", "ingredients": "Томатний соус, сир моцарелла, пеппероні", "image": "static/img/pizza_2.png"},
-            {"name": "Чотири Сира", "price": "170 грн", "ingredients": "Томатний соус, сир моцарелла, пармезан, горгонзола, фета", "image": "static/img/pizza_3.png"},
-            {"name": "Гавайська", "price": "200 грн", "ingredients": "Томатний соус, сир моцарелла, ананас, шинка", "image": "static/img/pizza_4.png"},
-            {"name": "Карбонара", "price": "140 грн", "ingredients": "Томатний соус, сир моцарелла, ананас", "image": "static/img/pizza_5.png"},
-            {"name": "Сицилійська", "price": "140 грн", "ingredients": "Анчоуси, свіжі томати та сир пекорино", "image": "static/img/pizza_6.png"}
-        ],
-        "Напої безалкогольні": [
-            {"name": "Живчик", "price": "30 грн", "ingredients": "Газована вода, цукор, ароматизатори", "image": "static/img/drink_1.png"},
-            {"name": "Monster energy", "price": "60 грн", "ingredients": "Газована вода, кофеїн, цукор, ароматизатори", "image": "static/img/drink_2.png"},
-            {"name": "Red Bull", "price": "40 грн", "ingredients": "Газована вода, цукор, ароматизатори", "image": "static/img/drink_3.png"},
-            {"name": "Reign", "price": "55 грн", "ingredients": "Газована вода, цукор, ароматизатори", "image": "static/img/drink_4.png"},
-            {"name": "Coca Cola", "price": "45 грн", "ingredients": "Газована вода, цукор, ароматизатори", "image": "static/img/drink_5.png"},
-            {"name": "Fanta", "price": "45 грн", "ingredients": "Газована вода, цукор, ароматизатори", "image": "static/img/drink_6.png"}
-        ],
-        "Алкогольні напої": [
-            {"name": "Пиво", "price": "50 грн", "ingredients": "Солод, вода, хміль, дріжджі", "image": "static/img/alcodrink_1.jpg"}
-        ],
-        "Новинки": [
-            {"name": "Піца від бабусі Галі", "price": "200 грн", "ingredients": "Помідор, шинка, огірок, капуста, томатний соус", "image": "static/img/pizza_7.png"}
-        ]
-    }
-
-    return render_template('shop.html', menu=menu_data)
+    # Кешуються дані меню, а сторінка рендериться на кожен запит:
+    # у ній можуть бути дані сесії (flash-повідомлення, кошик, CSRF-токен)
+    menu = get_catalog()
+    return render_template('shop.html', menu=menu['menu'])
+
+@app.route('/api/menu')
+def api_menu():
+    menu = get_catalog()
+    if request.if_none_match.contains(menu['etag']):
+        return Response(status=304)
+    response = Response(menu['json'], mimetype='application/json')
+    response.set_etag(menu['etag'])
+    return response
 
 @app.route('/feedback')
 def feedback():
@@ -77,64 +154,62 @@ def admin():
 
 @app.route('/add_to_cart', methods=['POST'])
 def add_to_cart():
-    item_name = request.form.get('item_name') 
-    item_price = int(request.form.get('item_price').split()[0])  
-    item_image = request.form.get('item_image')  
-
-    
-    if 'cart' not in session:
-        session['cart'] = {}
-
-    cart = session['cart']
-
-    
-    if item_name in cart:
-        cart[item_name]['quantity'] += 1
+    # Назва й ціна беруться з каталогу за id, а не з форми
+    menu = get_catalog()
+    item_id = request.form.get('item_id', type=int)
+    if item_id is not None:
+        item = menu['by_id'].get(item_id)
     else:
-        
-        cart[item_name] = {
-            'name': item_name,
-            'price': item_price,
-            'quantity': 1,
-            'image': item_image
-        }
+        item = menu['by_name'].get(request.form.get('item_name'))
+    if item is None:
+        return redirect(url_for('shop'))
 
-    session['cart'] = cart  
-    session.modified = True  
+    cart_store.add(get_cart_id(), item)
 
     return redirect(url_for('shop'))
 
+@app.route('/remove_from_cart', methods=['POST'])
+def remove_from_cart():
+    item_id = request.form.get('item_id', type=int)
+    if item_id is not None:
+        cart_store.remove(get_cart_id(), item_id)
+    return redirect(url_for('cart'))
+
 @app.route('/cart', methods=['GET'])
 def cart():
-    cart = session.get('cart', {})  
-    total = sum(item['price'] * item['quantity'] for item in cart.values()) 
-    return render_template('cart.html', cart=cart, total=total)
+    # Сума та кількість підтримуються кошиком при кожній зміні
+    cart = cart_store.get(get_cart_id())
+    return render_template('cart.html', cart=cart.items, total=cart.total)
 
 @app.route('/checkout', methods=['POST'])
 def checkout():
     email = request.form.get('email')  
     address = request.form.get('address')  
-    cart = session.get('cart', {})  
+    cart_id = get_cart_id()
+    cart = cart_store.get(cart_id)
 
-    if not cart:
+    if not cart.items:
         return redirect(url_for('cart'))  
 
-   
+    # Замовлення лише ставиться в чергу; запис у orders - у фоновому потоці
+    try:
+        order_id = order_queue.enqueue(email, address, cart)
+    except OrderQueueFull:
+        return 'Забагато замовлень, спробуйте пізніше', 503, {'Retry-After': '5'}
 
-    
-    session.pop('cart', None)
+    cart_store.clear(cart_id)
 
-    return render_template('order_success.html', email=email, address=address)
+    return render_template('order_success.html', email=email, address=address, order_id=order_id)
 
 @app.route('/clear_cart', methods=['POST'])
 def clear_cart():
-    session.pop('cart', None)  
+    cart_store.clear(get_cart_id())
     return redirect(url_for('cart'))
 
 if __name__ == '__main__':
     app.run(debug=True)
 
-user_bp = Blueprint('user', name)
+user_bp = Blueprint('user', __name__)
 
 def validate_registration_data(username, email, password, confirm_password):
     if not username or not email or not password or not confirm_password:
@@ -157,17 +232,15 @@ def get_current_user():
     """
     Функція для отримання поточного користувача з сесії.
     Повертає дані користувача або None, якщо користувач не авторизований.
+    Результат запам'ятовується в g до кінця запиту - БД читається один раз.
     """
-    user_id = session.get('user_id')
-    if user_id:
-        conn = get_db_connection()
-        try:
-            cur = conn.cursor()
-            user = cur.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
-            return user
-        finally:
-            conn.close()  # Закрити з'єднання після завершення
-    return None
+    if 'current_user' not in g:
+        g.current_user = None
+        user_id = session.get('user_id')
+        if user_id:
+            conn = get_db_connection()
+            g.current_user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    return g.current_user
 
 
 @user_bp.route('/register', methods=['GET', 'POST'])
@@ -185,19 +258,16 @@ def register():
 
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
 
-        conn = get_db_connection()  # Отримати нове з'єднання
-        try:
-            existing_user = conn.execute('SELECT * FROM users WHERE username = ? OR email = ?', (username, email)).fetchone()
-            if existing_user:
-                print("Користувач із таким ім'ям або email вже існує.") #перевірка на існуючий ім'я чи email
-                return redirect(url_for('user.register'))
+        conn = get_db_connection()  # З'єднання потоку з пулу
+        existing_user = conn.execute('SELECT * FROM users WHERE username = ? OR email = ?', (username, email)).fetchone()
+        if existing_user:
+            print("Користувач із таким ім'ям або email вже існує.") #перевірка на існуючий ім'я чи email
+            return redirect(url_for('user.register'))
 
-            conn.execute('INSERT INTO users (username, email, password) VALUES (?, ?, ?)', 
-                         (username, email, hashed_password))
-            conn.commit()
-            print('записанна в базу даних')
-        finally:
-            conn.close()  # Закрити з'єднання
+        conn.execute('INSERT INTO users (username, email, password) VALUES (?, ?, ?)', 
+                     (username, email, hashed_password))
+        conn.commit()
+        print('записанна в базу даних')
 
         print("Реєстрація успішна! Ви можете увійти в систему.")
         return redirect(url_for('user.login'))
@@ -211,23 +281,22 @@ def login():
         password = request.form['password']
 
         conn = get_db_connection()
-        try:
-            user = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
-            if user:
-                stored_password = user['password'].encode('utf-8') if isinstance(user['password'], str) else user['password']
-                if bcrypt.checkpw(password.encode('utf-8'), stored_password):
-                    # Успішний вхід
-                    session['user_id'] = user['id']
-                    flash("Ви успішно увійшли.")
-                    return redirect(url_for('home'))
-            flash("Невірний email або пароль.")
-        finally:
-            conn.close()  # Закриваємо з'єднання
+        user = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
+        if user:
+            stored_password = user['password'].encode('utf-8') if isinstance(user['password'], str) else user['password']
+            if bcrypt.checkpw(password.encode('utf-8'), stored_password):
+                # Успішний вхід
+                session['user_id'] = user['id']
+                g.pop('current_user', None)
+                flash("Ви успішно увійшли.")
+                return redirect(url_for('home'))
+        flash("Невірний email або пароль.")
     return render_template('login.html')
 
 @user_bp.route('/logout')
 def logout():
     session.pop('user_id', None)  # Видаляємо user_id з сесії
+    g.pop('current_user', None)
     print("Ви вийшли з системи.")
     return redirect(url_for('home'))
 #видає none якщо не найде юзера а так видає його id 
@@ -0,0 +1,8 @@
+"""
+Бенчмарки продуктивності
+
+Запуск з батьківської директорії пакета app, наприклад:
+    python -m app.benchmarks.login_throughput --pool-sizes 1 2 4 8
+    python -m app.benchmarks.sqlite_concurrency --writers 4 --readers 8
+    python -m app.benchmarks.microbench --baseline baseline.json
+"""
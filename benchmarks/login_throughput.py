@@ -0,0 +1,83 @@
+"""
+Пропускна здатність логіну залежно від розміру пулу bcrypt
+
+Для кожного розміру пулу створюється окремий застосунок на тимчасовій
+SQLite-базі; concurrency потоків-«клієнтів» виконують UserService.authenticate,
+як це роблять потоки веб-сервера. Результат - JSON по рядку на розмір пулу.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from app import create_app, db
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+from app.services.user_service import UserService
+
+
+def make_config(database_path: str, pool_size: int, rounds: int):
+    """Конфігурація бенчмарку поверх основної"""
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + database_path
+        BCRYPT_LOG_ROUNDS = rounds
+        BCRYPT_POOL_SIZE = pool_size
+        USER_CACHE_ENABLED = False
+        NOTES_CACHE_ENABLED = False
+        AUTO_MIGRATE = True
+    return BenchmarkConfig
+
+
+def run(pool_size: int, users: int, logins: int, concurrency: int, rounds: int) -> dict:
+    """Виміряти логіни за секунду для одного розміру пулу"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(os.path.join(tmp, 'bench.db'), pool_size, rounds))
+        
+        with app.app_context():
+            for i in range(users):
+                UserService.create_user(f'bench{i}', f'bench{i}@example.com', 'password123')
+        
+        def login(i):
+            with app.app_context():
+                try:
+                    return UserService.authenticate(f'bench{i % users}', 'password123') is not None
+                except PasswordHasherBusy:
+                    return None
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            results = list(clients.map(login, range(logins)))
+        elapsed = time.perf_counter() - started
+        
+        with app.app_context():
+            PasswordHasher.current().shutdown()
+            db.engine.dispose()
+    
+    return {
+        'pool_size': pool_size,
+        'concurrency': concurrency,
+        'rounds': rounds,
+        'logins': logins,
+        'succeeded': sum(1 for r in results if r),
+        'rejected': sum(1 for r in results if r is None),
+        'seconds': round(elapsed, 3),
+        'logins_per_sec': round(logins / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+    
+    for pool_size in args.pool_sizes:
+        print(json.dumps(run(pool_size, args.users, args.logins, args.concurrency, args.rounds)))
+
+
+if __name__ == '__main__':
+    main()
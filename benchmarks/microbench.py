@@ -0,0 +1,204 @@
+"""
+Мікробенчмарки гарячих операцій репозиторіїв, сервісів і серіалізації
+
+Застосунок створюється через create_app на SQLite у пам'яті або в тимчасовому
+файлі й заповнюється users * notes_per_user нотатками. Кожна операція
+виконується repeat разів, кожен раз у власному контексті застосунку (як окремий
+запит, з порожньою identity map). Кеші списків і користувачів вимкнено, щоб
+вимірювати самі репозиторії / сервіси.
+
+Результат - JSON зі статистикою часу по операціях. З --baseline результат
+порівнюється зі збереженим: операція, медіана якої гірша за базову більше ніж
+на --threshold, вважається регресією, і процес завершується з кодом 1.
+
+    python -m app.benchmarks.microbench --save-baseline baseline.json
+    python -m app.benchmarks.microbench --baseline baseline.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from flask import current_app
+from config import Config
+from app import create_app, db
+from app.models.note import Note
+from app.repositories.note_repository import NoteRepository
+from app.services.note_service import NoteService
+from app.services.password_hasher import PasswordHasher
+from app.services.seed_service import SeedService
+from app.services.user_service import UserService
+
+PASSWORD = 'password123'
+
+
+def make_config(database_uri: str, rounds: int):
+    """Конфігурація бенчмарку поверх основної"""
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        BCRYPT_LOG_ROUNDS = rounds
+        USER_CACHE_ENABLED = False
+        NOTES_CACHE_ENABLED = False
+        AUTO_MIGRATE = True
+    return BenchmarkConfig
+
+
+def timed(app, repeat: int, operation, setup=None) -> dict:
+    """
+    Виміряти операцію repeat разів; setup (поза виміром) готує аргумент
+    для кожного виконання в тому ж контексті застосунку
+    """
+    samples = []
+    for _ in range(repeat):
+        with app.app_context():
+            argument = setup() if setup else None
+            started = time.perf_counter()
+            operation(argument)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'iterations': repeat,
+        'min_ms': round(samples[0], 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'mean_ms': round(statistics.fmean(samples), 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+    }
+
+
+def run(database: str, users: int, notes_per_user: int, repeat: int,
+        serialize_notes: int, rounds: int, seed_value: int) -> dict:
+    """Заповнити БД і виміряти всі операції"""
+    random.seed(seed_value)
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = 'sqlite://' if database == 'memory' else 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        app = create_app(make_config(uri, rounds))
+        
+        with app.app_context():
+            user_ids = SeedService.seed(users, notes_per_user, seed=seed_value, password=PASSWORD,
+                                        username_prefix='bench')
+            note_ids = db.session.scalars(db.select(Note.id)).all()
+        
+        def random_note():
+            return NoteRepository.find_by_id(random.choice(note_ids))
+        
+        def fresh_note():
+            return NoteService.create_note('Тимчасова', 'Буде видалена', user_ids[0])['note']
+        
+        def serialized_notes():
+            return NoteRepository.find_page(serialize_notes)
+        
+        def orm_page():
+            # Сторінка нотаток ORM-об'єктами, як до моделей читання NoteView
+            query = NoteRepository._with_author(Note.query)
+            notes = query.order_by(Note.created_at.desc(), Note.id.desc()).limit(serialize_notes).all()
+            return current_app.json.dumps([note.to_dict() for note in notes])
+        
+        operations = {
+            'list_by_user': (lambda _: NoteService.get_notes_by_user(random.choice(user_ids)), None),
+            'list_all': (lambda _: NoteService.get_all_notes(), None),
+            'get_by_id': (lambda _: NoteService.get_note_by_id(random.choice(note_ids)), None),
+            'create': (lambda _: NoteService.create_note('Нова нотатка', 'Вміст',
+                                                         random.choice(user_ids)), None),
+            'update': (lambda note: NoteService.update_note(note, content=f'Оновлено {time.time()}'),
+                       random_note),
+            'delete': (lambda note: NoteService.delete_note(note), fresh_note),
+            'authenticate': (lambda _: UserService.authenticate(
+                f'bench{random.randrange(users)}', PASSWORD), None),
+            'serialize_json': (lambda notes: current_app.json.dumps(notes), serialized_notes),
+            # Список нотаток від запиту до JSON: ORM + to_dict() проти NoteView
+            'list_page_orm': (lambda _: orm_page(), None),
+            'list_page_views': (lambda _: current_app.json.dumps(
+                NoteRepository.find_page(serialize_notes)), None),
+        }
+        results = {name: timed(app, repeat, operation, setup)
+                   for name, (operation, setup) in operations.items()}
+        for name in ('list_page_orm', 'list_page_views'):
+            results[name]['per_note_us'] = round(
+                results[name]['median_ms'] * 1000 / serialize_notes, 3)
+        
+        with app.app_context():
+            PasswordHasher.current().shutdown()
+            db.engine.dispose()
+    
+    return {
+        'meta': {
+            'database': database,
+            'users': users,
+            'notes_per_user': notes_per_user,
+            'serialize_notes': serialize_notes,
+            'rounds': rounds,
+            'seed': seed_value,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Порівняти медіани з базовими; повертає рядки звіту з позначкою регресій"""
+    report = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            report.append((False, f'  {name}: немає в базовому результаті'))
+            continue
+        ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else 1.0
+        regression = ratio > 1 + threshold
+        mark = '✗' if regression else '✓'
+        report.append((regression, f"{mark} {name}: {result['median_ms']:.3f} мс "
+                                   f"(база {base['median_ms']:.3f} мс, x{ratio:.2f})"))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=['memory', 'file'], default='memory')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--notes-per-user', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--serialize-notes', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=4, help='Вартість bcrypt для authenticate')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Файл для JSON-результату (за замовчуванням stdout)')
+    parser.add_argument('--save-baseline', help='Зберегти результат як базовий у цей файл')
+    parser.add_argument('--baseline', help='Базовий результат для порівняння')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Допустиме погіршення медіани (0.2 = 20%%)')
+    args = parser.parse_args()
+    
+    result = run(args.database, args.users, args.notes_per_user, args.repeat,
+                 args.serialize_notes, args.rounds, args.seed)
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['meta'] != result['meta']:
+            print('! Параметри базового результату відрізняються від поточних', file=sys.stderr)
+        report = compare(result, baseline, args.threshold)
+        for _, line in report:
+            print(line, file=sys.stderr)
+        if any(regression for regression, _ in report):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,142 @@
+"""
+Пропускна здатність оформлення замовлень магазину
+
+Порівнюються два способи запису замовлення з threads потоків:
+  direct - замовлення й рядки пишуться одразу в orders / order_lines
+           (окрема транзакція на кожен checkout);
+  outbox - checkout лише дописує замовлення в order_outbox, у orders
+           їх порціями переносить фоновий потік OrderQueue.
+Для кожного способу - латентність checkout (медіана / p95), замовлень за
+секунду з боку клієнтів і, для outbox, час до повного спорожнення черги.
+Результат - JSON по рядку на спосіб.
+
+    python -m app.benchmarks.order_throughput --orders 5000 --threads 8
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from app.cart_store import Cart
+from app.orders import OrderQueue, OrderQueueFull, SCHEMA
+
+
+def make_cart(lines: int) -> Cart:
+    """Кошик з lines позицій"""
+    cart = Cart()
+    for item_id in range(1, lines + 1):
+        cart.items[item_id] = {'id': item_id, 'name': f'Товар {item_id}', 'price': 100,
+                               'quantity': 2, 'image': None}
+        cart.total += 200
+        cart.count += 2
+    return cart
+
+
+def direct_checkout(path: str):
+    """Checkout без черги: замовлення пишеться синхронно з власного з'єднання потоку"""
+    local = threading.local()
+    
+    def checkout(email, address, cart):
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            conn = local.conn = sqlite3.connect(path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        with conn:
+            order_id = conn.execute(
+                'INSERT INTO orders (email, address, total, created_at) '
+                'VALUES (?, ?, ?, CURRENT_TIMESTAMP)', (email, address, cart.total)
+            ).lastrowid
+            conn.executemany(
+                'INSERT INTO order_lines (order_id, item_id, name, price, quantity) VALUES (?, ?, ?, ?, ?)',
+                [(order_id, line['id'], line['name'], line['price'], line['quantity'])
+                 for line in cart.items.values()]
+            )
+        return order_id
+    return checkout
+
+
+def run(mode: str, orders: int, threads: int, lines: int, batch_size: int) -> dict:
+    """Оформити orders замовлень з threads потоків і виміряти латентність"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'shop.db')
+        queue = OrderQueue(path, batch_size=batch_size, max_pending=orders)
+        if mode == 'outbox':
+            queue.start()
+            checkout = queue.enqueue
+        else:
+            checkout = direct_checkout(path)
+        
+        cart = make_cart(lines)
+        samples = []
+        rejected = [0]
+        lock = threading.Lock()
+        per_thread = orders // threads
+        
+        def client():
+            local = []
+            for i in range(per_thread):
+                started = time.perf_counter()
+                try:
+                    checkout(f'client{i}@example.com', 'вул. Тестова, 1', cart)
+                except OrderQueueFull:
+                    with lock:
+                        rejected[0] += 1
+                    continue
+                local.append((time.perf_counter() - started) * 1000)
+            with lock:
+                samples.extend(local)
+        
+        started = time.perf_counter()
+        workers = [threading.Thread(target=client) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        accepted = time.perf_counter() - started
+        
+        if mode == 'outbox':
+            while queue.pending:
+                time.sleep(0.005)
+            queue.stop()
+        drained = time.perf_counter() - started
+        
+        with sqlite3.connect(path) as conn:
+            stored = conn.execute('SELECT count(*) FROM orders').fetchone()[0]
+            stored_lines = conn.execute('SELECT count(*) FROM order_lines').fetchone()[0]
+    
+    samples.sort()
+    return {
+        'mode': mode,
+        'orders': len(samples),
+        'rejected': rejected[0],
+        'threads': threads,
+        'checkout_median_ms': round(statistics.median(samples), 3),
+        'checkout_p95_ms': round(samples[int(len(samples) * 0.95)], 3),
+        'accepted_per_second': round(len(samples) / accepted, 1),
+        'stored_per_second': round(stored / drained, 1),
+        'stored_orders': stored,
+        'stored_lines': stored_lines,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', default=['direct', 'outbox'], choices=['direct', 'outbox'])
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--lines', type=int, default=3, help='Позицій у кошику')
+    parser.add_argument('--batch-size', type=int, default=200)
+    args = parser.parse_args()
+    
+    for mode in args.modes:
+        print(json.dumps(run(mode, args.orders, args.threads, args.lines, args.batch_size)))
+
+
+if __name__ == '__main__':
+    main()
+
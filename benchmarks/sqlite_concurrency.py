@@ -0,0 +1,113 @@
+"""
+Пропускна здатність SQLite при одночасних записах і читаннях
+
+Для кожного профілю рушія (Config.SQLITE_PROFILE) створюється окремий
+застосунок на тимчасовій SQLite-базі. writers потоків створюють нотатки
+через NoteService.create_note, readers потоків читають сторінки списку
+нотаток; кожна операція виконується у власному контексті застосунку, як
+окремий запит. Результат - JSON по рядку на профіль.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from config import Config
+from app import create_app, db
+from app.repositories.note_repository import NoteRepository, db_timestamp
+from app.services.note_service import NoteService
+from app.services.user_service import UserService
+from datetime import datetime
+
+
+def make_config(database_path: str, profile: str):
+    """Конфігурація бенчмарку поверх основної"""
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + database_path
+        SQLITE_PROFILE = profile
+        BCRYPT_LOG_ROUNDS = 4
+        USER_CACHE_ENABLED = False
+        NOTES_CACHE_ENABLED = False
+        AUTO_MIGRATE = True
+    return BenchmarkConfig
+
+
+def run(profile: str, writers: int, readers: int, duration: float, seed_notes: int) -> dict:
+    """Виміряти записи та читання за секунду для одного профілю"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(os.path.join(tmp, 'bench.db'), profile))
+        
+        with app.app_context():
+            user_id = UserService.create_user('bench', 'bench@example.com', 'password123')['user'].id
+            now = db_timestamp(datetime.utcnow().replace(microsecond=0))
+            NoteRepository.bulk_insert([
+                {'title': f'seed {i}', 'content': 'x' * 200, 'user_id': user_id,
+                 'created_at': now, 'updated_at': now}
+                for i in range(seed_notes)
+            ])
+        
+        counters = {'writes': 0, 'reads': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+        
+        def worker(kind: str):
+            done = errors = 0
+            while time.perf_counter() < deadline:
+                with app.app_context():
+                    try:
+                        if kind == 'writes':
+                            NoteService.create_note('bench', 'x' * 200, user_id)
+                        else:
+                            NoteService.get_notes_page(50)
+                        done += 1
+                    except OperationalError:
+                        db.session.rollback()
+                        errors += 1
+            with lock:
+                counters[kind] += done
+                counters['errors'] += errors
+        
+        threads = [threading.Thread(target=worker, args=('writes',)) for _ in range(writers)] + \
+            [threading.Thread(target=worker, args=('reads',)) for _ in range(readers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        
+        with app.app_context():
+            db.engine.dispose()
+    
+    return {
+        'profile': profile,
+        'writers': writers,
+        'readers': readers,
+        'seconds': round(elapsed, 3),
+        'writes': counters['writes'],
+        'reads': counters['reads'],
+        'errors': counters['errors'],
+        'writes_per_sec': round(counters['writes'] / elapsed, 1),
+        'reads_per_sec': round(counters['reads'] / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profiles', nargs='+', default=['default', 'production'],
+                        choices=['default', 'production'])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--seed-notes', type=int, default=10000)
+    args = parser.parse_args()
+    
+    for profile in args.profiles:
+        print(json.dumps(run(profile, args.writers, args.readers, args.duration, args.seed_notes)))
+
+
+if __name__ == '__main__':
+    main()
+
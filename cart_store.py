@@ -0,0 +1,182 @@
+"""
+Серверний кошик магазину (app.py)
+
+У cookie-сесії лишається тільки cart_id; вміст кошиків живе в пам'яті
+процесу з записом у SQLite (таблиця cart_items), тож розмір cookie і
+вартість її підпису не залежать від кількості позицій. Кожна операція
+змінює одну позицію й одразу оновлює суму та кількість кошика - O(1),
+без перерахунку всіх позицій на кожен запит.
+
+Кошики, які не змінювались довше за ttl, вважаються покинутими й
+видаляються (expire, не частіше ніж раз на cleanup_interval секунд).
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class Cart:
+    """Кошик: позиції за id товару та поточні підсумки"""
+    
+    __slots__ = ('items', 'total', 'count')
+    
+    def __init__(self):
+        self.items = {}
+        self.total = 0
+        self.count = 0
+    
+    def copy(self):
+        """Незалежна копія для читання поза блокуванням сховища"""
+        cart = Cart()
+        cart.items = {item_id: dict(line) for item_id, line in self.items.items()}
+        cart.total = self.total
+        cart.count = self.count
+        return cart
+
+
+class CartStore:
+    """
+    Кошики за cart_id: LRU-кеш у пам'яті поверх SQLite
+    Кошик, витіснений з пам'яті, підвантажується з БД при наступному зверненні
+    Назовні віддаються лише копії кошиків (Cart.copy)
+    """
+    
+    def __init__(self, path, max_carts=10000, ttl=7 * 24 * 3600, cleanup_interval=3600):
+        self.max_carts = max_carts
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self._carts = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cart_items ('
+            'cart_id TEXT NOT NULL, item_id INTEGER NOT NULL, name TEXT NOT NULL, '
+            'price INTEGER NOT NULL, quantity INTEGER NOT NULL, image TEXT, '
+            'PRIMARY KEY (cart_id, item_id)) WITHOUT ROWID'
+        )
+        # Час останньої зміни кошика (unix-секунди) для видалення покинутих
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS carts ('
+            'cart_id TEXT NOT NULL PRIMARY KEY, updated_at INTEGER NOT NULL) WITHOUT ROWID'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_carts_updated_at ON carts (updated_at)')
+        # Кошики, збережені до появи carts, отримують поточний час
+        self._conn.execute(
+            'INSERT OR IGNORE INTO carts (cart_id, updated_at) '
+            'SELECT DISTINCT cart_id, ? FROM cart_items', (int(time.time()),)
+        )
+        self._conn.commit()
+        self._next_cleanup = time.time() + cleanup_interval
+    
+    def get(self, cart_id):
+        """Копія кошика за id (порожня, якщо його ще немає)"""
+        with self._lock:
+            return self._get(cart_id).copy()
+    
+    def add(self, cart_id, item, quantity=1):
+        """Додати quantity одиниць товару з каталогу (id, name, price, image)"""
+        if time.time() >= self._next_cleanup:
+            self.expire()
+        with self._lock:
+            cart = self._get(cart_id)
+            line = cart.items.get(item['id'])
+            if line is None:
+                line = cart.items[item['id']] = {
+                    'id': item['id'],
+                    'name': item['name'],
+                    'price': item['price'],
+                    'quantity': 0,
+                    'image': item['image']
+                }
+            line['quantity'] += quantity
+            cart.total += line['price'] * quantity
+            cart.count += quantity
+            self._conn.execute(
+                'INSERT INTO cart_items (cart_id, item_id, name, price, quantity, image) '
+                'VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (cart_id, item_id) DO UPDATE SET quantity = excluded.quantity',
+                (cart_id, line['id'], line['name'], line['price'], line['quantity'], line['image'])
+            )
+            self._touch(cart_id)
+            self._conn.commit()
+            return cart.copy()
+    
+    def remove(self, cart_id, item_id, quantity=1):
+        """Прибрати quantity одиниць товару; позиція зникає, коли їх не лишилось"""
+        with self._lock:
+            cart = self._get(cart_id)
+            line = cart.items.get(item_id)
+            if line is None:
+                return cart.copy()
+            quantity = min(quantity, line['quantity'])
+            line['quantity'] -= quantity
+            cart.total -= line['price'] * quantity
+            cart.count -= quantity
+            if line['quantity']:
+                self._conn.execute(
+                    'UPDATE cart_items SET quantity = ? WHERE cart_id = ? AND item_id = ?',
+                    (line['quantity'], cart_id, item_id)
+                )
+            else:
+                del cart.items[item_id]
+                self._conn.execute('DELETE FROM cart_items WHERE cart_id = ? AND item_id = ?',
+                                   (cart_id, item_id))
+            self._touch(cart_id)
+            self._conn.commit()
+            return cart.copy()
+    
+    def clear(self, cart_id):
+        """Очистити кошик"""
+        with self._lock:
+            self._carts.pop(cart_id, None)
+            self._conn.execute('DELETE FROM cart_items WHERE cart_id = ?', (cart_id,))
+            self._conn.execute('DELETE FROM carts WHERE cart_id = ?', (cart_id,))
+            self._conn.commit()
+    
+    def expire(self):
+        """Видалити кошики, що не змінювались довше за ttl; повертає їх кількість"""
+        cutoff = int(time.time()) - self.ttl
+        with self._lock:
+            self._next_cleanup = time.time() + self.cleanup_interval
+            expired = [(cart_id,) for cart_id, in self._conn.execute(
+                'SELECT cart_id FROM carts WHERE updated_at < ?', (cutoff,))]
+            for cart_id, in expired:
+                self._carts.pop(cart_id, None)
+            self._conn.executemany('DELETE FROM cart_items WHERE cart_id = ?', expired)
+            self._conn.executemany('DELETE FROM carts WHERE cart_id = ?', expired)
+            self._conn.commit()
+            return len(expired)
+    
+    def _touch(self, cart_id):
+        """Оновити час останньої зміни кошика (викликається під блокуванням)"""
+        self._conn.execute(
+            'INSERT INTO carts (cart_id, updated_at) VALUES (?, ?) '
+            'ON CONFLICT (cart_id) DO UPDATE SET updated_at = excluded.updated_at',
+            (cart_id, int(time.time()))
+        )
+    
+    def _get(self, cart_id):
+        cart = self._carts.get(cart_id)
+        if cart is not None:
+            self._carts.move_to_end(cart_id)
+            return cart
+        
+        cart = Cart()
+        rows = self._conn.execute(
+            'SELECT item_id, name, price, quantity, image FROM cart_items WHERE cart_id = ?',
+            (cart_id,)
+        )
+        for item_id, name, price, quantity, image in rows:
+            cart.items[item_id] = {'id': item_id, 'name': name, 'price': price,
+                                   'quantity': quantity, 'image': image}
+            cart.total += price * quantity
+            cart.count += quantity
+        
+        self._carts[cart_id] = cart
+        if len(self._carts) > self.max_carts:
+            self._carts.popitem(last=False)
+        return cart
+
@@ -0,0 +1,161 @@
+"""
+Стиснення відповідей (gzip / deflate)
+
+init_compression(app) додає after_request-хук: текстові відповіді (HTML, JSON,
+CSS, CSV, NDJSON) стискаються кодуванням, яке клієнт приймає в Accept-Encoding,
+якщо вони не менші за COMPRESS_MIN_SIZE байтів. Потокові відповіді (експорт)
+стискаються інкрементально, порція за порцією, без буфера всього тіла.
+
+Статичні файли (static/*.css тощо) стискаються один раз при запуску у
+сусідні *.gz-файли з максимальним рівнем і віддаються клієнтам, що приймають gzip.
+"""
+import mimetypes
+import os
+import zlib
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+from typing import Iterable, Iterator, Optional
+
+# wbits zlib для кожного кодування: 31 - gzip-контейнер, 15 - zlib (HTTP deflate)
+ENCODINGS = {'gzip': 31, 'deflate': 15}
+
+# Розширення статичних файлів, для яких будуються стиснуті копії
+PRECOMPRESSED_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.json')
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Кодування з Accept-Encoding поточного запиту з урахуванням q (None - без стиснення)"""
+    return request.accept_encodings.best_match(tuple(ENCODINGS))
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: int) -> Iterator[bytes]:
+    """
+    Стиснути потік порцій інкрементально
+    Після кожної порції - Z_SYNC_FLUSH, щоб клієнт міг розпаковувати її
+    одразу, не чекаючи кінця відповіді
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response, encoding: str, level: int, min_size: int):
+    """Стиснути відповідь на місці (звичайну - цілком, потокову - інкрементально)"""
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+        response.set_data(compressor.compress(data) + compressor.flush())
+    
+    response.headers['Content-Encoding'] = encoding
+    weaken_etag(response)
+    return response
+
+
+def weaken_etag(response) -> None:
+    """
+    Стиснуте представлення не побайтово тотожне нестиснутому, тому сильний
+    ETag стає слабким (If-None-Match порівнює слабко, див. not_modified)
+    """
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def precompress_static(static_folder: str, level: int = 9) -> int:
+    """
+    Побудувати *.gz-копії статичних файлів, яких немає або які старіші за
+    оригінал; повертає кількість перебудованих файлів
+    """
+    built = 0
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if not name.endswith(PRECOMPRESSED_EXTENSIONS):
+                continue
+            source = os.path.join(root, name)
+            target = source + '.gz'
+            if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                continue
+            with open(source, 'rb') as f:
+                data = f.read()
+            compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODINGS['gzip'])
+            # Запис через тимчасовий файл: паралельний запит не побачить обрізаний .gz
+            partial = target + '.tmp'
+            with open(partial, 'wb') as f:
+                f.write(compressor.compress(data) + compressor.flush())
+            os.replace(partial, target)
+            built += 1
+    return built
+
+
+def init_compression(app) -> None:
+    """Зареєструвати стиснення відповідей і віддачу стиснутої статики"""
+    config = app.config
+    if not config['COMPRESS_ENABLED']:
+        return
+    
+    level = config['COMPRESS_LEVEL']
+    min_size = config['COMPRESS_MIN_SIZE']
+    compressible = set(config['COMPRESS_MIMETYPES'])
+    
+    @app.after_request
+    def compress(response):
+        if response.mimetype not in compressible or response.direct_passthrough:
+            return response
+        response.vary.add('Accept-Encoding')
+        if 'Content-Encoding' in response.headers:
+            return response
+        
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+        if response.status_code == 304:
+            # 304 несе той самий ETag, що й стиснута відповідь 200
+            weaken_etag(response)
+            return response
+        if response.status_code < 200 or response.status_code == 204:
+            return response
+        return compress_response(response, encoding, level, min_size)
+    
+    if not config['COMPRESS_STATIC'] or not app.has_static_folder:
+        return
+    
+    try:
+        built = precompress_static(app.static_folder)
+    except OSError as error:
+        # Каталог статики лише для читання - віддаємо файли без стиснення
+        app.logger.warning('Не вдалося стиснути статичні файли: %s', error)
+        return
+    if built:
+        app.logger.info('Стиснуто статичних файлів: %d', built)
+    
+    serve_static = app.view_functions['static']
+    
+    def static(filename):
+        """Статичний файл: стиснута копія *.gz, якщо клієнт приймає gzip"""
+        compressed = safe_join(app.static_folder, filename + '.gz')
+        if compressed and request.accept_encodings['gzip'] and os.path.isfile(compressed):
+            response = send_from_directory(app.static_folder, filename + '.gz',
+                                           mimetype=mimetypes.guess_type(filename)[0])
+            response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+            return response
+        response = serve_static(filename=filename)
+        if filename.endswith(PRECOMPRESSED_EXTENSIONS):
+            response.vary.add('Accept-Encoding')
+        return response
+    
+    app.view_functions['static'] = static
+
+
@@ -18,10 +18,100 @@ class Config:
     # Вимкнення відстеження модифікацій (для економії ресурсів)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Read-репліка для методів репозиторіїв find_* / count_* / exists_*
+    # (див. app/session_routing.py); None - усі запити йдуть на основну БД.
+    # Наприклад, друге з'єднання з тією ж БД лише для читання:
+    #   'sqlite:///file:/path/app.db?mode=ro&uri=true'
+    SQLALCHEMY_REPLICA_URI = os.environ.get('DATABASE_REPLICA_URL')
+    
+    # Створювати таблиці й застосовувати міграції в create_app (розробка, тести)
+    # Вимкнено: схему оновлює flask db upgrade / flask init-db перед запуском
+    # воркерів, інакше кожен процес (і кожна CLI-команда) мігрує сам, паралельні
+    # воркери змагаються за міграції, а flask db downgrade скасовується першим же стартом
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', '0') == '1'
+    
+    # Профіль рушія SQLite (див. app/database.py): 'production' - WAL, прагми
+    # та пул з'єднань нижче; 'default' - налаштування SQLite за замовчуванням
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'production')
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',  # читачі не блокують запис і навпаки
+        'synchronous': 'NORMAL',  # у WAL безпечно для цілісності, fsync лише на checkpoint
+        'cache_size': -65536,  # КіБ на з'єднання (64 МБ)
+        'mmap_size': 268435456,  # 256 МБ
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,  # мс очікування блокування запису
+    }
+    SQLITE_POOL_SIZE = 10
+    SQLITE_MAX_OVERFLOW = 20
+    SQLITE_POOL_TIMEOUT = 30  # секунд очікування вільного з'єднання
+    # Повтори операцій запису після вичерпання busy_timeout
+    SQLITE_BUSY_RETRIES = 3
+    SQLITE_BUSY_BACKOFF = 0.05  # секунд, подвоюється з кожною спробою
+    
     # Налаштування сесій
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
+    
+    # Пагінація списку нотаток (GET /api/notes)
+    NOTES_PAGE_SIZE = 50
+    NOTES_PAGE_SIZE_MAX = 500
+    
+    # Таблиці адмін-панелі: розмір сторінки та довжина фрагмента вмісту нотатки
+    ADMIN_PAGE_SIZE = 25
+    ADMIN_PAGE_SIZE_MAX = 200
+    ADMIN_NOTE_PREVIEW_LENGTH = 120
+    
+    # Потоковий експорт / пакетний імпорт нотаток
+    NOTES_EXPORT_BATCH_SIZE = 1000
+    NOTES_IMPORT_BATCH_SIZE = 5000
+    
+    # Масовий імпорт користувачів (POST /api/users/import): рядків на порцію
+    # та процесів для bcrypt (None - усі ядра, 0 - без пулу процесів,
+    # хешування в потоці запиту); пул запускається першим імпортом у процесі
+    USERS_IMPORT_BATCH_SIZE = 1000
+    USERS_IMPORT_PROCESSES = None
+    
+    # Максимальна кількість операцій у POST /api/notes/batch
+    NOTES_BATCH_MAX_OPERATIONS = 1000
+    
+    # In-process кеш списків нотаток (NoteService.get_notes_by_user / get_all_notes)
+    NOTES_CACHE_ENABLED = os.environ.get('NOTES_CACHE_ENABLED', '1') == '1'
+    NOTES_CACHE_TTL = 60  # секунд
+    NOTES_CACHE_MAX_ENTRIES = 1024
+    NOTES_CACHE_MAX_NOTES = 100000  # сумарна кількість нотаток у всіх списках
+    
+    # Кеш знімків користувачів для Flask-Login user_loader
+    # (короткий TTL обмежує застарілість між процесами; в межах процесу
+    # update_user / delete_user скидають запис одразу)
+    USER_CACHE_ENABLED = os.environ.get('USER_CACHE_ENABLED', '1') == '1'
+    USER_CACHE_TTL = 30  # секунд
+    USER_CACHE_MAX_ENTRIES = 10000
+    
+    # Метрики запитів, SQL, кешів і bcrypt для GET /api/metrics (формат Prometheus)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    
+    # Журнал повільних SQL-запитів (app/slow_queries.py, GET /api/slow-queries);
+    # 0 - вимкнено. Агрегується не більше SLOW_QUERY_MAX_STATEMENTS різних запитів
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+    SLOW_QUERY_MAX_STATEMENTS = 500
+    
+    # Стиснення відповідей gzip / deflate (app/compression.py): текстові
+    # відповіді від COMPRESS_MIN_SIZE байтів, потокові - інкрементально;
+    # статичні файли стискаються один раз при запуску в сусідні *.gz
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_LEVEL = 6  # 1 - найшвидше, 9 - найменший розмір
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_MIMETYPES = ('text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+                          'application/json', 'application/x-ndjson', 'application/javascript',
+                          'image/svg+xml')
+    COMPRESS_STATIC = True
+    
+    # Хешування паролів: вартість bcrypt і пул потоків для нього
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    BCRYPT_POOL_SIZE = os.cpu_count() or 2
+    BCRYPT_MAX_QUEUE = 64  # задач в очікуванні понад зайняті потоки
+    BCRYPT_QUEUE_TIMEOUT = 5  # секунд очікування місця в черзі до HTTP 503
 
 
 
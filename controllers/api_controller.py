@@ -1,8 +1,14 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
+from datetime import timezone
 from app.services.note_service import NoteService
 from app.services.user_service import UserService
+from app.services.note_export_service import NoteExportService, EXPORT_FORMATS
+from app.services.stats_service import StatsService
+from app.services.user_import_service import UserImportService
+from app import metrics, slow_queries
 from functools import wraps
+import hashlib
 
 # Створення Blueprint для REST API
 api_bp = Blueprint('api', __name__)
@@ -19,6 +25,42 @@ def admin_required(f):
     return decorated_function
 
 
+def make_etag(*parts) -> str:
+    """Сильний ETag з версії ресурсу (id і версія рядка, кількість і ревізія списку тощо)"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Повернути 304, якщо клієнт має актуальну версію ресурсу
+    If-None-Match має пріоритет над If-Modified-Since (RFC 7232)
+    """
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    
+    if request.if_none_match:
+        # Слабке порівняння: стиснута відповідь несе слабкий W/"..." ETag
+        fresh = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified is not None:
+        fresh = last_modified <= request.if_modified_since
+    else:
+        fresh = False
+    
+    if not fresh:
+        return None
+    return set_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    """Додати до відповіді ETag / Last-Modified; клієнт має перевіряти їх щоразу"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 # ============================================
 # CRUD операції для нотаток (Notes)
 # ============================================
@@ -27,40 +69,161 @@ def admin_required(f):
 @login_required
 def get_notes():
     """
-    GET /api/notes - Отримати список нотаток
+    GET /api/notes?limit=50&cursor=... - Отримати сторінку нотаток
     Адміністратор бачить всі нотатки, USER - тільки свої
+    Наступна сторінка запитується з cursor = next_cursor попередньої відповіді
     """
-    if current_user.is_admin():
-        notes = NoteService.get_all_notes()
-    else:
-        notes = NoteService.get_notes_by_user(current_user.id)
+    limit = request.args.get('limit', current_app.config['NOTES_PAGE_SIZE'], type=int)
+    if limit < 1 or limit > current_app.config['NOTES_PAGE_SIZE_MAX']:
+        return jsonify({'error': 'Невалідний параметр limit'}), 400
     
-    return jsonify({
+    cursor = request.args.get('cursor')
+    user_id = None if current_user.is_admin() else current_user.id
+    
+    # Версія списку з лічильників статистики - без завантаження нотаток
+    count, revision = NoteService.get_notes_version(user_id)
+    etag = make_etag('notes', user_id, limit, cursor, count, revision)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    result = NoteService.get_notes_page(limit, cursor=cursor, user_id=user_id)
+    
+    if not result['success']:
+        return jsonify({'error': result['error']}), 400
+    
+    notes = result['notes']
+    
+    response = jsonify({
         'success': True,
         'count': len(notes),
-        'notes': [note.to_dict() for note in notes]
+        'notes': notes,
+        'next_cursor': result['next_cursor']
+    })
+    return set_validators(response, etag), 200
+
+
+@api_bp.route('/notes/search', methods=['GET'])
+@login_required
+def search_notes():
+    """
+    GET /api/notes/search?q=...&limit=50&offset=0 - Повнотекстовий пошук нотаток
+    Адміністратор шукає серед усіх нотаток, USER - тільки серед своїх
+    """
+    limit = request.args.get('limit', current_app.config['NOTES_PAGE_SIZE'], type=int)
+    if limit < 1 or limit > current_app.config['NOTES_PAGE_SIZE_MAX']:
+        return jsonify({'error': 'Невалідний параметр limit'}), 400
+    
+    offset = request.args.get('offset', 0, type=int)
+    if offset < 0:
+        return jsonify({'error': 'Невалідний параметр offset'}), 400
+    
+    user_id = None if current_user.is_admin() else current_user.id
+    
+    result = NoteService.search_notes(request.args.get('q'), limit, offset=offset, user_id=user_id)
+    
+    if not result['success']:
+        return jsonify({'error': result['error']}), 400
+    
+    results = result['results']
+    
+    return jsonify({
+        'success': True,
+        'count': len(results),
+        'results': [{
+            'note': item['note'],
+            'highlight': {'title': item['title'], 'snippet': item['snippet']}
+        } for item in results],
+        'next_offset': result['next_offset']
     }), 200
 
 
+@api_bp.route('/notes/export', methods=['GET'])
+@login_required
+def export_notes():
+    """
+    GET /api/notes/export?format=ndjson|csv&gzip=1 - Потоковий експорт нотаток
+    Адміністратор експортує всі нотатки, USER - тільки свої
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Невідомий формат експорту'}), 400
+    
+    compress = request.args.get('gzip') in ('1', 'true')
+    user_id = None if current_user.is_admin() else current_user.id
+    
+    chunks = NoteExportService.export_notes(
+        fmt, user_id=user_id, compress=compress,
+        batch_size=current_app.config['NOTES_EXPORT_BATCH_SIZE']
+    )
+    
+    filename = f'notes.{fmt}' + ('.gz' if compress else '')
+    mimetype = 'application/gzip' if compress else \
+        ('text/csv' if fmt == 'csv' else 'application/x-ndjson')
+    
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={filename}'
+    })
+
+
+@api_bp.route('/notes/import', methods=['POST'])
+@login_required
+def import_notes():
+    """
+    POST /api/notes/import - Пакетний імпорт нотаток з файлу експорту
+    multipart/form-data: file=<notes.ndjson[.gz] | notes.csv[.gz]>, format=ndjson|csv
+    Адміністратор зберігає авторів з файлу, USER імпортує нотатки собі
+    """
+    upload = request.files.get('file')
+    
+    if not upload:
+        return jsonify({'error': 'Відсутній файл у запиті'}), 400
+    
+    fmt = request.form.get('format') or ('csv' if '.csv' in (upload.filename or '') else 'ndjson')
+    owner_id = None if current_user.is_admin() else current_user.id
+    
+    result = NoteExportService.import_notes(
+        upload.stream, fmt, owner_id=owner_id,
+        batch_size=current_app.config['NOTES_IMPORT_BATCH_SIZE']
+    )
+    
+    if not result['success']:
+        return jsonify({'error': result['error']}), 400
+    
+    return jsonify(result), 200
+
+
 @api_bp.route('/notes/<int:note_id>', methods=['GET'])
 @login_required
 def get_note(note_id):
     """
     GET /api/notes/<id> - Отримати конкретну нотатку за ID
     """
-    note = NoteService.get_note_by_id(note_id)
+    # Спершу лише (id, user_id, updated_at, version): для 304 вміст не потрібен
+    version = NoteService.get_note_version(note_id)
     
-    if not note:
+    if not version:
         return jsonify({'error': 'Нотатку не знайдено'}), 404
     
     # Перевірка прав доступу
-    if not NoteService.can_user_modify_note(note, current_user.id, current_user.is_admin()):
+    if not NoteService.can_user_modify_note(version, current_user.id, current_user.is_admin()):
         return jsonify({'error': 'Доступ заборонено'}), 403
     
-    return jsonify({
+    etag = make_etag('note', version.id, version.version)
+    cached = not_modified(etag, version.updated_at)
+    if cached:
+        return cached
+    
+    note = NoteService.get_note_by_id(note_id)
+    
+    if not note:
+        return jsonify({'error': 'Нотатку не знайдено'}), 404
+    
+    response = jsonify({
         'success': True,
         'note': note.to_dict()
-    }), 200
+    })
+    return set_validators(response, etag, note.updated_at), 200
 
 
 @api_bp.route('/notes', methods=['POST'])
@@ -90,6 +253,47 @@ def create_note():
     }), 201
 
 
+@api_bp.route('/notes/batch', methods=['POST'])
+@login_required
+def batch_notes():
+    """
+    POST /api/notes/batch - Пакет операцій над нотатками в одній транзакції
+    Body: { "operations": [{"op": "create|update|delete", "id": ..., "title": "...", "content": "..."}],
+            "atomic": false }
+    """
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'Відсутні дані у запиті'}), 400
+    
+    operations = data.get('operations')
+    
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'Список операцій не може бути порожнім'}), 400
+    
+    if len(operations) > current_app.config['NOTES_BATCH_MAX_OPERATIONS']:
+        return jsonify({'error': 'Забагато операцій у пакеті'}), 400
+    
+    result = NoteService.apply_batch(
+        operations, current_user.id, current_user.is_admin(),
+        atomic=bool(data.get('atomic', False))
+    )
+    
+    results = []
+    for item in result['results']:
+        item = dict(item)
+        if 'note' in item:
+            item['note'] = item['note'].to_dict()
+        results.append(item)
+    
+    return jsonify({
+        'success': result['success'],
+        'committed': result['committed'],
+        'failed': result['failed'],
+        'results': results
+    }), 200 if result['committed'] else 400
+
+
 @api_bp.route('/notes/<int:note_id>', methods=['PUT'])
 @login_required
 def update_note(note_id):
@@ -159,13 +363,20 @@ def get_users():
     """
     GET /api/users - Отримати список користувачів (тільки ADMIN)
     """
+    count, revision = UserService.get_users_version()
+    etag = make_etag('users', count, revision)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
     users = UserService.get_all_users()
     
-    return jsonify({
+    response = jsonify({
         'success': True,
         'count': len(users),
-        'users': [user.to_dict() for user in users]
-    }), 200
+        'users': users
+    })
+    return set_validators(response, etag), 200
 
 
 @api_bp.route('/users/<int:user_id>', methods=['GET'])
@@ -214,6 +425,36 @@ def create_user():
     }), 201
 
 
+@api_bp.route('/users/import', methods=['POST'])
+@admin_required
+def import_users():
+    """
+    POST /api/users/import?format=ndjson|csv - Масовий імпорт користувачів (тільки ADMIN)
+    Тіло - файл (text/csv, application/x-ndjson, можливо gzip) або
+    multipart/form-data: file=<users.ndjson | users.csv>
+    Поля рядка: username, email, password, role (необов'язкове, USER)
+    Відповідь - звіт з результатом для кожного рядка файлу
+    """
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    if upload:
+        stream, name = upload.stream, upload.filename or ''
+    else:
+        # Сире тіло читається потоково, без буферизації всього файлу
+        stream, name = request.stream, ''
+    
+    fmt = request.args.get('format') or request.form.get('format') or \
+        ('csv' if '.csv' in name or request.mimetype == 'text/csv' else 'ndjson')
+    
+    result = UserImportService.import_users(
+        stream, fmt, batch_size=current_app.config['USERS_IMPORT_BATCH_SIZE']
+    )
+    
+    if not result['success']:
+        return jsonify({'error': result['error']}), 400
+    
+    return jsonify(result), 200
+
+
 @api_bp.route('/users/<int:user_id>', methods=['DELETE'])
 @admin_required
 def delete_user(user_id):
@@ -246,16 +487,70 @@ def delete_user(user_id):
 def get_stats():
     """
     GET /api/stats - Отримати статистику (тільки ADMIN)
+    Query параметри: days - за скільки днів показати нотатки по днях (1-366, за замовчуванням 30)
+    Значення беруться з лічильників, тож час відповіді не залежить від розміру таблиць
+    """
+    days = min(max(request.args.get('days', 30, type=int), 1), 366)
+    stats = StatsService.get_summary(days)
+    stats['notes_cache'] = NoteService.get_cache_stats()
+    stats['user_cache'] = UserService.get_cache_stats()
+    
+    return jsonify({
+        'success': True,
+        'stats': stats
+    }), 200
+
+
+@api_bp.route('/stats/users', methods=['GET'])
+@admin_required
+def get_user_stats():
     """
-    stats = NoteService.get_statistics()
-    users_count = len(UserService.get_all_users())
+    GET /api/stats/users - Користувачі з найбільшою кількістю нотаток (тільки ADMIN)
+    Query параметри: limit - кількість користувачів (1-100, за замовчуванням 10)
+    """
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
     
     return jsonify({
         'success': True,
-        'stats': {
-            'total_users': users_count,
-            'total_notes': stats['total_notes']
-        }
+        'users': StatsService.get_top_users(limit)
+    }), 200
+
+
+@api_bp.route('/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    """
+    GET /api/metrics - Метрики продуктивності у текстовому форматі Prometheus (тільки ADMIN)
+    """
+    registry = metrics.get_metrics()
+    if registry is None:
+        return jsonify({'error': 'Метрики вимкнено'}), 404
+    
+    caches = {'notes': NoteService.get_cache_stats(), 'users': UserService.get_cache_stats()}
+    return Response(registry.render(metrics.cache_metrics(caches)),
+                    mimetype='text/plain; version=0.0.4')
+
+
+@api_bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries():
+    """
+    GET /api/slow-queries - Найповільніші SQL-запити, згруповані за нормалізованим текстом (тільки ADMIN)
+    Query params: limit (за замовчуванням 20), sort (total_ms | max_ms | count)
+    """
+    log = slow_queries.get_slow_query_log()
+    if log is None:
+        return jsonify({'error': 'Журнал повільних запитів вимкнено'}), 404
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 500)
+    sort = request.args.get('sort', 'total_ms')
+    if sort not in ('total_ms', 'max_ms', 'count'):
+        return jsonify({'error': 'sort має бути total_ms, max_ms або count'}), 400
+    
+    return jsonify({
+        'success': True,
+        'threshold_ms': current_app.config['SLOW_QUERY_THRESHOLD_MS'],
+        'queries': log.worst(limit, sort)
     }), 200
 
 
@@ -265,8 +560,16 @@ def get_current_user():
     """
     GET /api/me - Отримати інформацію про поточного користувача
     """
-    return jsonify({
+    # Користувач уже завантажений Flask-Login, тож ETag нічого не коштує
+    etag = make_etag('me', current_user.id, current_user.role, current_user.email,
+                     current_user.updated_at)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    response = jsonify({
         'success': True,
         'user': current_user.to_dict()
-    }), 200
+    })
+    return set_validators(response, etag), 200
 
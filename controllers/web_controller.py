@@ -1,4 +1,6 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash
+from flask import (Blueprint, render_template, redirect, url_for, request, flash, abort,
+                   make_response, current_app)
+from datetime import datetime
 from flask_login import login_user, logout_user, login_required, current_user
 from app.services.user_service import UserService
 from app.services.note_service import NoteService
@@ -7,6 +9,12 @@ from app.services.note_service import NoteService
 web_bp = Blueprint('web', __name__)
 
 
+@web_bp.app_template_filter('timestamp')
+def format_timestamp(value: str) -> str:
+    """Час з легкої моделі читання (isoformat-рядок) у вигляді ДД.ММ.РРРР ГГ:ХХ"""
+    return datetime.fromisoformat(value).strftime('%d.%m.%Y %H:%M')
+
+
 @web_bp.route('/')
 def index():
     """Головна сторінка"""
@@ -176,17 +184,45 @@ def admin_panel():
         flash('Доступ заборонено. Потрібні права адміністратора.', 'error')
         return redirect(url_for('web.notes'))
     
-    users = UserService.get_all_users()
-    all_notes = NoteService.get_all_notes()
+    # Рендериться лише перша сторінка кожної таблиці; наступні
+    # довантажуються фрагментами admin_user_rows / admin_note_rows
+    users_page = _admin_users_page('users_')
+    notes_page = _admin_notes_page('notes_')
     stats = NoteService.get_statistics()
     
     return render_template('admin.html', 
-                         users=users, 
-                         notes=all_notes,
-                         total_users=len(users),
+                         users_page=users_page, 
+                         notes_page=notes_page,
+                         total_users=stats['total_users'],
                          total_notes=stats['total_notes'])
 
 
+@web_bp.route('/admin/users/rows')
+@login_required
+def admin_user_rows():
+    """HTML-фрагмент з рядками таблиці користувачів (наступні сторінки адмін-панелі)"""
+    if not current_user.is_admin():
+        abort(403)
+    
+    users_page = _admin_users_page()
+    response = make_response(render_template('_admin_user_rows.html', users_page=users_page))
+    _set_next_page(response, 'web.admin_user_rows', users_page)
+    return response
+
+
+@web_bp.route('/admin/notes/rows')
+@login_required
+def admin_note_rows():
+    """HTML-фрагмент з рядками таблиці нотаток (наступні сторінки адмін-панелі)"""
+    if not current_user.is_admin():
+        abort(403)
+    
+    notes_page = _admin_notes_page()
+    response = make_response(render_template('_admin_note_rows.html', notes_page=notes_page))
+    _set_next_page(response, 'web.admin_note_rows', notes_page)
+    return response
+
+
 @web_bp.route('/admin/users/<int:user_id>/delete', methods=['POST'])
 @login_required
 def admin_delete_user(user_id):
@@ -210,3 +246,36 @@ def admin_delete_user(user_id):
     
     return redirect(url_for('web.admin_panel'))
 
+
+def _admin_table_args(prefix: str, default_sort: str, default_order: str) -> dict:
+    """Параметри таблиці адмін-панелі з query string: page, per_page, sort, descending"""
+    per_page = request.args.get(f'{prefix}per_page', current_app.config['ADMIN_PAGE_SIZE'], type=int)
+    return {
+        'page': request.args.get(f'{prefix}page', 1, type=int),
+        'per_page': min(max(per_page, 1), current_app.config['ADMIN_PAGE_SIZE_MAX']),
+        'sort': request.args.get(f'{prefix}sort', default_sort),
+        'descending': request.args.get(f'{prefix}order', default_order) == 'desc',
+    }
+
+
+def _admin_users_page(prefix: str = '') -> dict:
+    """Сторінка таблиці користувачів за параметрами запиту"""
+    return UserService.get_users_page(**_admin_table_args(prefix, 'id', 'asc'))
+
+
+def _admin_notes_page(prefix: str = '') -> dict:
+    """Сторінка таблиці нотаток за параметрами запиту"""
+    return NoteService.get_notes_preview_page(
+        **_admin_table_args(prefix, 'created_at', 'desc'),
+        preview_length=current_app.config['ADMIN_NOTE_PREVIEW_LENGTH']
+    )
+
+
+def _set_next_page(response, endpoint: str, page: dict) -> None:
+    """Передати URL наступної сторінки фрагмента в заголовку X-Next-Page"""
+    if page['has_next']:
+        response.headers['X-Next-Page'] = url_for(
+            endpoint, page=page['page'] + 1, per_page=page['per_page'], sort=page['sort'],
+            order='desc' if page['descending'] else 'asc'
+        )
+
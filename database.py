@@ -0,0 +1,148 @@
+"""
+Налаштування рушія SQLite та повтор операцій запису при SQLITE_BUSY
+
+Профіль 'production' (Config.SQLITE_PROFILE) вмикає WAL і прагми
+Config.SQLITE_PRAGMAS на кожному новому з'єднанні, а також налаштовує пул
+з'єднань; профіль 'default' залишає налаштування SQLite / SQLAlchemy як є.
+"""
+import functools
+import random
+import sqlite3
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.session_routing import REPLICA_BIND_KEY
+
+# Коди помилок SQLite (молодший байт розширеного коду)
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+# Глибина вкладених операцій з retry_on_busy у поточному потоці
+_retry_state = threading.local()
+
+
+def is_memory_database(uri: str) -> bool:
+    """Чи вказує URI на SQLite у пам'яті (окрема БД на кожне з'єднання або StaticPool)"""
+    url = make_url(uri)
+    return url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+
+
+def configure_engine_options(app) -> None:
+    """
+    Доповнити SQLALCHEMY_ENGINE_OPTIONS налаштуваннями пулу профілю 'production'
+    та зареєструвати рушій репліки (SQLALCHEMY_REPLICA_URI) як bind REPLICA_BIND_KEY.
+    Викликається до db.init_app; явно задані в конфігурації опції мають пріоритет
+    """
+    config = app.config
+    if config.get('SQLALCHEMY_REPLICA_URI'):
+        config['SQLALCHEMY_BINDS'] = {**config.get('SQLALCHEMY_BINDS', {}),
+                                      REPLICA_BIND_KEY: config['SQLALCHEMY_REPLICA_URI']}
+    
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    if config['SQLITE_PROFILE'] != 'production' or not uri.startswith('sqlite') \
+            or is_memory_database(uri):
+        return
+    
+    options = {
+        'pool_size': config['SQLITE_POOL_SIZE'],
+        'max_overflow': config['SQLITE_MAX_OVERFLOW'],
+        'pool_timeout': config['SQLITE_POOL_TIMEOUT'],
+        # Перевірка з'єднання при видачі з пулу (БД-файл могли замінити або видалити)
+        'pool_pre_ping': True,
+    }
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def configure_engine(app) -> None:
+    """Встановити прагми SQLite на кожне нове з'єднання (потребує контексту застосунку)"""
+    if app.config['SQLITE_PROFILE'] != 'production':
+        return
+    for key, engine in db.engines.items():
+        if engine.dialect.name != 'sqlite':
+            continue
+        pragmas = app.config['SQLITE_PRAGMAS']
+        if key == REPLICA_BIND_KEY:
+            # Режим журналу - властивість файлу БД, його встановлює основне з'єднання
+            # (з'єднання mode=ro змінити його не може)
+            pragmas = {name: value for name, value in pragmas.items() if name != 'journal_mode'}
+        event.listen(engine, 'connect', _pragma_listener(pragmas))
+
+
+def sync_replica() -> bool:
+    """
+    Скопіювати основну SQLite-БД у файл репліки (backup API SQLite)
+    Для локальної перевірки з двома файлами; False - репліку не налаштовано
+    """
+    replica = db.engines.get(REPLICA_BIND_KEY)
+    if replica is None:
+        return False
+    
+    target = replica.url.database
+    if replica.url.query.get('uri'):
+        target = target[len('file:'):]
+    
+    source = db.engine.raw_connection()
+    try:
+        with sqlite3.connect(target) as destination:
+            source.driver_connection.backup(destination)
+    finally:
+        source.close()
+    return True
+
+
+def _pragma_listener(pragmas: dict):
+    """Обробник події connect, що виконує PRAGMA name = value для кожної прагми"""
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+    return set_pragmas
+
+
+def is_busy_error(error: OperationalError) -> bool:
+    """Чи є помилка SQLITE_BUSY / SQLITE_LOCKED ('database is locked')"""
+    code = getattr(error.orig, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xff in (SQLITE_BUSY, SQLITE_LOCKED)
+    message = str(error.orig).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def retry_on_busy(fn):
+    """
+    Повторити операцію запису з експоненційною затримкою при SQLITE_BUSY
+    
+    busy_timeout уже чекає на блокування всередині SQLite; сюди доходять лише
+    випадки, коли очікування вичерпано. Після помилки транзакція відкочується
+    й операція виконується заново цілком - частково виконану одиницю роботи
+    повторити неможливо. Тому повторюється лише зовнішня операція, що сама
+    фіксує транзакцію: вкладені виклики (create_note у apply_batch) та виклики
+    з commit=False передають помилку вище.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if getattr(_retry_state, 'depth', 0) or kwargs.get('commit') is False:
+            return fn(*args, **kwargs)
+        
+        retries = current_app.config['SQLITE_BUSY_RETRIES']
+        backoff = current_app.config['SQLITE_BUSY_BACKOFF']
+        for attempt in range(retries + 1):
+            _retry_state.depth = 1
+            try:
+                return fn(*args, **kwargs)
+            except OperationalError as error:
+                if not is_busy_error(error) or attempt == retries:
+                    raise
+                db.session.rollback()
+            finally:
+                _retry_state.depth = 0
+            # Випадковий множник розводить потоки, що конфліктували одночасно
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+    return wrapper
+
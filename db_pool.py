@@ -0,0 +1,119 @@
+"""
+Пул SQLite-з'єднань для старого коду магазину (app.py, user_bp)
+
+Замість нового sqlite3.connect() на кожен запит до БД запит бере готове
+з'єднання з пулу й повертає його в teardown (release): файл відкривається,
+схема розбирається і прагми виконуються один раз на з'єднання. Підготовлені
+запити кешуються в з'єднанні (cached_statements), тож повторний
+SELECT ... WHERE id = ? не компілюється заново. З'єднань не більше size,
+незалежно від того, скільки потоків створить сервер (threaded Werkzeug
+запускає потік на кожен запит).
+"""
+import queue
+import sqlite3
+import threading
+
+PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA foreign_keys=ON',
+    'PRAGMA busy_timeout=5000',
+)
+
+
+class PoolTimeout(Exception):
+    """Усі з'єднання пулу зайняті довше за timeout"""
+
+
+class ConnectionPool:
+    """Обмежений пул з'єднань з однією SQLite-базою"""
+    
+    def __init__(self, path, size=10, timeout=30, schema=(), cached_statements=256):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        # LIFO: першим повертається щойно звільнене з'єднання з "теплим" кешем
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        # З'єднання, видане потоку до кінця запиту
+        self._local = threading.local()
+        
+        conn = self._connect()
+        for statement in schema:
+            conn.execute(statement)
+        conn.commit()
+        self._created = 1
+        self._idle.put(conn)
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path, cached_statements=self.cached_statements,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def connection(self):
+        """З'єднання поточного запиту (береться з пулу при першому зверненні)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._checkout()
+            self._local.conn = conn
+        return conn
+    
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f'Немає вільного з\'єднання з {self.path} за {self.timeout} с')
+    
+    def release(self):
+        """
+        Кінець запиту: незафіксована транзакція відкочується, а з'єднання
+        повертається в пул для наступного запиту (будь-якого потоку)
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Зламане з'єднання не повертається в пул, замість нього буде створено нове
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(conn)
+    
+    def close_all(self):
+        """Закрити вільні з'єднання пулу (при зупинці застосунку)"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
@@ -0,0 +1,20 @@
+"""
+JSON-провайдер Flask для легких моделей читання
+
+Списки NoteView / UserView (app/models/read_models.py) передаються в jsonify
+як є: провайдер серіалізує їх у момент кодування, без проміжного списку
+словників у контролері. Решта типів - як у DefaultJSONProvider.
+"""
+from flask.json.provider import DefaultJSONProvider
+from app.models.read_models import ReadModel
+
+
+class ReadModelJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider з підтримкою ReadModel"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, ReadModel):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
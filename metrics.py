@@ -0,0 +1,204 @@
+"""
+Метрики продуктивності запитів у форматі Prometheus
+
+init_metrics(app) реєструє хуки запиту та події рушія SQLAlchemy:
+- тривалість запитів - гістограма по endpoint / методу, кількість по статусу;
+- SQL-запити - кількість і час на запит (гістограми по endpoint);
+- bcrypt - час хешування / перевірки в пулі PasswordHasher;
+- кеші - влучання / промахи / розмір, читаються в момент збору.
+Кожне спостереження - пошук кошика (bisect) і кілька додавань під одним
+блокуванням, тож метрики можна тримати увімкненими в продакшні.
+"""
+import bisect
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Межі кошиків гістограм (верхні, включно)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+BCRYPT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Гістограма з фіксованими кошиками (кумулятивні значення рахуються при виводі)"""
+    
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+    
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # останній - +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Потокобезпечне сховище метрик одного застосунку"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # назва -> (тип, опис, кошики або None, {мітки: Histogram або число})
+        self._metrics: Dict[str, list] = {}
+    
+    def histogram(self, name: str, description: str, buckets: Tuple[float, ...]) -> None:
+        """Оголосити гістограму"""
+        self._metrics.setdefault(name, ['histogram', description, buckets, {}])
+    
+    def counter(self, name: str, description: str) -> None:
+        """Оголосити лічильник"""
+        self._metrics.setdefault(name, ['counter', description, None, {}])
+    
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Додати спостереження до гістограми"""
+        _, _, buckets, series = self._metrics[name]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+    
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Збільшити лічильник"""
+        series = self._metrics[name][3]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series[key] = series.get(key, 0) + value
+    
+    def render(self, extra: Iterable[str] = ()) -> str:
+        """Усі метрики в текстовому форматі Prometheus (0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, (kind, description, buckets, series) in self._metrics.items():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in series.items():
+                    if kind == 'counter':
+                        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets + (float('inf'),), value.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else _format_value(bound)
+                        lines.append(f'{name}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value.sum)}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {value.count}')
+        lines.extend(extra)
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Labels) -> str:
+    """{a="1",b="2"} з екрануванням значень"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _escape(value) -> str:
+    """Екранування значення мітки: \\, \" та \\n"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    """Число без зайвих знаків (1, 0.25, 1.5e-05)"""
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() \
+        else str(int(value))
+
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    """Реєстр метрик поточного застосунку (None - метрики вимкнено)"""
+    return current_app.extensions.get('metrics')
+
+
+def init_metrics(app) -> None:
+    """Зареєструвати реєстр метрик, хуки запиту та події рушіїв (потребує контексту застосунку)"""
+    if not app.config['METRICS_ENABLED']:
+        return
+    
+    from app import db
+    
+    registry = MetricsRegistry()
+    registry.histogram('app_request_duration_seconds',
+                       'Тривалість обробки запиту за endpoint', LATENCY_BUCKETS)
+    registry.counter('app_requests_total', 'Кількість запитів за endpoint і статусом')
+    registry.histogram('app_request_sql_statements',
+                       'Кількість SQL-запитів на HTTP-запит', SQL_COUNT_BUCKETS)
+    registry.histogram('app_request_sql_seconds',
+                       'Сумарний час SQL-запитів на HTTP-запит', LATENCY_BUCKETS)
+    registry.counter('app_sql_statements_total', 'Кількість SQL-запитів за endpoint')
+    registry.histogram('app_bcrypt_seconds', 'Час операцій bcrypt у пулі', BCRYPT_BUCKETS)
+    app.extensions['metrics'] = registry
+    
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_seconds = 0.0
+    
+    @app.after_request
+    def remember_status(response):
+        g.metrics_status = response.status_code
+        return response
+    
+    @app.teardown_request
+    def record_request_metrics(error=None):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        endpoint = request.endpoint or 'unmatched'
+        status = g.pop('metrics_status', 500)
+        registry.observe('app_request_duration_seconds', time.perf_counter() - started,
+                         endpoint=endpoint, method=request.method)
+        registry.inc('app_requests_total', endpoint=endpoint, method=request.method,
+                     status=str(status))
+        registry.observe('app_request_sql_statements', g.sql_statements, endpoint=endpoint)
+        registry.observe('app_request_sql_seconds', g.sql_seconds, endpoint=endpoint)
+        if g.sql_statements:
+            registry.inc('app_sql_statements_total', g.sql_statements, endpoint=endpoint)
+    
+    for engine in db.engines.values():
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Запам'ятати початок SQL-запиту"""
+    conn.info['metrics_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Додати SQL-запит до лічильників поточного HTTP-запиту"""
+    elapsed = time.perf_counter() - conn.info['metrics_started']
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_statements += 1
+        g.sql_seconds += elapsed
+
+
+def cache_metrics(caches: Dict[str, Optional[Dict]]) -> List[str]:
+    """Рядки метрик кешів з їхніх stats() (вимкнені кеші пропускаються)"""
+    definitions = [
+        ('app_cache_hits_total', 'counter', 'Влучання в кеш', 'hits'),
+        ('app_cache_misses_total', 'counter', 'Промахи кешу', 'misses'),
+        ('app_cache_evictions_total', 'counter', 'Витіснення з кешу', 'evictions'),
+        ('app_cache_entries', 'gauge', 'Кількість записів у кеші', 'entries'),
+        ('app_cache_hit_ratio', 'gauge', 'Частка влучань у кеш', 'hit_rate'),
+    ]
+    lines = []
+    for name, kind, description, field in definitions:
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for cache, stats in caches.items():
+            if stats is not None:
+                lines.append(f'{name}{_format_labels((("cache", cache),))} '
+                             f'{_format_value(stats[field])}')
+    return lines
+
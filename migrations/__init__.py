@@ -0,0 +1,155 @@
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+from app import db
+from .versions import MIGRATIONS
+from typing import List
+
+# CLI-група: flask db upgrade / downgrade / current / explain
+db_cli = AppGroup('db', help='Міграції схеми бази даних')
+
+
+def _ensure_version_table(conn) -> None:
+    """Створити таблицю з історією застосованих міграцій"""
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'version INTEGER PRIMARY KEY, '
+        'name VARCHAR(200) NOT NULL, '
+        'applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)'
+    ))
+
+
+def _execute(conn, statement) -> None:
+    """Виконати крок міграції: SQL-рядок або функцію, що приймає з'єднання"""
+    if callable(statement):
+        statement(conn)
+    else:
+        conn.execute(text(statement))
+
+
+def current_version() -> int:
+    """Отримати номер останньої застосованої міграції (0 - жодної)"""
+    with db.engine.begin() as conn:
+        _ensure_version_table(conn)
+        version = conn.execute(text('SELECT MAX(version) FROM schema_migrations')).scalar()
+    return version or 0
+
+
+def upgrade(target: int = None) -> List[int]:
+    """
+    Застосувати всі міграції новіші за поточну версію (до target включно)
+    Кожна міграція виконується в окремій транзакції разом із записом версії
+    """
+    applied = []
+    version = current_version()
+    
+    for number, name, statements, _ in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+        with db.engine.begin() as conn:
+            for statement in statements:
+                _execute(conn, statement)
+            conn.execute(
+                text('INSERT INTO schema_migrations (version, name) VALUES (:version, :name)'),
+                {'version': number, 'name': name}
+            )
+        applied.append(number)
+    
+    return applied
+
+
+def migrate(target: int = None) -> List[int]:
+    """
+    Створити таблиці моделей, яких ще немає, і застосувати нові міграції
+    (FTS-індекс і тригери існують лише в міграціях, create_all їх не створює)
+    Лише на основній БД: репліка (bind REPLICA_BIND_KEY) отримує схему копіюванням
+    """
+    db.create_all(bind_key=None)
+    return upgrade(target)
+
+
+def downgrade(target: int = 0) -> List[int]:
+    """Відкотити міграції новіші за target (у зворотному порядку)"""
+    reverted = []
+    version = current_version()
+    
+    for number, _, _, statements in reversed(MIGRATIONS):
+        if number > version or number <= target:
+            continue
+        with db.engine.begin() as conn:
+            for statement in statements:
+                _execute(conn, statement)
+            conn.execute(
+                text('DELETE FROM schema_migrations WHERE version = :version'),
+                {'version': number}
+            )
+        reverted.append(number)
+    
+    return reverted
+
+
+@db_cli.command('upgrade')
+@click.option('--target', type=int, default=None, help='Версія, до якої оновити схему')
+def upgrade_command(target):
+    """Створити таблиці нової БД і застосувати нові міграції"""
+    applied = migrate(target)
+    if applied:
+        print(f"✓ Застосовано міграції: {', '.join(str(v) for v in applied)}")
+    print(f'Поточна версія схеми: {current_version()}')
+
+
+@db_cli.command('downgrade')
+@click.option('--target', type=int, default=0, help='Версія, до якої відкотити схему')
+def downgrade_command(target):
+    """Відкотити міграції"""
+    reverted = downgrade(target)
+    if reverted:
+        print(f"✓ Відкочено міграції: {', '.join(str(v) for v in reverted)}")
+    print(f'Поточна версія схеми: {current_version()}')
+
+
+@db_cli.command('current')
+def current_command():
+    """Показати поточну версію схеми"""
+    print(f'Поточна версія схеми: {current_version()}')
+
+
+@db_cli.command('sync-replica')
+def sync_replica_command():
+    """Скопіювати основну SQLite-БД у файл read-репліки (локальна перевірка)"""
+    from app.database import sync_replica
+    
+    if sync_replica():
+        print('✓ Репліку оновлено')
+    else:
+        print('Репліку не налаштовано (SQLALCHEMY_REPLICA_URI)')
+
+
+@db_cli.command('explain')
+@click.option('--output', type=click.Path(dir_okay=False), default=None,
+              help='Файл, у який записати плани запитів')
+def explain_command(output):
+    """Записати EXPLAIN QUERY PLAN для запитів репозиторіїв"""
+    from .query_plans import collect_query_plans, find_full_scans
+    
+    plans = collect_query_plans()
+    report = []
+    for probe, statements in plans.items():
+        report.append(f'== {probe}')
+        for sql, plan in statements:
+            report.append(f'-- {sql}')
+            report.extend(f'   {line}' for line in plan)
+    report = '\n'.join(report) + '\n'
+    
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(f'✓ Плани запитів записано у {output}')
+    else:
+        print(report)
+    
+    scans = find_full_scans(plans)
+    if scans:
+        for probe, line in scans:
+            print(f'✗ {probe}: {line}')
+        raise SystemExit(1)
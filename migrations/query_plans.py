@@ -0,0 +1,124 @@
+"""
+Запис EXPLAIN QUERY PLAN для запитів репозиторіїв
+
+Кожна проба викликає реальний метод репозиторію; всі SQL-інструкції, які він
+виконав, перехоплюються й пояснюються з тими ж параметрами на тому ж з'єднанні.
+"""
+from datetime import date, datetime
+from sqlalchemy import event
+from app import db
+from app.session_routing import pin_primary
+from app.repositories.note_repository import NoteRepository
+from app.repositories.user_repository import UserRepository
+from app.repositories.stats_repository import StatsRepository
+from typing import Dict, List, Tuple
+
+# (назва, виклик, чи допустимий повний прохід таблиці)
+PROBES = [
+    ('NoteRepository.find_by_id', lambda: NoteRepository.find_by_id(1), False),
+    ('NoteRepository.find_all', lambda: NoteRepository.find_all(), False),
+    ('NoteRepository.find_by_user_id', lambda: NoteRepository.find_by_user_id(1), False),
+    ('NoteRepository.find_views', lambda: NoteRepository.find_views(), False),
+    ('NoteRepository.find_views(user_id)', lambda: NoteRepository.find_views(user_id=1), False),
+    ('NoteRepository.find_page', lambda: NoteRepository.find_page(50), False),
+    ('NoteRepository.find_page(after)',
+     lambda: NoteRepository.find_page(50, after=(datetime.now(), 1)), False),
+    ('NoteRepository.find_page(user_id)', lambda: NoteRepository.find_page(50, user_id=1), False),
+    ('NoteRepository.find_page(user_id, after)',
+     lambda: NoteRepository.find_page(50, user_id=1, after=(datetime.now(), 1)), False),
+    ('NoteRepository.search', lambda: NoteRepository.search('"note"', 50), False),
+    ('NoteRepository.search(user_id)',
+     lambda: NoteRepository.search('"note"', 50, user_id=1), False),
+    ('NoteRepository.find_previews', lambda: NoteRepository.find_previews(25), False),
+    ('NoteRepository.find_previews(updated_at)',
+     lambda: NoteRepository.find_previews(25, sort='updated_at'), False),
+    # Сторінка за id - обхід таблиці в порядку rowid, що зупиняється на LIMIT
+    ('NoteRepository.find_previews(id)', lambda: NoteRepository.find_previews(25, sort='id'), True),
+    ('NoteRepository.find_by_ids', lambda: NoteRepository.find_by_ids([1, 2]), False),
+    ('NoteRepository.find_version', lambda: NoteRepository.find_version(1), False),
+    # Експорт усіх нотаток - повний прохід закладено самим запитом
+    ('NoteRepository.iter_export_rows', lambda: list(NoteRepository.iter_export_rows()), True),
+    ('NoteRepository.iter_export_rows(user_id)',
+     lambda: list(NoteRepository.iter_export_rows(user_id=1)), False),
+    ('NoteRepository.count_by_user_ids',
+     lambda: NoteRepository.count_by_user_ids([1, 2]), False),
+    ('NoteRepository.count_all', lambda: NoteRepository.count_all(), False),
+    ('NoteRepository.count_by_user_id', lambda: NoteRepository.count_by_user_id(1), False),
+    ('UserRepository.find_by_id', lambda: UserRepository.find_by_id(1), False),
+    ('UserRepository.load_for_auth', lambda: UserRepository.load_for_auth(1), False),
+    ('UserRepository.find_by_username', lambda: UserRepository.find_by_username('admin'), False),
+    ('UserRepository.find_by_email', lambda: UserRepository.find_by_email('admin@example.com'), False),
+    # Список усіх користувачів без фільтра - повний прохід закладено самим запитом
+    ('UserRepository.find_all', lambda: UserRepository.find_all(), True),
+    ('UserRepository.find_all_views', lambda: UserRepository.find_all_views(), True),
+    # Сторінка за id - обхід таблиці в порядку rowid, що зупиняється на LIMIT;
+    # сортування за note_count проходить усіх користувачів (їх на порядки менше, ніж нотаток)
+    ('UserRepository.find_page', lambda: UserRepository.find_page(25), True),
+    ('UserRepository.find_page(note_count)',
+     lambda: UserRepository.find_page(25, sort='note_count', descending=True), True),
+    ('UserRepository.exists_by_username', lambda: UserRepository.exists_by_username('admin'), False),
+    ('UserRepository.exists_by_email', lambda: UserRepository.exists_by_email('admin@example.com'), False),
+    ('UserRepository.find_existing_ids', lambda: UserRepository.find_existing_ids([1, 2]), False),
+    ('UserRepository.find_ids_by_usernames',
+     lambda: UserRepository.find_ids_by_usernames(['admin', 'user']), False),
+    ('UserRepository.find_taken',
+     lambda: UserRepository.find_taken(['admin'], ['admin@example.com']), False),
+    # Усі глобальні лічильники - кілька рядків stat_counters
+    ('StatsRepository.get_counters', lambda: StatsRepository.get_counters(), True),
+    ('StatsRepository.find_counters',
+     lambda: StatsRepository.find_counters('notes', 'notes_revision'), False),
+    ('StatsRepository.find_user_notes_version',
+     lambda: StatsRepository.find_user_notes_version(1), False),
+    ('StatsRepository.find_user_notes', lambda: StatsRepository.find_user_notes(1), False),
+    ('StatsRepository.find_top_users', lambda: StatsRepository.find_top_users(10), False),
+    ('StatsRepository.find_daily_created',
+     lambda: StatsRepository.find_daily_created(date(2024, 1, 1)), False),
+]
+
+
+def _explain(connection, statement: str, parameters) -> List[str]:
+    """Виконати EXPLAIN QUERY PLAN і повернути рядки detail"""
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def collect_query_plans() -> Dict[str, List[Tuple[str, List[str]]]]:
+    """Зібрати плани запитів для всіх проб: {проба: [(sql, [рядки плану])]}"""
+    plans = {}
+    captured = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith('EXPLAIN'):
+            captured.append((statement, parameters))
+    
+    # Плани знімаються на основній БД, тож і проби мають виконуватися там, а не на репліці
+    pin_primary()
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        for name, probe, _ in PROBES:
+            # Порожня identity map, щоб get() не повернув об'єкт без запиту
+            db.session.expunge_all()
+            captured.clear()
+            probe()
+            connection = db.session.connection()
+            plans[name] = [(sql, _explain(connection, sql, params)) for sql, params in captured]
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+        db.session.rollback()
+    
+    return plans
+
+
+def find_full_scans(plans: Dict[str, List[Tuple[str, List[str]]]]) -> List[Tuple[str, str]]:
+    """Знайти кроки плану з повним проходом таблиці (SCAN без індексу)"""
+    allowed = {name for name, _, allow_scan in PROBES if allow_scan}
+    scans = []
+    for name, statements in plans.items():
+        if name in allowed:
+            continue
+        for _, plan in statements:
+            for line in plan:
+                # Прохід по FTS5 (VIRTUAL TABLE INDEX) - це пошук в індексі
+                if line.startswith('SCAN') and 'USING' not in line and 'VIRTUAL TABLE' not in line:
+                    scans.append((name, line))
+    return scans
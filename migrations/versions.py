@@ -0,0 +1,124 @@
+"""
+Версіоновані міграції схеми БД
+
+Кожна міграція - (версія, назва, кроки upgrade, кроки downgrade). Крок - це
+SQL-рядок або функція, що приймає з'єднання. Кроки upgrade мають бути
+ідемпотентними (IF NOT EXISTS), бо нова БД уже отримує ті самі індекси
+та колонки від db.create_all() з описів моделей.
+"""
+from sqlalchemy import text
+from app.repositories.note_repository import NOTES_FTS_TRIGGERS
+from app.repositories.stats_repository import RECONCILE_STATEMENTS
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    """Перевірити наявність колонки в таблиці"""
+    return any(row[1] == column for row in conn.execute(text(f'PRAGMA table_info({table})')))
+
+
+def add_column(table: str, column: str, ddl: str):
+    """Крок міграції: ALTER TABLE ADD COLUMN, якщо колонки ще немає"""
+    def step(conn):
+        if not _column_exists(conn, table, column):
+            conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+    return step
+
+
+def drop_column(table: str, column: str):
+    """Крок міграції: ALTER TABLE DROP COLUMN, якщо колонка існує"""
+    def step(conn):
+        if _column_exists(conn, table, column):
+            conn.execute(text(f'ALTER TABLE {table} DROP COLUMN {column}'))
+    return step
+
+
+MIGRATIONS = [
+    (1, 'notes_user_id_created_at_indexes', [
+        # find_by_user_id / find_page(user_id=...): фільтр за user_id + сортування
+        'CREATE INDEX IF NOT EXISTS ix_notes_user_id_created_at '
+        'ON notes (user_id, created_at DESC, id DESC)',
+        # find_all / find_page() для ADMIN: сортування без фільтра
+        'CREATE INDEX IF NOT EXISTS ix_notes_created_at '
+        'ON notes (created_at DESC, id DESC)',
+    ], [
+        'DROP INDEX IF EXISTS ix_notes_created_at',
+        'DROP INDEX IF EXISTS ix_notes_user_id_created_at',
+    ]),
+    (2, 'users_email_lower_unique_index', [
+        'CREATE UNIQUE INDEX IF NOT EXISTS ux_users_email_lower '
+        'ON users (lower(email))',
+    ], [
+        'DROP INDEX IF EXISTS ux_users_email_lower',
+    ]),
+    (3, 'notes_fts5_search', [
+        # Повнотекстовий індекс із зовнішнім вмістом: тексти не дублюються,
+        # FTS зберігає лише інвертований індекс по notes.title / notes.content
+        "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+        "title, content, content='notes', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        # Тригери синхронізують індекс з будь-якими змінами notes
+        *NOTES_FTS_TRIGGERS.values(),
+        # Проіндексувати нотатки, які вже існують
+        "INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')",
+    ], [
+        'DROP TRIGGER IF EXISTS notes_fts_au',
+        'DROP TRIGGER IF EXISTS notes_fts_ad',
+        'DROP TRIGGER IF EXISTS notes_fts_ai',
+        'DROP TABLE IF EXISTS notes_fts',
+    ]),
+    (4, 'conditional_get_versions', [
+        # Час останньої зміни користувача для ETag / Last-Modified
+        # (SQLite не дозволяє DEFAULT CURRENT_TIMESTAMP в ADD COLUMN,
+        # тому значення виставляє ORM; у старих рядків - NULL)
+        add_column('users', 'updated_at', 'DATETIME'),
+        # Індекси під тодішні версії списків (COUNT(*) / MAX(updated_at));
+        # версії тепер беруться з лічильників stat_counters, а зайві з цих
+        # індексів прибирає міграція 7
+        'CREATE INDEX IF NOT EXISTS ix_notes_user_id_updated_at ON notes (user_id, updated_at)',
+        'CREATE INDEX IF NOT EXISTS ix_notes_updated_at ON notes (updated_at)',
+        'CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at)',
+    ], [
+        'DROP INDEX IF EXISTS ix_users_updated_at',
+        'DROP INDEX IF EXISTS ix_notes_updated_at',
+        'DROP INDEX IF EXISTS ix_notes_user_id_updated_at',
+        drop_column('users', 'updated_at'),
+    ]),
+    (5, 'incremental_stats_counters', [
+        # Лічильники, які оновлюються в транзакціях запису замість COUNT(*) на кожен запит
+        'CREATE TABLE IF NOT EXISTS stat_counters ('
+        'name VARCHAR(50) NOT NULL PRIMARY KEY, value INTEGER NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS user_note_stats ('
+        'user_id INTEGER NOT NULL PRIMARY KEY, note_count INTEGER NOT NULL, '
+        'content_size INTEGER NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS ix_user_note_stats_note_count '
+        'ON user_note_stats (note_count DESC)',
+        'CREATE TABLE IF NOT EXISTS note_daily_stats ('
+        'day DATE NOT NULL PRIMARY KEY, created INTEGER NOT NULL)',
+        # Початкове заповнення з наявних даних
+        *RECONCILE_STATEMENTS,
+    ], [
+        'DROP TABLE IF EXISTS note_daily_stats',
+        'DROP INDEX IF EXISTS ix_user_note_stats_note_count',
+        'DROP TABLE IF EXISTS user_note_stats',
+        'DROP TABLE IF EXISTS stat_counters',
+    ]),
+    (6, 'write_sensitive_versions', [
+        # Версія рядка нотатки і ревізії списків для ETag: змінюються кожним
+        # записом, на відміну від updated_at з точністю до секунди
+        add_column('notes', 'version', 'INTEGER NOT NULL DEFAULT 1'),
+        add_column('user_note_stats', 'revision', 'INTEGER NOT NULL DEFAULT 0'),
+    ], [
+        drop_column('user_note_stats', 'revision'),
+        drop_column('notes', 'version'),
+    ]),
+    (7, 'drop_list_version_indexes', [
+        # Версії списків читаються з лічильників, MAX(updated_at) більше не рахується;
+        # підрахунки за user_id покриває ix_notes_user_id_created_at.
+        # ix_notes_updated_at лишається для сортування прев'ю за updated_at
+        'DROP INDEX IF EXISTS ix_users_updated_at',
+        'DROP INDEX IF EXISTS ix_notes_user_id_updated_at',
+    ], [
+        'CREATE INDEX IF NOT EXISTS ix_notes_user_id_updated_at ON notes (user_id, updated_at)',
+        'CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at)',
+    ]),
+]
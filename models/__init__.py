@@ -1,5 +1,8 @@
 from .user import User
 from .note import Note
+from .user_snapshot import UserSnapshot
+from .read_models import NoteView, UserView
+from .stats import StatCounter, UserNoteStats, NoteDailyStats
 
-__all__ = ['User', 'Note']
+__all__ = ['User', 'Note', 'UserSnapshot', 'NoteView', 'UserView', 'StatCounter', 'UserNoteStats', 'NoteDailyStats']
 
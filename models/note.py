@@ -12,10 +12,21 @@ class Note(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), 
                           onupdate=db.func.current_timestamp())
+    # Номер версії рядка для ETag: кожен UPDATE збільшує його на 1
+    # (updated_at має точність до секунди)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1',
+                        onupdate=db.literal_column('version') + 1)
     
     # Зовнішній ключ до користувача
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
+    # Індекси під списки нотаток (див. migrations/versions.py)
+    __table_args__ = (
+        db.Index('ix_notes_user_id_created_at', user_id, created_at.desc(), id.desc()),
+        db.Index('ix_notes_created_at', created_at.desc(), id.desc()),
+        db.Index('ix_notes_updated_at', updated_at),
+    )
+    
     def __repr__(self):
         return f'<Note {self.title}>'
     
@@ -0,0 +1,63 @@
+from typing import Optional
+
+
+def iso_timestamp(value: Optional[str]) -> Optional[str]:
+    """
+    Час з БД ('YYYY-MM-DD HH:MM:SS[.ffffff]') у форматі datetime.isoformat()
+    без розбору в datetime; нульові мікросекунди відкидаються, як і в isoformat()
+    """
+    if value is None:
+        return None
+    value = value.replace(' ', 'T', 1)
+    if value.endswith('.000000'):
+        value = value[:-7]
+    return value
+
+
+class ReadModel:
+    """
+    Легка модель читання для списків: рядок Core-запиту без ORM-об'єкта
+    (без identity map і відстеження змін). Поля - __slots__ у порядку колонок
+    запиту; JSON-провайдер серіалізує її напряму (див. app/json_provider.py)
+    """
+    
+    __slots__ = ()
+    
+    def to_dict(self):
+        """Серіалізація в словник (та сама схема, що й у to_dict() ORM-моделі)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class NoteView(ReadModel):
+    """Нотатка для списків, схема як у Note.to_dict()"""
+    
+    __slots__ = ('id', 'title', 'content', 'user_id', 'author_username', 'created_at', 'updated_at')
+    
+    def __init__(self, id, title, content, user_id, author_username, created_at, updated_at):
+        self.id = id
+        self.title = title
+        self.content = content
+        self.user_id = user_id
+        self.author_username = author_username
+        self.created_at = iso_timestamp(created_at)
+        self.updated_at = iso_timestamp(updated_at)
+    
+    def __repr__(self):
+        return f'<NoteView {self.title}>'
+
+
+class UserView(ReadModel):
+    """Користувач для списків, схема як у User.to_dict()"""
+    
+    __slots__ = ('id', 'username', 'email', 'role', 'created_at')
+    
+    def __init__(self, id, username, email, role, created_at):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+        self.created_at = iso_timestamp(created_at)
+    
+    def __repr__(self):
+        return f'<UserView {self.username}>'
+
@@ -0,0 +1,49 @@
+from app import db
+
+
+class StatCounter(db.Model):
+    """
+    Глобальний лічильник статистики (users, notes, content_size) або ревізія
+    списку (users_revision, notes_revision), що збільшується кожним записом
+    """
+    
+    __tablename__ = 'stat_counters'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<StatCounter {self.name}={self.value}>'
+
+
+class UserNoteStats(db.Model):
+    """Кількість нотаток і сумарний розмір їх вмісту для одного користувача"""
+    
+    __tablename__ = 'user_note_stats'
+    
+    user_id = db.Column(db.Integer, primary_key=True)
+    note_count = db.Column(db.Integer, nullable=False, default=0)
+    content_size = db.Column(db.Integer, nullable=False, default=0)
+    # Збільшується кожною зміною нотаток користувача - версія його списку для ETag
+    revision = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Рейтинг користувачів за кількістю нотаток
+    __table_args__ = (
+        db.Index('ix_user_note_stats_note_count', note_count.desc()),
+    )
+    
+    def __repr__(self):
+        return f'<UserNoteStats {self.user_id}: {self.note_count}>'
+
+
+class NoteDailyStats(db.Model):
+    """Кількість нотаток, створених за день (UTC)"""
+    
+    __tablename__ = 'note_daily_stats'
+    
+    day = db.Column(db.Date, primary_key=True)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<NoteDailyStats {self.day}: {self.created}>'
+
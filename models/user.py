@@ -13,10 +13,17 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='USER')  # USER або ADMIN
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(),
+                          onupdate=db.func.current_timestamp(), index=True)
     
     # Зв'язок один-до-багатьох з нотатками
     notes = db.relationship('Note', backref='author', lazy=True, cascade='all, delete-orphan')
     
+    # Email унікальний без урахування регістру (див. migrations/versions.py)
+    __table_args__ = (
+        db.Index('ux_users_email_lower', db.func.lower(email), unique=True),
+    )
+    
     def __repr__(self):
         return f'<User {self.username}>'
     
@@ -0,0 +1,42 @@
+from flask_login import UserMixin
+
+
+class UserSnapshot(UserMixin):
+    """
+    Незмінний знімок користувача для current_user (кеш user_loader)
+    Не прив'язаний до сесії БД, тому його можна безпечно ділити між запитами
+    """
+    
+    __slots__ = ('id', 'username', 'email', 'role', 'created_at', 'updated_at')
+    
+    def __init__(self, id, username, email, role, created_at=None, updated_at=None):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+        self.created_at = created_at
+        self.updated_at = updated_at
+    
+    @classmethod
+    def from_user(cls, user) -> 'UserSnapshot':
+        """Зробити знімок з ORM-об'єкта User"""
+        return cls(user.id, user.username, user.email, user.role,
+                   user.created_at, user.updated_at)
+    
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+    
+    def to_dict(self):
+        """Серіалізація об'єкта в словник (як User.to_dict)"""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'role': self.role,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    def is_admin(self):
+        """Перевірка чи є користувач адміністратором"""
+        return self.role == 'ADMIN'
+
@@ -0,0 +1,217 @@
+"""
+Замовлення магазину (app.py) через outbox у SQLite
+
+Checkout лише дописує замовлення в таблицю order_outbox одним коротким
+INSERT і одразу відповідає клієнту. Фоновий потік забирає записи outbox
+порціями й переносить їх у orders / order_lines однією транзакцією на
+порцію, видаляючи оброблені записи в тій самій транзакції - тож замовлення
+не губиться й не дублюється навіть після падіння процесу: необроблений
+outbox дочитується при наступному запуску.
+
+Помилка запису порції не зупиняє потік: вона логується, а порція
+повторюється після паузи, що зростає з кожною невдачею. Запис, який не
+вдається розібрати або вставити (poison), переноситься в order_outbox_failed
+разом з текстом помилки, щоб не блокувати чергу за ним.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    # AUTOINCREMENT - id outbox не перевикористовуються після видалення
+    # рядків, тож вони ж слугують id замовлень
+    'CREATE TABLE IF NOT EXISTS order_outbox ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, '
+    'created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)',
+    'CREATE TABLE IF NOT EXISTS orders ('
+    'id INTEGER PRIMARY KEY, email TEXT, address TEXT, total INTEGER NOT NULL, '
+    'created_at TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS order_lines ('
+    'order_id INTEGER NOT NULL REFERENCES orders (id), item_id INTEGER NOT NULL, '
+    'name TEXT NOT NULL, price INTEGER NOT NULL, quantity INTEGER NOT NULL, '
+    'PRIMARY KEY (order_id, item_id)) WITHOUT ROWID',
+    # Записи outbox, які не вдалося перенести, - для ручного розбору
+    'CREATE TABLE IF NOT EXISTS order_outbox_failed ('
+    'id INTEGER PRIMARY KEY, payload TEXT NOT NULL, created_at TEXT NOT NULL, '
+    'error TEXT NOT NULL, failed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)',
+)
+
+
+class OrderQueueFull(Exception):
+    """Outbox переповнений - фоновий потік не встигає, замовлення не прийнято"""
+
+
+class OrderQueue:
+    """
+    Durable-черга замовлень: outbox у SQLite + фоновий потік пакетного запису
+    
+    max_pending - скільки необроблених замовлень може лежати в outbox; понад
+    це enqueue кидає OrderQueueFull (зворотний тиск замість нескінченної черги)
+    retry_delay / max_retry_delay - пауза перед повтором після помилки запису
+    (подвоюється з кожною невдачею поспіль, секунд)
+    """
+    
+    def __init__(self, path, batch_size=200, flush_interval=0.05, max_pending=10000,
+                 synchronous='NORMAL', retry_delay=0.5, max_retry_delay=30):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.synchronous = synchronous
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._worker = None
+        
+        self._conn = self._connect()
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+        # Необроблені записи з попереднього запуску обробить фоновий потік
+        self._pending = self._conn.execute('SELECT count(*) FROM order_outbox').fetchone()[0]
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        return conn
+    
+    @property
+    def pending(self):
+        """Кількість замовлень, ще не перенесених з outbox"""
+        return self._pending
+    
+    def start(self):
+        """Запустити фоновий потік запису"""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='order-outbox', daemon=True)
+            self._worker.start()
+            if self._pending:
+                self._wakeup.set()
+    
+    def stop(self, timeout=10):
+        """Зупинити фоновий потік, дописавши все, що є в outbox"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+    
+    def enqueue(self, email, address, cart):
+        """
+        Записати замовлення в outbox і повернути його id
+        cart - Cart з cart_store (позиції та total)
+        """
+        payload = json.dumps({
+            'email': email,
+            'address': address,
+            'total': cart.total,
+            'lines': [[line['id'], line['name'], line['price'], line['quantity']]
+                      for line in cart.items.values()],
+        }, ensure_ascii=False)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise OrderQueueFull()
+            order_id = self._conn.execute('INSERT INTO order_outbox (payload) VALUES (?)',
+                                          (payload,)).lastrowid
+            self._conn.commit()
+            self._pending += 1
+        self._wakeup.set()
+        return order_id
+    
+    def _run(self):
+        conn = self._connect()
+        delay = 0
+        try:
+            while True:
+                # Після помилки - повтор через delay, навіть без нових замовлень
+                self._wakeup.wait(delay or None)
+                self._wakeup.clear()
+                if not self._stopping and not delay:
+                    # Коротка пауза збирає замовлення, що надходять одночасно, в одну порцію
+                    time.sleep(self.flush_interval)
+                try:
+                    while self._flush(conn):
+                        pass
+                except Exception:
+                    delay = min(delay * 2 or self.retry_delay, self.max_retry_delay)
+                    logger.exception('Не вдалося перенести замовлення з outbox, повтор через %s с', delay)
+                    if self._stopping:
+                        # Не тримати зупинку процесу: решту outbox дочитає наступний запуск
+                        return
+                    continue
+                delay = 0
+                if self._stopping:
+                    return
+        finally:
+            conn.close()
+    
+    def _flush(self, conn):
+        rows = conn.execute('SELECT id, payload, created_at FROM order_outbox ORDER BY id LIMIT ?',
+                            (self.batch_size,)).fetchall()
+        if not rows:
+            return 0
+        
+        try:
+            self._write(conn, rows)
+        except sqlite3.OperationalError:
+            # БД зайнята або недоступна - уся порція повториться після паузи
+            raise
+        except sqlite3.Error:
+            # Порцію відхилив якийсь із записів: переносимо їх по одному,
+            # відкладаючи ті, що не вставляються
+            for row in rows:
+                try:
+                    self._write(conn, [row])
+                except sqlite3.OperationalError:
+                    raise
+                except sqlite3.Error as error:
+                    self._write(conn, [row], error=f'{type(error).__name__}: {error}')
+        return len(rows)
+    
+    def _write(self, conn, rows, error=None):
+        """
+        Перенести записи outbox в orders / order_lines однією транзакцією
+        error - не вставляти, а відкласти всі записи в order_outbox_failed
+        """
+        orders = []
+        lines = []
+        failed = []
+        for order_id, payload, created_at in rows:
+            if error is not None:
+                failed.append((order_id, payload, created_at, error))
+                continue
+            try:
+                order = json.loads(payload)
+                order_lines = [(order_id, item_id, name, price, quantity)
+                               for item_id, name, price, quantity in order['lines']]
+                orders.append((order_id, order['email'], order['address'], int(order['total']),
+                               created_at))
+            except (ValueError, KeyError, TypeError) as parse_error:
+                failed.append((order_id, payload, created_at,
+                               f'{type(parse_error).__name__}: {parse_error}'))
+                continue
+            lines.extend(order_lines)
+        
+        # Замовлення, рядки, відкладені записи й видалення з outbox - одна транзакція
+        with conn:
+            conn.executemany('INSERT OR IGNORE INTO orders (id, email, address, total, created_at) '
+                             'VALUES (?, ?, ?, ?, ?)', orders)
+            conn.executemany('INSERT OR IGNORE INTO order_lines (order_id, item_id, name, price, quantity) '
+                             'VALUES (?, ?, ?, ?, ?)', lines)
+            conn.executemany('INSERT OR REPLACE INTO order_outbox_failed (id, payload, created_at, error) '
+                             'VALUES (?, ?, ?, ?)', failed)
+            conn.execute('DELETE FROM order_outbox WHERE id BETWEEN ? AND ?', (rows[0][0], rows[-1][0]))
+        
+        with self._lock:
+            self._pending -= len(rows)
+        if failed:
+            logger.error('Замовлення відкладено в order_outbox_failed: %s',
+                         ', '.join(str(row[0]) for row in failed))
+
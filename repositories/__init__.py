@@ -1,5 +1,6 @@
 from .user_repository import UserRepository
 from .note_repository import NoteRepository
+from .stats_repository import StatsRepository
 
-__all__ = ['UserRepository', 'NoteRepository']
+__all__ = ['UserRepository', 'NoteRepository', 'StatsRepository']
 
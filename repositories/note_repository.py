@@ -1,16 +1,82 @@
 from app import db
 from app.models.note import Note
-from typing import Optional, List
+from app.models.user import User
+from app.models.read_models import NoteView
+from app.database import retry_on_busy
+from app.session_routing import route_reads
+from datetime import datetime
+from typing import Optional, List, Tuple, Dict, Iterator, Iterable
 
+# Віртуальна FTS5-таблиця з міграції notes_fts5_search (поза метаданими моделей)
+notes_fts = db.table('notes_fts', db.column('rowid'), db.column('notes_fts'), db.column('rank'))
 
+# Тригери, що синхронізують notes_fts з будь-якими змінами notes
+NOTES_FTS_TRIGGERS = {
+    'notes_fts_ai': 'CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN '
+                    'INSERT INTO notes_fts (rowid, title, content) '
+                    'VALUES (new.id, new.title, new.content); '
+                    'END',
+    'notes_fts_ad': 'CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN '
+                    "INSERT INTO notes_fts (notes_fts, rowid, title, content) "
+                    "VALUES ('delete', old.id, old.title, old.content); "
+                    'END',
+    'notes_fts_au': 'CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content ON notes BEGIN '
+                    "INSERT INTO notes_fts (notes_fts, rowid, title, content) "
+                    "VALUES ('delete', old.id, old.title, old.content); "
+                    'INSERT INTO notes_fts (rowid, title, content) '
+                    'VALUES (new.id, new.title, new.content); '
+                    'END',
+}
+
+# Маркери збігів у highlight()/snippet(); замінюються на <mark> після екранування
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+
+def db_timestamp(value: datetime) -> str:
+    """
+    Рядкове представлення часу у форматі, в якому SQLite зберігає
+    CURRENT_TIMESTAMP ('YYYY-MM-DD HH:MM:SS', мікросекунди - лише ненульові)
+    """
+    return value.isoformat(sep=' ')
+
+
+@route_reads
 class NoteRepository:
     """Repository для роботи з нотатками в базі даних"""
     
+    # Стратегії завантаження автора для списків нотаток:
+    # 'joined' - LEFT JOIN users у тому ж запиті (за замовчуванням),
+    # 'selectin' - один додатковий SELECT ... WHERE id IN (...) на всю вибірку
+    AUTHOR_LOADERS = {
+        'joined': db.joinedload,
+        'selectin': db.selectinload,
+    }
+    
+    # Колонки сортування таблиці нотаток адмін-панелі (усі мають індекс)
+    PREVIEW_SORT_COLUMNS = {
+        'created_at': Note.created_at,
+        'updated_at': Note.updated_at,
+        'id': Note.id,
+    }
+    
+    @staticmethod
+    def _with_author(query, author_loading: str = 'joined'):
+        """Додати до запиту завантаження автора, щоб уникнути N+1 запитів у to_dict()"""
+        loader = NoteRepository.AUTHOR_LOADERS[author_loading]
+        return query.options(loader(Note.author))
+    
     @staticmethod
-    def create(note: Note) -> Note:
-        """Створити нову нотатку"""
+    def create(note: Note, commit: bool = True) -> Note:
+        """
+        Створити нову нотатку
+        commit=False - лише flush (нотатка отримує id), фіксація - через commit()
+        """
         db.session.add(note)
-        db.session.commit()
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
         return note
     
     @staticmethod
@@ -19,27 +85,195 @@ class NoteRepository:
         return Note.query.get(note_id)
     
     @staticmethod
-    def find_all() -> List[Note]:
+    def find_all(author_loading: str = 'joined') -> List[Note]:
         """Отримати всі нотатки"""
-        return Note.query.order_by(Note.created_at.desc()).all()
+        query = NoteRepository._with_author(Note.query, author_loading)
+        return query.order_by(Note.created_at.desc()).all()
+    
+    @staticmethod
+    def find_by_user_id(user_id: int, author_loading: str = 'selectin') -> List[Note]:
+        """
+        Отримати всі нотатки конкретного користувача
+        Автор у всіх нотаток один, тому за замовчуванням - selectin (один рядок users)
+        """
+        query = NoteRepository._with_author(Note.query.filter_by(user_id=user_id), author_loading)
+        return query.order_by(Note.created_at.desc()).all()
+    
+    @staticmethod
+    def _view_query():
+        """
+        SELECT колонок NoteView з автором через LEFT JOIN
+        Час вибирається сирим рядком (type_coerce): NoteView сам приводить його
+        до isoformat() без розбору в datetime
+        """
+        return db.select(
+            Note.id, Note.title, Note.content, Note.user_id, User.username,
+            db.type_coerce(Note.created_at, db.String), db.type_coerce(Note.updated_at, db.String)
+        ).outerjoin(User, User.id == Note.user_id)
+    
+    @staticmethod
+    def find_views(user_id: Optional[int] = None) -> List[NoteView]:
+        """
+        Усі нотатки (або нотатки користувача user_id), новіші першими, як NoteView
+        Для списків лише для читання, які кешуються цілими (NoteService)
+        """
+        query = NoteRepository._view_query()
+        if user_id is not None:
+            query = query.where(Note.user_id == user_id)
+        query = query.order_by(Note.created_at.desc(), Note.id.desc())
+        return [NoteView(*row) for row in db.session.execute(query)]
+    
+    @staticmethod
+    def find_page(limit: int, user_id: Optional[int] = None,
+                  after: Optional[Tuple[datetime, int]] = None) -> List[NoteView]:
+        """
+        Отримати сторінку нотаток (keyset-пагінація за (created_at, id))
+        
+        after - ключ останньої нотатки попередньої сторінки; наступна сторінка
+        починається одразу після нього, тому вартість запиту не залежить від
+        глибини гортання (на відміну від OFFSET)
+        
+        Список лише для читання, тому повертаються легкі NoteView з рядків
+        Core-запиту, а не ORM-об'єкти
+        """
+        query = NoteRepository._view_query()
+        if user_id is not None:
+            query = query.where(Note.user_id == user_id)
+        if after is not None:
+            # SQLite зберігає CURRENT_TIMESTAMP без мікросекунд, а DateTime-параметр
+            # SQLAlchemy завжди рендерить з ними, тому ключ порівнюється як рядок
+            # у тому ж форматі, що й збережене значення
+            created_at, note_id = after
+            key = db.literal(db_timestamp(created_at), db.String)
+            query = query.where(db.tuple_(Note.created_at, Note.id) < db.tuple_(key, note_id))
+        query = query.order_by(Note.created_at.desc(), Note.id.desc()).limit(limit)
+        return [NoteView(*row) for row in db.session.execute(query)]
+    
+    @staticmethod
+    def search(match: str, limit: int, offset: int = 0,
+               user_id: Optional[int] = None) -> List[Tuple[NoteView, str, str]]:
+        """
+        Повнотекстовий пошук нотаток (FTS5), найрелевантніші першими
+        Повертає (нотатка, заголовок з маркерами збігів, фрагмент вмісту з маркерами)
+        """
+        query = NoteRepository._view_query().add_columns(
+            db.func.highlight(notes_fts.c.notes_fts, 0, MATCH_START, MATCH_END),
+            db.func.snippet(notes_fts.c.notes_fts, 1, MATCH_START, MATCH_END, '…', 16),
+        ).join(notes_fts, notes_fts.c.rowid == Note.id)
+        query = query.where(notes_fts.c.notes_fts.match(match))
+        if user_id is not None:
+            query = query.where(Note.user_id == user_id)
+        query = query.order_by(notes_fts.c.rank, Note.id).limit(limit).offset(offset)
+        return [(NoteView(*row[:7]), row[7], row[8]) for row in db.session.execute(query)]
+    
+    @staticmethod
+    @retry_on_busy
+    def rebuild_search_index() -> None:
+        """Перебудувати FTS-індекс з поточного вмісту таблиці notes"""
+        db.session.execute(notes_fts.insert().values(notes_fts='rebuild'))
+        db.session.commit()
     
     @staticmethod
-    def find_by_user_id(user_id: int) -> List[Note]:
-        """Отримати всі нотатки конкретного користувача"""
-        return Note.query.filter_by(user_id=user_id).order_by(Note.created_at.desc()).all()
+    def drop_search_triggers() -> None:
+        """
+        Вимкнути синхронізацію FTS-індексу (для масового завантаження:
+        один rebuild наприкінці швидший за оновлення індексу на кожен рядок)
+        """
+        for name in NOTES_FTS_TRIGGERS:
+            db.session.execute(db.text(f'DROP TRIGGER IF EXISTS {name}'))
+        db.session.commit()
     
     @staticmethod
-    def update(note: Note) -> Note:
-        """Оновити нотатку"""
+    def create_search_triggers() -> None:
+        """Увімкнути синхронізацію FTS-індексу (див. drop_search_triggers)"""
+        for statement in NOTES_FTS_TRIGGERS.values():
+            db.session.execute(db.text(statement))
         db.session.commit()
+    
+    @staticmethod
+    def iter_export_rows(user_id: Optional[int] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Потоково перебрати нотатки для експорту (у порядку id)
+        Рядки Core без ORM-об'єктів вибираються порціями по batch_size (yield_per),
+        тому пам'ять не залежить від кількості нотаток
+        """
+        from app.models.user import User
+        
+        query = db.select(
+            Note.id, Note.title, Note.content, Note.user_id,
+            User.username.label('author_username'),
+            Note.created_at, Note.updated_at
+        ).outerjoin(User, User.id == Note.user_id).order_by(Note.id)
+        if user_id is not None:
+            query = query.where(Note.user_id == user_id)
+        
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for row in result.mappings():
+            yield row
+    
+    @staticmethod
+    def bulk_insert(rows: List[Dict], commit: bool = True) -> None:
+        """
+        Вставити порцію нотаток одним executemany та одним commit
+        Ключі рядків: title, content, user_id, created_at, updated_at
+        (час - рядками у форматі db_timestamp)
+        commit=False - вставка лише в поточну транзакцію
+        """
+        # Нетипізовані колонки: час передається вже відформатованим рядком,
+        # щоб збігатися з форматом CURRENT_TIMESTAMP (див. find_page)
+        notes = db.table('notes', db.column('title'), db.column('content'), db.column('user_id'),
+                         db.column('created_at'), db.column('updated_at'))
+        db.session.execute(notes.insert(), rows)
+        if commit:
+            db.session.commit()
+    
+    @staticmethod
+    def find_by_ids(note_ids: List[int]) -> Dict[int, Note]:
+        """Знайти нотатки за списком ID одним запитом: {id: нотатка}"""
+        if not note_ids:
+            return {}
+        notes = Note.query.filter(Note.id.in_(set(note_ids))).all()
+        return {note.id: note for note in notes}
+    
+    @staticmethod
+    def update(note: Note, commit: bool = True) -> Note:
+        """Оновити нотатку (commit=False - лише flush у поточну транзакцію)"""
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
         return note
     
     @staticmethod
-    def delete(note: Note) -> None:
-        """Видалити нотатку"""
+    def delete(note: Note, commit: bool = True) -> None:
+        """Видалити нотатку (commit=False - лише flush у поточну транзакцію)"""
         db.session.delete(note)
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
+    
+    @staticmethod
+    def commit() -> None:
+        """Зафіксувати поточну транзакцію"""
         db.session.commit()
     
+    @staticmethod
+    def rollback() -> None:
+        """Відкотити поточну транзакцію"""
+        db.session.rollback()
+    
+    @staticmethod
+    def find_version(note_id: int):
+        """
+        Отримати лише (id, user_id, updated_at, version) нотатки - для перевірки
+        прав та ETag без завантаження вмісту; None, якщо нотатки немає
+        """
+        return db.session.execute(
+            db.select(Note.id, Note.user_id, Note.updated_at, Note.version)
+            .where(Note.id == note_id)
+        ).first()
+    
     @staticmethod
     def count_all() -> int:
         """Підрахувати загальну кількість нотаток"""
@@ -49,4 +283,33 @@ class NoteRepository:
     def count_by_user_id(user_id: int) -> int:
         """Підрахувати кількість нотаток користувача"""
         return Note.query.filter_by(user_id=user_id).count()
+    
+    @staticmethod
+    def count_by_user_ids(user_ids: Iterable[int]) -> Dict[int, int]:
+        """Кількість нотаток кожного користувача одним GROUP BY: {user_id: кількість}"""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return {}
+        query = db.select(Note.user_id, db.func.count(Note.id)) \
+            .where(Note.user_id.in_(user_ids)).group_by(Note.user_id)
+        return {user_id: count for user_id, count in db.session.execute(query)}
+    
+    @staticmethod
+    def find_previews(limit: int, offset: int = 0, sort: str = 'created_at',
+                      descending: bool = True, preview_length: int = 100) -> List:
+        """
+        Сторінка нотаток для таблиці адмін-панелі без повного вмісту
+        
+        Замість content вибирається лише його початок (preview_length + 1 символ,
+        щоб знати, чи його обрізано). sort - колонка з PREVIEW_SORT_COLUMNS;
+        id додається другим ключем для стабільного порядку.
+        """
+        column = NoteRepository.PREVIEW_SORT_COLUMNS[sort]
+        order = (column.desc(), Note.id.desc()) if descending else (column.asc(), Note.id.asc())
+        query = db.select(
+            Note.id, Note.title, Note.user_id, User.username.label('author_username'),
+            Note.created_at, Note.updated_at,
+            db.func.substr(Note.content, 1, preview_length + 1).label('preview')
+        ).join(User, User.id == Note.user_id).order_by(*order).limit(limit).offset(offset)
+        return db.session.execute(query).all()
 
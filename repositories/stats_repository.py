@@ -0,0 +1,142 @@
+from app import db
+from app.models.stats import StatCounter, UserNoteStats, NoteDailyStats
+from app.database import retry_on_busy
+from app.session_routing import route_reads
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert
+from typing import Optional, List, Dict, Tuple
+
+# Перерахунок лічильників з нуля (flask reconcile-stats та міграція 5)
+# Ревізії списків не скидаються: інакше версія списку для ETag могла б
+# повторити попередню при іншому вмісті
+RECONCILE_STATEMENTS = [
+    "DELETE FROM stat_counters WHERE name IN ('users', 'notes', 'content_size')",
+    'UPDATE user_note_stats SET note_count = 0, content_size = 0',
+    'DELETE FROM note_daily_stats',
+    "INSERT INTO stat_counters (name, value) SELECT 'users', COUNT(*) FROM users",
+    "INSERT INTO stat_counters (name, value) SELECT 'notes', COUNT(*) FROM notes",
+    "INSERT INTO stat_counters (name, value) "
+    "SELECT 'content_size', COALESCE(SUM(LENGTH(content)), 0) FROM notes",
+    'INSERT INTO user_note_stats (user_id, note_count, content_size) '
+    'SELECT user_id, COUNT(*), SUM(LENGTH(content)) FROM notes WHERE true GROUP BY user_id '
+    'ON CONFLICT (user_id) DO UPDATE SET '
+    'note_count = excluded.note_count, content_size = excluded.content_size',
+    'INSERT INTO note_daily_stats (day, created) '
+    'SELECT date(created_at), COUNT(*) FROM notes '
+    'WHERE created_at IS NOT NULL GROUP BY date(created_at)',
+]
+
+# Після перерахунку вміст списків міг змінитися без записів через сервіси
+# (наприклад, flask seed), тож їхні ревізії збільшуються
+BUMP_REVISIONS_STATEMENTS = [
+    "INSERT INTO stat_counters (name, value) VALUES ('users_revision', 1), ('notes_revision', 1) "
+    'ON CONFLICT (name) DO UPDATE SET value = value + 1',
+    'UPDATE user_note_stats SET revision = revision + 1',
+]
+
+
+@route_reads
+class StatsRepository:
+    """
+    Repository для інкрементальних лічильників статистики
+    Методи зміни не роблять commit - лічильники фіксуються в одній
+    транзакції з записом, який вони описують
+    """
+    
+    @staticmethod
+    def increment_counter(name: str, delta: int) -> None:
+        """Атомарно додати delta до глобального лічильника (UPSERT)"""
+        if not delta:
+            return
+        statement = insert(StatCounter).values(name=name, value=delta)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[StatCounter.name],
+            set_={'value': StatCounter.value + statement.excluded.value}
+        ))
+    
+    @staticmethod
+    def increment_user_notes(user_id: int, count_delta: int, size_delta: int) -> None:
+        """
+        Атомарно змінити кількість нотаток і розмір вмісту користувача
+        Кожен виклик описує зміну його нотаток, тож ревізія списку теж збільшується
+        """
+        statement = insert(UserNoteStats).values(
+            user_id=user_id, note_count=count_delta, content_size=size_delta, revision=1
+        )
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[UserNoteStats.user_id],
+            set_={
+                'note_count': UserNoteStats.note_count + statement.excluded.note_count,
+                'content_size': UserNoteStats.content_size + statement.excluded.content_size,
+                'revision': UserNoteStats.revision + 1,
+            }
+        ))
+    
+    @staticmethod
+    def increment_daily_created(day: date, delta: int) -> None:
+        """Атомарно додати delta до кількості нотаток, створених за день"""
+        if not delta:
+            return
+        statement = insert(NoteDailyStats).values(day=day, created=delta)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[NoteDailyStats.day],
+            set_={'created': NoteDailyStats.created + statement.excluded.created}
+        ))
+    
+    @staticmethod
+    def pop_user_notes(user_id: int) -> Tuple[int, int]:
+        """Видалити рядок статистики користувача; повертає (кількість, розмір)"""
+        stats = db.session.get(UserNoteStats, user_id)
+        if stats is None:
+            return 0, 0
+        values = (stats.note_count, stats.content_size)
+        db.session.delete(stats)
+        return values
+    
+    @staticmethod
+    def get_counters() -> Dict[str, int]:
+        """Отримати всі глобальні лічильники: {назва: значення}"""
+        return {name: value for name, value in
+                db.session.execute(db.select(StatCounter.name, StatCounter.value))}
+    
+    @staticmethod
+    def find_counters(*names: str) -> Tuple[int, ...]:
+        """Значення лічильників names у тому ж порядку (0 - лічильника ще немає)"""
+        values = dict(db.session.execute(
+            db.select(StatCounter.name, StatCounter.value).where(StatCounter.name.in_(names))
+        ).all())
+        return tuple(values.get(name, 0) for name in names)
+    
+    @staticmethod
+    def find_user_notes_version(user_id: int) -> Tuple[int, int]:
+        """(кількість нотаток, ревізія) користувача за первинним ключем"""
+        row = db.session.execute(
+            db.select(UserNoteStats.note_count, UserNoteStats.revision)
+            .where(UserNoteStats.user_id == user_id)
+        ).first()
+        return (row.note_count, row.revision) if row else (0, 0)
+    
+    @staticmethod
+    def find_user_notes(user_id: int) -> Optional[UserNoteStats]:
+        """Статистика нотаток користувача"""
+        return db.session.get(UserNoteStats, user_id)
+    
+    @staticmethod
+    def find_top_users(limit: int) -> List[UserNoteStats]:
+        """Користувачі з найбільшою кількістю нотаток (по індексу note_count)"""
+        return UserNoteStats.query.order_by(UserNoteStats.note_count.desc()).limit(limit).all()
+    
+    @staticmethod
+    def find_daily_created(since: date) -> List[NoteDailyStats]:
+        """Кількість створених нотаток по днях, починаючи з since"""
+        return NoteDailyStats.query.filter(NoteDailyStats.day >= since) \
+            .order_by(NoteDailyStats.day).all()
+    
+    @staticmethod
+    @retry_on_busy
+    def reconcile() -> None:
+        """Перерахувати всі лічильники з таблиць users / notes"""
+        for statement in RECONCILE_STATEMENTS + BUMP_REVISIONS_STATEMENTS:
+            db.session.execute(text(statement))
+        db.session.commit()
@@ -1,16 +1,33 @@
 from app import db
 from app.models.user import User
-from typing import Optional, List
+from app.models.stats import UserNoteStats
+from app.models.read_models import UserView
+from app.database import retry_on_busy
+from app.session_routing import route_reads
+from typing import Optional, List, Set, Iterable, Tuple, Dict
 
 
+@route_reads
 class UserRepository:
     """Repository для роботи з користувачами в базі даних"""
     
+    # Колонки сортування таблиці користувачів адмін-панелі
+    SORT_COLUMNS = {
+        'id': User.id,
+        'username': User.username,
+        'email': User.email,
+        'created_at': User.created_at,
+        'note_count': db.func.coalesce(UserNoteStats.note_count, 0),
+    }
+    
     @staticmethod
-    def create(user: User) -> User:
-        """Створити нового користувача"""
+    def create(user: User, commit: bool = True) -> User:
+        """Створити нового користувача (commit=False - лише flush у поточну транзакцію)"""
         db.session.add(user)
-        db.session.commit()
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
         return user
     
     @staticmethod
@@ -18,6 +35,14 @@ class UserRepository:
         """Знайти користувача за ID"""
         return User.query.get(user_id)
     
+    @staticmethod
+    def load_for_auth(user_id: int) -> Optional[User]:
+        """
+        Знайти користувача за ID завжди на основній БД (user_loader)
+        Відстала репліка повернула б стару роль або ще не створеного користувача
+        """
+        return User.query.get(user_id)
+    
     @staticmethod
     def find_by_username(username: str) -> Optional[User]:
         """Знайти користувача за username"""
@@ -25,14 +50,35 @@ class UserRepository:
     
     @staticmethod
     def find_by_email(email: str) -> Optional[User]:
-        """Знайти користувача за email"""
-        return User.query.filter_by(email=email).first()
+        """Знайти користувача за email (без урахування регістру)"""
+        return User.query.filter(db.func.lower(User.email) == email.lower()).first()
     
     @staticmethod
     def find_all() -> List[User]:
         """Отримати всіх користувачів"""
         return User.query.all()
     
+    @staticmethod
+    def find_all_views() -> List[UserView]:
+        """Отримати всіх користувачів як легкі UserView (для списків лише для читання)"""
+        query = db.select(User.id, User.username, User.email, User.role,
+                          db.type_coerce(User.created_at, db.String)).order_by(User.id)
+        return [UserView(*row) for row in db.session.execute(query)]
+    
+    @staticmethod
+    def find_page(limit: int, offset: int = 0, sort: str = 'id',
+                  descending: bool = False) -> List[User]:
+        """
+        Сторінка користувачів для таблиці адмін-панелі
+        sort - колонка з SORT_COLUMNS; note_count береться з лічильників user_note_stats
+        """
+        column = UserRepository.SORT_COLUMNS[sort]
+        order = (column.desc(), User.id.desc()) if descending else (column.asc(), User.id.asc())
+        query = User.query
+        if sort == 'note_count':
+            query = query.outerjoin(UserNoteStats, UserNoteStats.user_id == User.id)
+        return query.order_by(*order).limit(limit).offset(offset).all()
+    
     @staticmethod
     def update(user: User) -> User:
         """Оновити користувача"""
@@ -40,11 +86,24 @@ class UserRepository:
         return user
     
     @staticmethod
-    def delete(user: User) -> None:
-        """Видалити користувача"""
+    def delete(user: User, commit: bool = True) -> None:
+        """Видалити користувача (commit=False - лише flush у поточну транзакцію)"""
         db.session.delete(user)
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
+    
+    @staticmethod
+    def commit() -> None:
+        """Зафіксувати поточну транзакцію"""
         db.session.commit()
     
+    @staticmethod
+    def rollback() -> None:
+        """Відкотити поточну транзакцію"""
+        db.session.rollback()
+    
     @staticmethod
     def exists_by_username(username: str) -> bool:
         """Перевірити чи існує користувач з таким username"""
@@ -52,6 +111,76 @@ class UserRepository:
     
     @staticmethod
     def exists_by_email(email: str) -> bool:
-        """Перевірити чи існує користувач з таким email"""
-        return User.query.filter_by(email=email).first() is not None
+        """Перевірити чи існує користувач з таким email (без урахування регістру)"""
+        return User.query.filter(db.func.lower(User.email) == email.lower()).first() is not None
+    
+    @staticmethod
+    def find_existing_ids(user_ids: Iterable[int]) -> Set[int]:
+        """Повернути ті з переданих ID, для яких існують користувачі (один IN-запит)"""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return set()
+        rows = db.session.execute(db.select(User.id).where(User.id.in_(user_ids)))
+        return {row[0] for row in rows}
+    
+    @staticmethod
+    def find_ids_by_usernames(usernames: Iterable[str]) -> Dict[str, int]:
+        """ID користувачів за списком username одним IN-запитом: {username: id}"""
+        usernames = set(usernames)
+        if not usernames:
+            return {}
+        rows = db.session.execute(db.select(User.username, User.id).where(User.username.in_(usernames)))
+        return {username: user_id for username, user_id in rows}
+    
+    @staticmethod
+    def find_taken(usernames: Iterable[str], emails: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        Які з username і email уже зайняті - одним запитом з IN
+        Email порівнюються в нижньому регістрі (індекс ux_users_email_lower)
+        Повертає (зайняті username, зайняті email у нижньому регістрі)
+        """
+        usernames = set(usernames)
+        emails = {email.lower() for email in emails}
+        if not usernames and not emails:
+            return set(), set()
+        email = db.func.lower(User.email)
+        rows = db.session.execute(
+            db.select(User.username, email).where(db.or_(User.username.in_(usernames), email.in_(emails)))
+        )
+        taken_usernames, taken_emails = set(), set()
+        for username, lower_email in rows:
+            if username in usernames:
+                taken_usernames.add(username)
+            if lower_email in emails:
+                taken_emails.add(lower_email)
+        return taken_usernames, taken_emails
+    
+    @staticmethod
+    def bulk_insert(rows: List[Dict], commit: bool = True) -> None:
+        """
+        Вставити порцію користувачів одним executemany
+        Ключі рядків: username, email, password_hash, role, created_at, updated_at
+        (час - рядками у форматі db_timestamp)
+        """
+        users = db.table('users', db.column('username'), db.column('email'),
+                         db.column('password_hash'), db.column('role'),
+                         db.column('created_at'), db.column('updated_at'))
+        db.session.execute(users.insert(), rows)
+        if commit:
+            db.session.commit()
+    
+    @staticmethod
+    @retry_on_busy
+    def replace_password_hash(user_id: int, old_hash: str, new_hash: str) -> bool:
+        """
+        Замінити хеш пароля, лише якщо він не змінився з моменту читання
+        (паралельна зміна пароля не буде перезаписана перехешуванням)
+        """
+        result = db.session.execute(
+            db.update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        db.session.commit()
+        return result.rowcount == 1
 
@@ -3,7 +3,9 @@
 Точка входу для запуску Flask застосунку
 """
 
+import click
 from app import create_app, db
+from app.migrations import upgrade, downgrade
 from app.models import User, Note
 from app.services.user_service import UserService
 
@@ -14,9 +16,12 @@ app = create_app()
 def init_db():
     """Ініціалізувати базу даних з тестовими даними"""
     with app.app_context():
-        # Видалити всі таблиці та створити заново
-        db.drop_all()
-        db.create_all()
+        # Видалити всі таблиці (разом з об'єктами міграцій) та створити заново
+        # (лише на основній БД; репліка отримує схему копіюванням)
+        downgrade()
+        db.drop_all(bind_key=None)
+        db.create_all(bind_key=None)
+        upgrade()
         
         # Створити тестових користувачів
         print("Створення тестових користувачів...")
@@ -74,6 +79,104 @@ def init_db():
         print("\n✅ База даних успішно ініціалізована!")
 
 
+@app.cli.command()
+def rebuild_search_index():
+    """Перебудувати повнотекстовий індекс нотаток"""
+    from app.services.note_service import NoteService
+    
+    with app.app_context():
+        NoteService.rebuild_search_index()
+        print("✓ Пошуковий індекс нотаток перебудовано")
+
+
+@app.cli.command()
+@click.option('--users', type=int, default=1000, help='Кількість користувачів')
+@click.option('--notes-per-user', type=int, default=100, help='Кількість нотаток на користувача')
+@click.option('--seed', 'seed_value', type=int, default=0, help='Зерно генератора (однакове - однакові дані)')
+@click.option('--password', default='password123', help='Спільний пароль синтетичних користувачів')
+@click.option('--prefix', default='seed', help='Префікс username (seed0, seed1, ...)')
+@click.option('--batch-size', type=int, default=10000, help='Рядків в одній пакетній вставці')
+def seed(users, notes_per_user, seed_value, password, prefix, batch_size):
+    """Згенерувати великий відтворюваний набір користувачів і нотаток"""
+    import time
+    from app.services.seed_service import SeedService
+    
+    started = time.perf_counter()
+    
+    def progress(kind, done, total):
+        elapsed = time.perf_counter() - started
+        percent = done * 100 // total if total else 100
+        print(f"  {kind}: {done}/{total} ({percent}%), {elapsed:.1f} с", flush=True)
+    
+    with app.app_context():
+        try:
+            SeedService.seed(users, notes_per_user, seed=seed_value, password=password,
+                             username_prefix=prefix, batch_size=batch_size, progress=progress)
+        except ValueError as error:
+            raise click.ClickException(str(error))
+    
+    print(f"✓ Створено користувачів: {users}, нотаток: {users * notes_per_user} "
+          f"за {time.perf_counter() - started:.1f} с (пароль: {password})")
+
+
+@app.cli.command()
+def reconcile_stats():
+    """Перерахувати лічильники статистики з таблиць users / notes"""
+    from app.services.stats_service import StatsService
+    
+    with app.app_context():
+        before = StatsService.get_summary(days=1)
+        StatsService.reconcile()
+        after = StatsService.get_summary(days=1)
+    
+    for key in ('total_users', 'total_notes', 'total_content_size'):
+        drift = after[key] - before[key]
+        mark = '✓' if drift == 0 else '✗'
+        print(f"{mark} {key}: {after[key]} (розбіжність: {drift:+d})")
+
+
+@app.cli.command()
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default='ndjson',
+              help='Формат експорту')
+@click.option('--gzip', 'compress', is_flag=True, help='Стиснути експорт gzip')
+@click.option('--user-id', type=int, default=None, help='Експортувати нотатки лише цього користувача')
+@click.option('--output', type=click.File('wb'), default='-', help='Файл експорту (за замовчуванням stdout)')
+def export_notes(fmt, compress, user_id, output):
+    """Потоково експортувати нотатки в NDJSON/CSV"""
+    from app.services.note_export_service import NoteExportService
+    
+    with app.app_context():
+        for chunk in NoteExportService.export_notes(
+                fmt, user_id=user_id, compress=compress,
+                batch_size=app.config['NOTES_EXPORT_BATCH_SIZE']):
+            output.write(chunk)
+
+
+@app.cli.command()
+@click.argument('source', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default=None,
+              help='Формат файлу (за замовчуванням - за розширенням)')
+@click.option('--user-id', type=int, default=None,
+              help='Власник усіх нотаток (за замовчуванням - user_id з файлу)')
+def import_notes(source, fmt, user_id):
+    """Імпортувати нотатки з файлу експорту пакетними вставками"""
+    from app.services.note_export_service import NoteExportService
+    
+    fmt = fmt or ('csv' if '.csv' in source.name else 'ndjson')
+    
+    with app.app_context():
+        report = NoteExportService.import_notes(
+            source, fmt, owner_id=user_id,
+            batch_size=app.config['NOTES_IMPORT_BATCH_SIZE']
+        )
+    
+    print(f"✓ Імпортовано нотаток: {report['imported']}")
+    if report['failed']:
+        print(f"✗ Помилок: {report['failed']}")
+        for error in report['errors']:
+            print(f"   рядок {error['line']}: {error['error']}")
+
+
 @app.shell_context_processor
 def make_shell_context():
     """Додати змінні до контексту Flask shell"""
@@ -1,5 +1,10 @@
 from .user_service import UserService
 from .note_service import NoteService
+from .note_export_service import NoteExportService
+from .stats_service import StatsService
+from .seed_service import SeedService
+from .user_import_service import UserImportService
 
-__all__ = ['UserService', 'NoteService']
+__all__ = ['UserService', 'NoteService', 'NoteExportService', 'StatsService', 'SeedService',
+           'UserImportService']
 
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Потокобезпечний in-process кеш з витісненням LRU, TTL та обліком розміру
+    
+    max_entries - максимальна кількість ключів
+    max_size    - максимальний сумарний розмір значень (у одиницях sizeof)
+    sizeof      - функція розміру значення (за замовчуванням кожне значення = 1)
+    
+    Заповнення після промаху: generation(key) перед завантаженням значення,
+    set(key, value, generation) після нього. Якщо між ними ключ скинули
+    (delete / clear), значення могло завантажитись до зміни й не кешується.
+    Скидання пам'ятаються лише ttl секунд: заповнення, що триває довше,
+    не кешується взагалі, тож журнал скидань не росте без меж.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0, max_size: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sizeof = sizeof or (lambda value: 1)
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._seq = 0  # лічильник подій generation / delete / clear
+        self._deleted = OrderedDict()  # key -> (seq, час) останнього delete(key), за часом
+        self._cleared = 0  # seq останнього clear()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Отримати значення (None - немає або протерміноване)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def generation(self, key: Hashable) -> Tuple[int, float]:
+        """Мітка початку заповнення key: (seq, час); див. set"""
+        with self._lock:
+            self._seq += 1
+            return self._seq, time.monotonic()
+    
+    def set(self, key: Hashable, value: Any, generation: Optional[Tuple[int, float]] = None) -> None:
+        """
+        Зберегти значення; найдавніше використані ключі витісняються за лімітами
+        generation - мітка generation(key) до завантаження value; якщо ключ
+        відтоді скинули або заповнення триває довше за ttl, value може бути
+        застарілим і не зберігається
+        """
+        size = self.sizeof(value)
+        with self._lock:
+            if generation is not None:
+                seq, started = generation
+                deleted = self._deleted.get(key)
+                if time.monotonic() - started > self.ttl or self._cleared > seq or \
+                        (deleted is not None and deleted[0] > seq):
+                    return
+            # Значення, що саме перевищує ліміт, не кешується зовсім
+            if self.max_size is not None and size > self.max_size:
+                self._remove(key)
+                return
+            self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or \
+                    (self.max_size is not None and self.size > self.max_size):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+    
+    def delete(self, key: Hashable) -> None:
+        """Видалити значення за ключем (незавершені заповнення key не збережуться)"""
+        now = time.monotonic()
+        with self._lock:
+            self._remove(key)
+            self._seq += 1
+            self._deleted.pop(key, None)
+            self._deleted[key] = (self._seq, now)
+            # Скидання, старші за ttl, не можуть відхилити жодне допустиме заповнення
+            while True:
+                oldest = next(iter(self._deleted.values()))
+                if oldest[1] >= now - self.ttl:
+                    break
+                self._deleted.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Видалити всі значення (незавершені заповнення не збережуться)"""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self._seq += 1
+            self._cleared = self._seq
+            self._deleted.clear()
+    
+    def stats(self) -> Dict:
+        """Лічильники кешу"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+    
+    def _remove(self, key: Hashable) -> None:
+        """Видалити ключ (викликається під блокуванням)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
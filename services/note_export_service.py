@@ -0,0 +1,242 @@
+import csv
+import gzip
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from app.repositories.note_repository import NoteRepository, db_timestamp
+from app.repositories.user_repository import UserRepository
+from app.services.note_service import NoteService
+from app.services.stats_service import StatsService
+from app.database import retry_on_busy
+from typing import Optional, List, Dict, Iterator, IO
+
+# Поля експорту збігаються зі схемою Note.to_dict()
+EXPORT_FIELDS = ['id', 'title', 'content', 'user_id', 'author_username', 'created_at', 'updated_at']
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+# Скільки помилок імпорту повертати у звіті (решта лише рахується)
+MAX_REPORTED_ERRORS = 100
+
+# Помилки читання потоку імпорту: пошкоджений або обрізаний gzip, обрив з'єднання
+STREAM_ERRORS = (OSError, EOFError, zlib.error)
+
+
+class NoteExportService:
+    """Service для потокового експорту та пакетного імпорту нотаток"""
+    
+    @staticmethod
+    def export_notes(fmt: str = 'ndjson', user_id: Optional[int] = None,
+                     compress: bool = False, batch_size: int = 1000) -> Iterator[bytes]:
+        """
+        Згенерувати експорт нотаток порціями байтів
+        user_id=None - нотатки всіх користувачів (для ADMIN)
+        Кожна порція - batch_size нотаток, за потреби стиснута gzip
+        """
+        chunks = NoteExportService._serialize(fmt, user_id, batch_size)
+        
+        if not compress:
+            yield from chunks
+            return
+        
+        # wbits=31 - gzip-контейнер; стискаємо інкрементально, без буфера всього файлу
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    
+    @staticmethod
+    def _serialize(fmt: str, user_id: Optional[int], batch_size: int) -> Iterator[bytes]:
+        """Серіалізувати рядки експорту в NDJSON або CSV порціями по batch_size"""
+        buffer = io.StringIO()
+        writer = None
+        if fmt == 'csv':
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+        
+        pending = 0
+        for row in NoteRepository.iter_export_rows(user_id=user_id, batch_size=batch_size):
+            record = NoteExportService._to_record(row)
+            if writer:
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(record, ensure_ascii=False))
+                buffer.write('\n')
+            
+            pending += 1
+            if pending >= batch_size:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+    
+    @staticmethod
+    def _to_record(row) -> Dict:
+        """Перетворити рядок БД на запис експорту (як у Note.to_dict())"""
+        record = dict(row)
+        for field in ('created_at', 'updated_at'):
+            record[field] = record[field].isoformat() if record[field] else None
+        return record
+    
+    @staticmethod
+    def import_notes(stream: IO[bytes], fmt: str = 'ndjson', owner_id: Optional[int] = None,
+                     batch_size: int = 5000) -> Dict:
+        """
+        Імпортувати нотатки з файлу експорту пакетними вставками
+        
+        owner_id - власник усіх імпортованих нотаток; None - зберегти user_id
+        з файлу (лише для ADMIN, неіснуючі користувачі потрапляють у помилки).
+        ID нотаток з файлу не зберігаються - нові нотатки отримують нові ID.
+        Файл може бути стиснутий gzip (визначається за сигнатурою).
+        """
+        if fmt not in EXPORT_FORMATS:
+            return {'success': False, 'error': 'Невідомий формат імпорту'}
+        
+        stream = NoteExportService._maybe_decompress(stream)
+        
+        report = {'success': True, 'imported': 0, 'failed': 0, 'errors': []}
+        batch = []
+        
+        def fail(line: int, error: str):
+            report['failed'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'line': line, 'error': error})
+        
+        def flush():
+            # Власників з файлу перевіряємо одним IN-запитом на порцію
+            if owner_id is None:
+                existing = UserRepository.find_existing_ids(row['user_id'] for _, row in batch)
+                valid = []
+                for line, row in batch:
+                    if row['user_id'] in existing:
+                        valid.append(row)
+                    else:
+                        fail(line, 'Користувача не знайдено')
+            else:
+                valid = [row for _, row in batch]
+            if valid:
+                NoteExportService._insert_batch(valid)
+                report['imported'] += len(valid)
+                NoteService.invalidate_cache()
+            batch.clear()
+        
+        for line, record in NoteExportService._read_records(stream, fmt):
+            if isinstance(record, str):
+                fail(line, record)
+                continue
+            row = NoteExportService._to_row(record, owner_id)
+            if isinstance(row, str):
+                fail(line, row)
+                continue
+            batch.append((line, row))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        
+        return report
+    
+    @staticmethod
+    @retry_on_busy
+    def _insert_batch(rows: List[Dict]) -> None:
+        """Вставити порцію нотаток і оновити лічильники статистики однією транзакцією"""
+        NoteRepository.bulk_insert(rows, commit=False)
+        StatsService.notes_created(rows)
+        NoteRepository.commit()
+    
+    @staticmethod
+    def _maybe_decompress(stream: IO[bytes]) -> IO[bytes]:
+        """Обгорнути потік у GzipFile, якщо він починається з сигнатури gzip"""
+        stream = io.BufferedReader(stream) if not hasattr(stream, 'peek') else stream
+        if stream.peek(2)[:2] == b'\x1f\x8b':
+            return gzip.GzipFile(fileobj=stream)
+        return stream
+    
+    @staticmethod
+    def _read_records(stream: IO[bytes], fmt: str) -> Iterator:
+        """
+        Перебрати (номер рядка, запис або текст помилки розбору)
+        Рядки декодуються з UTF-8 по одному, тож невалідні байти - помилка
+        лише свого рядка; пошкоджений потік - помилка рядка, на якому
+        читання зупинилось
+        """
+        invalid = []
+        
+        def decoded():
+            for number, raw in enumerate(stream, start=1):
+                try:
+                    yield raw.decode('utf-8')
+                except UnicodeDecodeError:
+                    invalid.append(number)
+                    # Порожній рядок пропускається обома розбірниками
+                    yield '\n'
+        
+        if fmt == 'csv':
+            reader = csv.DictReader(decoded())
+            records = ((reader.line_num, record) for record in reader)
+        else:
+            records = NoteExportService._parse_ndjson(decoded())
+        
+        line = 0
+        try:
+            for line, record in records:
+                while invalid:
+                    yield invalid.pop(0), 'Невалідне кодування (очікувався UTF-8)'
+                yield line, record
+        except STREAM_ERRORS:
+            yield line + 1, 'Файл пошкоджено, решту рядків не прочитано'
+        for number in invalid:
+            yield number, 'Невалідне кодування (очікувався UTF-8)'
+    
+    @staticmethod
+    def _parse_ndjson(lines: Iterator[str]) -> Iterator:
+        """Розібрати NDJSON: (номер рядка, об'єкт або текст помилки)"""
+        for line, raw in enumerate(lines, start=1):
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                yield line, 'Невалідний JSON'
+                continue
+            yield line, record if isinstance(record, dict) else 'Очікувався JSON-об\'єкт'
+    
+    @staticmethod
+    def _to_row(record: Dict, owner_id: Optional[int]):
+        """Перевірити запис і перетворити його на рядок для вставки (або текст помилки)"""
+        title = record.get('title')
+        content = record.get('content')
+        if any(value is not None and not isinstance(value, str) for value in (title, content)):
+            return 'Заголовок і вміст мають бути рядками'
+        error = NoteService.validate_note(title, content)
+        if error:
+            return error
+        
+        if owner_id is None:
+            try:
+                user_id = int(record.get('user_id'))
+            except (TypeError, ValueError):
+                return 'Невалідний user_id'
+        else:
+            user_id = owner_id
+        
+        now = db_timestamp(datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0))
+        row = {'title': title.strip(), 'content': content.strip(), 'user_id': user_id,
+               'created_at': now, 'updated_at': now}
+        for field in ('created_at', 'updated_at'):
+            value = record.get(field)
+            if value:
+                try:
+                    parsed = datetime.fromisoformat(value)
+                except (TypeError, ValueError):
+                    return f'Невалідна дата {field}'
+                # У БД час зберігається як UTC без часового поясу
+                if parsed.tzinfo:
+                    parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+                row[field] = db_timestamp(parsed)
+        return row
@@ -1,24 +1,36 @@
+import base64
+import binascii
+import re
+from datetime import datetime
+from flask import current_app
+from markupsafe import escape
 from app.models.note import Note
-from app.repositories.note_repository import NoteRepository
-from typing import Optional, List, Dict
+from app.models.read_models import NoteView
+from app.repositories.note_repository import NoteRepository, MATCH_START, MATCH_END
+from app.services.cache import LRUCache
+from app.services.stats_service import StatsService
+from app.database import retry_on_busy
+from typing import Optional, List, Dict, Tuple, Set
+
+# Ключ кешу списку всіх нотаток (для ADMIN); списки користувачів - ('user', id)
+ALL_NOTES_KEY = ('all',)
 
 
 class NoteService:
     """Service для бізнес-логіки роботи з нотатками"""
     
     @staticmethod
-    def create_note(title: str, content: str, user_id: int) -> Dict:
-        """Створити нову нотатку з валідацією"""
+    @retry_on_busy
+    def create_note(title: str, content: str, user_id: int, commit: bool = True) -> Dict:
+        """
+        Створити нову нотатку з валідацією
+        commit=False - нотатка лише додається в поточну транзакцію (для пакетів)
+        """
         
         # Валідація
-        if not title or len(title.strip()) == 0:
-            return {'success': False, 'error': 'Заголовок не може бути порожнім'}
-        
-        if len(title) > 200:
-            return {'success': False, 'error': 'Заголовок не може перевищувати 200 символів'}
-        
-        if not content or len(content.strip()) == 0:
-            return {'success': False, 'error': 'Вміст не може бути порожнім'}
+        error = NoteService.validate_note(title, content)
+        if error:
+            return {'success': False, 'error': error}
         
         # Створення нотатки
         note = Note(
@@ -27,47 +39,352 @@ class NoteService:
             user_id=user_id
         )
         
-        created_note = NoteRepository.create(note)
+        # Лічильники статистики змінюються в тій самій транзакції
+        created_note = NoteRepository.create(note, commit=False)
+        StatsService.note_created(user_id, created_note.content)
+        if commit:
+            NoteRepository.commit()
+            NoteService.invalidate_cache(user_id)
         return {'success': True, 'note': created_note}
     
+    @staticmethod
+    def validate_note(title: str, content: str) -> Optional[str]:
+        """Перевірити заголовок і вміст нотатки; повертає текст помилки або None"""
+        if not title or len(title.strip()) == 0:
+            return 'Заголовок не може бути порожнім'
+        
+        if len(title) > 200:
+            return 'Заголовок не може перевищувати 200 символів'
+        
+        if not content or len(content.strip()) == 0:
+            return 'Вміст не може бути порожнім'
+        
+        return None
+    
     @staticmethod
     def get_note_by_id(note_id: int) -> Optional[Note]:
         """Отримати нотатку за ID"""
         return NoteRepository.find_by_id(note_id)
     
     @staticmethod
-    def get_all_notes() -> List[Note]:
-        """Отримати всі нотатки"""
-        return NoteRepository.find_all()
+    def get_note_version(note_id: int):
+        """Отримати (id, user_id, updated_at, version) нотатки без її вмісту"""
+        return NoteRepository.find_version(note_id)
+    
+    @staticmethod
+    def get_notes_version(user_id: Optional[int] = None) -> Tuple[int, int]:
+        """Отримати версію списку нотаток: (кількість, ревізія)"""
+        return StatsService.get_notes_version(user_id)
+    
+    @staticmethod
+    def get_all_notes() -> List[NoteView]:
+        """Отримати всі нотатки (легкі NoteView через кеш списків)"""
+        return NoteService._cached_list(ALL_NOTES_KEY, NoteRepository.find_views)
+    
+    @staticmethod
+    def get_notes_preview_page(page: int = 1, per_page: int = 25, sort: str = 'created_at',
+                               descending: bool = True, preview_length: int = 100) -> Dict:
+        """
+        Сторінка нотаток з обрізаним вмістом (для адмін-панелі)
+        Кожен запис: id, title, user_id, author_username, created_at, updated_at,
+        preview та truncated
+        """
+        if sort not in NoteRepository.PREVIEW_SORT_COLUMNS:
+            sort = 'created_at'
+        page = max(page, 1)
+        rows = NoteRepository.find_previews(per_page + 1, (page - 1) * per_page,
+                                            sort, descending, preview_length)
+        notes = []
+        for row in rows[:per_page]:
+            note = row._asdict()
+            note['truncated'] = len(note['preview']) > preview_length
+            note['preview'] = note['preview'][:preview_length]
+            notes.append(note)
+        
+        return {
+            'notes': notes,
+            'page': page,
+            'per_page': per_page,
+            'sort': sort,
+            'descending': descending,
+            'has_next': len(rows) > per_page,
+        }
+    
+    @staticmethod
+    def get_notes_by_user(user_id: int) -> List[NoteView]:
+        """Отримати нотатки конкретного користувача (легкі NoteView через кеш списків)"""
+        return NoteService._cached_list(('user', user_id),
+                                        lambda: NoteRepository.find_views(user_id))
     
     @staticmethod
-    def get_notes_by_user(user_id: int) -> List[Note]:
-        """Отримати нотатки конкретного користувача"""
-        return NoteRepository.find_by_user_id(user_id)
+    def _cache() -> Optional[LRUCache]:
+        """Кеш списків нотаток поточного застосунку (None - кеш вимкнено)"""
+        config = current_app.config
+        if not config['NOTES_CACHE_ENABLED']:
+            return None
+        cache = current_app.extensions.get('notes_cache')
+        if cache is None:
+            cache = current_app.extensions.setdefault('notes_cache', LRUCache(
+                max_entries=config['NOTES_CACHE_MAX_ENTRIES'],
+                ttl=config['NOTES_CACHE_TTL'],
+                max_size=config['NOTES_CACHE_MAX_NOTES'],
+                sizeof=len
+            ))
+        return cache
     
     @staticmethod
-    def update_note(note: Note, title: str = None, content: str = None) -> Dict:
-        """Оновити нотатку"""
+    def _cached_list(key, load) -> List[NoteView]:
+        """
+        Повернути список нотаток з кешу або завантажити й закешувати його
+        У кеші лежать NoteView, не прив'язані до сесії, тож влучання повертає
+        закешований список як є - без запитів і без роботи на кожну нотатку.
+        Список спільний для всіх запитів і лише для читання.
+        Список, під час завантаження якого кеш скинули (invalidate_cache),
+        міг прочитати стан до зміни, тож не кешується
+        """
+        cache = NoteService._cache()
+        if cache is None:
+            return load()
         
+        notes = cache.get(key)
+        if notes is None:
+            generation = cache.generation(key)
+            notes = load()
+            cache.set(key, notes, generation)
+        return notes
+    
+    @staticmethod
+    def invalidate_cache(user_id: Optional[int] = None) -> None:
+        """
+        Скинути закешовані списки після зміни нотаток користувача
+        user_id=None - скинути весь кеш (масові зміни, наприклад імпорт)
+        """
+        cache = current_app.extensions.get('notes_cache')
+        if cache is None:
+            return
+        if user_id is None:
+            cache.clear()
+        else:
+            cache.delete(('user', user_id))
+            cache.delete(ALL_NOTES_KEY)
+    
+    @staticmethod
+    def get_cache_stats() -> Optional[Dict]:
+        """Лічильники кешу списків нотаток (None - кеш вимкнено)"""
+        cache = NoteService._cache()
+        return cache.stats() if cache else None
+    
+    @staticmethod
+    def get_notes_page(limit: int, cursor: Optional[str] = None,
+                       user_id: Optional[int] = None) -> Dict:
+        """
+        Отримати сторінку нотаток за курсором
+        user_id=None - нотатки всіх користувачів (для ADMIN)
+        """
+        after = None
+        if cursor:
+            after = NoteService.decode_cursor(cursor)
+            if after is None:
+                return {'success': False, 'error': 'Невалідний курсор'}
+        
+        # Зайвий рядок показує, чи існує наступна сторінка
+        notes = NoteRepository.find_page(limit + 1, user_id=user_id, after=after)
+        next_cursor = None
+        if len(notes) > limit:
+            notes = notes[:limit]
+            next_cursor = NoteService.encode_cursor(notes[-1])
+        
+        return {'success': True, 'notes': notes, 'next_cursor': next_cursor}
+    
+    @staticmethod
+    def encode_cursor(note: NoteView) -> str:
+        """Закодувати ключ (created_at, id) нотатки у непрозорий курсор"""
+        raw = f'{note.created_at}|{note.id}'
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+        """Розкодувати курсор; None, якщо курсор пошкоджений"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+            created_at, note_id = raw.rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(note_id)
+        except (ValueError, UnicodeError, binascii.Error):
+            return None
+    
+    @staticmethod
+    def search_notes(query: str, limit: int, offset: int = 0,
+                     user_id: Optional[int] = None) -> Dict:
+        """
+        Повнотекстовий пошук нотаток
+        user_id=None - пошук серед усіх нотаток (для ADMIN), інакше лише власні
+        """
+        # Кожне слово береться в лапки, тож синтаксис FTS5 у запиті
+        # користувача (AND, NEAR, *, :, дужки) не інтерпретується
+        terms = re.findall(r'\w+', query or '')
+        if not terms:
+            return {'success': False, 'error': 'Пошуковий запит не може бути порожнім'}
+        match = ' '.join(f'"{term}"' for term in terms)
+        
+        # Зайвий рядок показує, чи існує наступна сторінка
+        rows = NoteRepository.search(match, limit + 1, offset=offset, user_id=user_id)
+        next_offset = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_offset = offset + limit
+        
+        results = [{
+            'note': note,
+            'title': NoteService._highlight(title),
+            'snippet': NoteService._highlight(snippet),
+        } for note, title, snippet in rows]
+        
+        return {'success': True, 'results': results, 'next_offset': next_offset}
+    
+    @staticmethod
+    def _highlight(text: str) -> str:
+        """Екранувати HTML у фрагменті та замінити маркери збігів на <mark>"""
+        return str(escape(text)).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+    
+    @staticmethod
+    def rebuild_search_index() -> None:
+        """Перебудувати пошуковий індекс нотаток"""
+        NoteRepository.rebuild_search_index()
+    
+    @staticmethod
+    @retry_on_busy
+    def update_note(note: Note, title: str = None, content: str = None,
+                    commit: bool = True) -> Dict:
+        """
+        Оновити нотатку
+        commit=False - зміни лише відправляються в поточну транзакцію (для пакетів)
+        """
+        
+        # Спершу перевіряються всі поля, щоб невдале оновлення
+        # не залишило нотатку частково зміненою в сесії
         if title is not None:
             if len(title.strip()) == 0:
                 return {'success': False, 'error': 'Заголовок не може бути порожнім'}
             if len(title) > 200:
                 return {'success': False, 'error': 'Заголовок не може перевищувати 200 символів'}
-            note.title = title.strip()
         
         if content is not None:
             if len(content.strip()) == 0:
                 return {'success': False, 'error': 'Вміст не може бути порожнім'}
+        
+        old_content = note.content
+        if title is not None:
+            note.title = title.strip()
+        if content is not None:
             note.content = content.strip()
+        if title is not None or content is not None:
+            StatsService.note_updated(note.user_id, old_content, note.content)
         
-        updated_note = NoteRepository.update(note)
+        updated_note = NoteRepository.update(note, commit=commit)
+        if commit:
+            NoteService.invalidate_cache(note.user_id)
         return {'success': True, 'note': updated_note}
     
     @staticmethod
-    def delete_note(note: Note) -> None:
+    @retry_on_busy
+    def delete_note(note: Note, commit: bool = True) -> None:
         """Видалити нотатку"""
-        NoteRepository.delete(note)
+        user_id = note.user_id
+        StatsService.note_deleted(user_id, note.content)
+        NoteRepository.delete(note, commit=commit)
+        if commit:
+            NoteService.invalidate_cache(user_id)
+    
+    @staticmethod
+    @retry_on_busy
+    def apply_batch(operations: List[Dict], user_id: int, is_admin: bool = False,
+                    atomic: bool = False) -> Dict:
+        """
+        Виконати пакет операцій над нотатками в одній транзакції
+        
+        Операція: {"op": "create"|"update"|"delete", "id": ..., "title": ..., "content": ...}
+        Кожна операція проходить ту саму валідацію та перевірку прав, що й
+        поодинокі запити. Невдалі операції пропускаються, решта фіксується
+        одним commit; atomic=True - будь-яка помилка відкочує весь пакет.
+        """
+        # Нотатки для update/delete завантажуються одним IN-запитом
+        note_ids = [op.get('id') for op in operations
+                    if isinstance(op, dict) and isinstance(op.get('id'), int)]
+        notes = NoteRepository.find_by_ids(note_ids)
+        
+        results = []
+        owners = set()
+        for index, operation in enumerate(operations):
+            result = NoteService._apply_operation(operation, notes, user_id, is_admin, owners)
+            result['index'] = index
+            results.append(result)
+        
+        failed = sum(1 for result in results if not result['success'])
+        
+        if atomic and failed:
+            NoteRepository.rollback()
+            # Успішні до відкату операції теж не виконано: їхніх нотаток (та id) не існує
+            results = [result if not result['success'] else
+                       {'success': False, 'status': 409, 'op': result['op'], 'index': result['index'],
+                        'error': 'Операцію відкочено через помилку в пакеті'}
+                       for result in results]
+            return {'success': False, 'committed': False, 'failed': failed, 'results': results}
+        
+        NoteRepository.commit()
+        # Кеш скидається лише після commit, щоб паралельний запит
+        # не закешував стан до фіксації пакета
+        for owner_id in owners:
+            NoteService.invalidate_cache(owner_id)
+        return {'success': failed == 0, 'committed': True, 'failed': failed, 'results': results}
+    
+    @staticmethod
+    def _apply_operation(operation: Dict, notes: Dict[int, Note], user_id: int,
+                         is_admin: bool, owners: Set[int]) -> Dict:
+        """
+        Виконати одну операцію пакета без commit
+        owners - доповнюється власниками змінених нотаток (для скидання кешу)
+        """
+        if not isinstance(operation, dict):
+            return {'success': False, 'status': 400, 'error': 'Операція має бути JSON-об\'єктом'}
+        
+        op = operation.get('op')
+        title = operation.get('title')
+        content = operation.get('content')
+        
+        if any(value is not None and not isinstance(value, str) for value in (title, content)):
+            return {'success': False, 'status': 400, 'op': op,
+                    'error': 'Заголовок і вміст мають бути рядками'}
+        
+        if op == 'create':
+            result = NoteService.create_note(title, content, user_id, commit=False)
+            if not result['success']:
+                return {'success': False, 'status': 400, 'op': op, 'error': result['error']}
+            owners.add(user_id)
+            return {'success': True, 'status': 201, 'op': op, 'note': result['note']}
+        
+        if op not in ('update', 'delete'):
+            return {'success': False, 'status': 400, 'op': op, 'error': 'Невідома операція'}
+        
+        note = notes.get(operation.get('id'))
+        
+        if not note:
+            return {'success': False, 'status': 404, 'op': op, 'error': 'Нотатку не знайдено'}
+        
+        if not NoteService.can_user_modify_note(note, user_id, is_admin):
+            return {'success': False, 'status': 403, 'op': op, 'error': 'Доступ заборонено'}
+        
+        owners.add(note.user_id)
+        
+        if op == 'delete':
+            NoteService.delete_note(note, commit=False)
+            # Наступні операції пакета з цим id вже не знайдуть нотатку
+            del notes[note.id]
+            return {'success': True, 'status': 200, 'op': op, 'id': note.id}
+        
+        result = NoteService.update_note(note, title, content, commit=False)
+        if not result['success']:
+            return {'success': False, 'status': 400, 'op': op, 'error': result['error']}
+        return {'success': True, 'status': 200, 'op': op, 'note': result['note']}
     
     @staticmethod
     def can_user_modify_note(note: Note, user_id: int, is_admin: bool = False) -> bool:
@@ -78,8 +395,6 @@ class NoteService:
     
     @staticmethod
     def get_statistics() -> Dict:
-        """Отримати статистику по нотатках"""
-        return {
-            'total_notes': NoteRepository.count_all()
-        }
+        """Отримати статистику по нотатках (з лічильників, без COUNT(*))"""
+        return StatsService.get_summary()
 
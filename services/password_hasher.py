@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from flask import current_app
+from app import bcrypt
+from typing import Callable, Optional
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Черга хешування переповнена - запит слід повторити пізніше (HTTP 503)"""
+
+
+class PasswordHasher:
+    """
+    Обмежений пул потоків для bcrypt
+    
+    bcrypt звільняє GIL під час хешування, тому потоки пулу виконуються
+    паралельно, а кількість одночасних хешувань обмежена розміром пулу
+    (не більше ядер), і сплеск логінів не забирає всі потоки веб-сервера.
+    Задачі понад pool_size + max_queue не стають у чергу - submit чекає
+    queue_timeout секунд і піднімає PasswordHasherBusy.
+    """
+    
+    def __init__(self, pool_size: int, max_queue: int, queue_timeout: float, metrics=None):
+        self.pool_size = pool_size
+        self.queue_timeout = queue_timeout
+        self.metrics = metrics  # MetricsRegistry для app_bcrypt_seconds (None - не рахувати)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(pool_size + max_queue)
+    
+    def submit(self, fn: Callable, *args, block: bool = True) -> Optional[Future]:
+        """
+        Поставити задачу в пул
+        block=False - не чекати вільного місця (None, якщо черга заповнена)
+        """
+        acquired = self._slots.acquire(timeout=self.queue_timeout) if block \
+            else self._slots.acquire(blocking=False)
+        if not acquired:
+            if block:
+                raise PasswordHasherBusy('Черга хешування паролів переповнена')
+            return None
+        
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+    
+    def hash(self, password: str, rounds: int) -> str:
+        """Захешувати пароль у пулі та дочекатися результату"""
+        return self.submit(self._timed, 'hash', bcrypt.generate_password_hash,
+                           password, rounds).result().decode('utf-8')
+    
+    def check(self, password_hash: str, password: str) -> bool:
+        """Перевірити пароль у пулі та дочекатися результату"""
+        return self.submit(self._timed, 'check', bcrypt.check_password_hash,
+                           password_hash, password).result()
+    
+    def _timed(self, operation: str, fn: Callable, *args):
+        """Виконати fn у потоці пулу й записати час виконання (без очікування в черзі)"""
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe('app_bcrypt_seconds', time.perf_counter() - started,
+                                     operation=operation)
+    
+    def shutdown(self) -> None:
+        """Зупинити пул (дочекавшись поточних задач)"""
+        self._executor.shutdown(wait=True)
+    
+    @staticmethod
+    def get_rounds(password_hash: str) -> Optional[int]:
+        """Вартість (log rounds) збереженого хешу '$2b$12$...'"""
+        try:
+            return int(password_hash.split('$')[2])
+        except (IndexError, ValueError):
+            return None
+    
+    @staticmethod
+    def current() -> 'PasswordHasher':
+        """Пул поточного застосунку (створюється при першому використанні)"""
+        hasher = current_app.extensions.get('password_hasher')
+        if hasher is None:
+            config = current_app.config
+            hasher = current_app.extensions.setdefault('password_hasher', PasswordHasher(
+                pool_size=config['BCRYPT_POOL_SIZE'],
+                max_queue=config['BCRYPT_MAX_QUEUE'],
+                queue_timeout=config['BCRYPT_QUEUE_TIMEOUT'],
+                metrics=current_app.extensions.get('metrics')
+            ))
+        return hasher
@@ -0,0 +1,114 @@
+import random
+from datetime import datetime, timedelta
+from flask import current_app
+from app import bcrypt
+from app.repositories.note_repository import NoteRepository, db_timestamp
+from app.repositories.user_repository import UserRepository
+from app.services.note_service import NoteService
+from app.services.stats_service import StatsService
+from typing import Callable, Optional, List
+
+# Словник для заголовків і вмісту синтетичних нотаток
+WORDS = (
+    'нотатка план зустріч проєкт звіт задача ідея список покупки книга фільм подорож '
+    'робота навчання лекція іспит код сервер база даних запит відповідь помилка реліз '
+    'тест документація дизайн клієнт бюджет термін команда огляд нагадування дзвінок '
+    'meeting draft review deploy backlog sprint release todo api cache index query'
+).split()
+
+# Дати створення розподіляються на рік від цієї дати (однаково для того самого seed)
+SEED_START = datetime(2025, 1, 1)
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class SeedService:
+    """Service для генерації великих відтворюваних наборів даних (профілювання, навантаження)"""
+    
+    @staticmethod
+    def seed(users: int, notes_per_user: int, seed: int = 0, password: str = 'password123',
+             username_prefix: str = 'seed', batch_size: int = 10000,
+             progress: Optional[ProgressCallback] = None) -> List[int]:
+        """
+        Створити users користувачів по notes_per_user нотаток кожному
+        
+        Вставки - пакетні (Core executemany по batch_size рядків), пароль
+        хешується один раз і спільний для всіх користувачів. Однаковий seed
+        дає однакові дані. Пошуковий індекс і лічильники статистики
+        перераховуються наприкінці одним проходом. Повертає ID створених користувачів.
+        """
+        username = f'{username_prefix}0'
+        if users and UserRepository.exists_by_username(username):
+            raise ValueError(f'Користувач {username} уже існує - оберіть інший префікс')
+        
+        rng = random.Random(seed)
+        password_hash = bcrypt.generate_password_hash(
+            password, current_app.config['BCRYPT_LOG_ROUNDS']).decode('utf-8')
+        
+        user_ids = []
+        for start in range(0, users, batch_size):
+            rows = [SeedService._user_row(f'{username_prefix}{i}', password_hash, rng)
+                    for i in range(start, min(start + batch_size, users))]
+            UserRepository.bulk_insert(rows, commit=False)
+            ids = UserRepository.find_ids_by_usernames(row['username'] for row in rows)
+            user_ids.extend(ids[row['username']] for row in rows)
+            UserRepository.commit()
+            if progress:
+                progress('users', len(user_ids), users)
+        
+        total = users * notes_per_user
+        done = 0
+        batch = []
+        # Пошуковий індекс будується одним rebuild після вставок
+        NoteRepository.drop_search_triggers()
+        try:
+            for user_id in user_ids:
+                for _ in range(notes_per_user):
+                    batch.append(SeedService._note_row(user_id, rng))
+                    if len(batch) >= batch_size:
+                        done += SeedService._insert_notes(batch)
+                        if progress:
+                            progress('notes', done, total)
+            if batch:
+                done += SeedService._insert_notes(batch)
+                if progress:
+                    progress('notes', done, total)
+        finally:
+            NoteRepository.rollback()
+            NoteRepository.create_search_triggers()
+            NoteRepository.rebuild_search_index()
+        
+        StatsService.reconcile()
+        NoteService.invalidate_cache()
+        return user_ids
+    
+    @staticmethod
+    def _insert_notes(batch: list) -> int:
+        """Вставити й зафіксувати порцію нотаток; повертає їх кількість"""
+        count = len(batch)
+        NoteRepository.bulk_insert(batch)
+        batch.clear()
+        return count
+    
+    @staticmethod
+    def _timestamp(rng: random.Random) -> str:
+        """Випадковий момент року від SEED_START"""
+        return db_timestamp(SEED_START + timedelta(seconds=rng.randrange(365 * 24 * 3600)))
+    
+    @staticmethod
+    def _user_row(username: str, password_hash: str, rng: random.Random) -> dict:
+        """Рядок таблиці users"""
+        created_at = SeedService._timestamp(rng)
+        return {'username': username, 'email': f'{username}@example.com',
+                'password_hash': password_hash, 'role': 'USER',
+                'created_at': created_at, 'updated_at': created_at}
+    
+    @staticmethod
+    def _note_row(user_id: int, rng: random.Random) -> dict:
+        """Рядок таблиці notes: заголовок 2-6 слів, вміст 5-120 слів"""
+        created_at = SeedService._timestamp(rng)
+        title = ' '.join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize()
+        content = ' '.join(rng.choices(WORDS, k=rng.randint(5, 120)))
+        return {'title': title, 'content': content, 'user_id': user_id,
+                'created_at': created_at, 'updated_at': created_at}
+
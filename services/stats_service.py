@@ -0,0 +1,162 @@
+from datetime import date, datetime, timedelta, timezone
+from app.repositories.stats_repository import StatsRepository
+from typing import Optional, List, Dict, Iterable, Tuple
+
+
+class StatsService:
+    """
+    Service для інкрементальної статистики
+    Методи note_* / user_* викликаються з NoteService / UserService до commit,
+    тож лічильники змінюються в тій самій транзакції, що й дані. Кожен з них
+    також збільшує ревізію списку (notes_revision / users_revision і ревізію
+    користувача) - з них складаються версії списків для ETag
+    """
+    
+    @staticmethod
+    def note_created(user_id: int, content: str, created_at: Optional[datetime] = None) -> None:
+        """Врахувати нову нотатку"""
+        size = len(content)
+        StatsRepository.increment_counter('notes', 1)
+        StatsRepository.increment_counter('notes_revision', 1)
+        StatsRepository.increment_counter('content_size', size)
+        StatsRepository.increment_user_notes(user_id, 1, size)
+        StatsRepository.increment_daily_created((created_at or StatsService._utcnow()).date(), 1)
+    
+    @staticmethod
+    def notes_created(rows: Iterable[Dict]) -> None:
+        """
+        Врахувати пакет нових нотаток (масовий імпорт)
+        Рядки агрегуються, тож на пакет припадає по одному UPSERT на користувача й день
+        """
+        total_count, total_size = 0, 0
+        per_user, per_day = {}, {}
+        for row in rows:
+            size = len(row['content'])
+            total_count += 1
+            total_size += size
+            count, user_size = per_user.get(row['user_id'], (0, 0))
+            per_user[row['user_id']] = (count + 1, user_size + size)
+            day = row['created_at'][:10]
+            per_day[day] = per_day.get(day, 0) + 1
+        
+        StatsRepository.increment_counter('notes', total_count)
+        StatsRepository.increment_counter('notes_revision', 1)
+        StatsRepository.increment_counter('content_size', total_size)
+        for user_id, (count, size) in per_user.items():
+            StatsRepository.increment_user_notes(user_id, count, size)
+        for day, count in per_day.items():
+            StatsRepository.increment_daily_created(date.fromisoformat(day), count)
+    
+    @staticmethod
+    def note_updated(user_id: int, old_content: str, new_content: str) -> None:
+        """Врахувати зміну нотатки (заголовка та / або розміру вмісту)"""
+        delta = len(new_content) - len(old_content)
+        StatsRepository.increment_counter('content_size', delta)
+        StatsRepository.increment_counter('notes_revision', 1)
+        StatsRepository.increment_user_notes(user_id, 0, delta)
+    
+    @staticmethod
+    def note_deleted(user_id: int, content: str) -> None:
+        """Врахувати видалення нотатки (кількість створених за день не змінюється)"""
+        size = len(content)
+        StatsRepository.increment_counter('notes', -1)
+        StatsRepository.increment_counter('notes_revision', 1)
+        StatsRepository.increment_counter('content_size', -size)
+        StatsRepository.increment_user_notes(user_id, -1, -size)
+    
+    @staticmethod
+    def user_created(count: int = 1) -> None:
+        """Врахувати нового користувача (count - пакет користувачів з імпорту)"""
+        StatsRepository.increment_counter('users', count)
+        StatsRepository.increment_counter('users_revision', 1)
+    
+    @staticmethod
+    def user_updated() -> None:
+        """Врахувати зміну полів користувача, видимих у списку (email, роль)"""
+        StatsRepository.increment_counter('users_revision', 1)
+    
+    @staticmethod
+    def user_deleted(user_id: int) -> None:
+        """Врахувати видалення користувача разом з усіма його нотатками"""
+        count, size = StatsRepository.pop_user_notes(user_id)
+        StatsRepository.increment_counter('users', -1)
+        StatsRepository.increment_counter('users_revision', 1)
+        StatsRepository.increment_counter('notes', -count)
+        StatsRepository.increment_counter('notes_revision', 1)
+        StatsRepository.increment_counter('content_size', -size)
+    
+    @staticmethod
+    def get_notes_version(user_id: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Версія списку нотаток (усіх або користувача): (кількість, ревізія)
+        Читається з лічильників за ключем - без COUNT(*) по таблиці notes
+        """
+        if user_id is None:
+            return StatsRepository.find_counters('notes', 'notes_revision')
+        return StatsRepository.find_user_notes_version(user_id)
+    
+    @staticmethod
+    def get_users_version() -> Tuple[int, int]:
+        """Версія списку користувачів: (кількість, ревізія)"""
+        return StatsRepository.find_counters('users', 'users_revision')
+    
+    @staticmethod
+    def get_summary(days: int = 30) -> Dict:
+        """
+        Зведена статистика: загальні лічильники, нотатки по днях і тижнях
+        Кількість запитів і рядків не залежить від розміру таблиць
+        """
+        counters = StatsRepository.get_counters()
+        today = StatsService._utcnow().date()
+        since = today - timedelta(days=days - 1)
+        
+        daily = {row.day: row.created for row in StatsRepository.find_daily_created(since)}
+        per_day = [{'date': (since + timedelta(days=i)).isoformat(),
+                    'created': daily.get(since + timedelta(days=i), 0)} for i in range(days)]
+        
+        weekly = {}
+        for day, created in daily.items():
+            year, week, _ = day.isocalendar()
+            key = f'{year}-W{week:02d}'
+            weekly[key] = weekly.get(key, 0) + created
+        
+        return {
+            'total_users': counters.get('users', 0),
+            'total_notes': counters.get('notes', 0),
+            'total_content_size': counters.get('content_size', 0),
+            'notes_created_today': daily.get(today, 0),
+            'notes_created_per_day': per_day,
+            'notes_created_per_week': [{'week': week, 'created': weekly[week]}
+                                       for week in sorted(weekly)],
+        }
+    
+    @staticmethod
+    def get_user_stats(user_id: int) -> Dict:
+        """Кількість нотаток і розмір вмісту користувача"""
+        stats = StatsRepository.find_user_notes(user_id)
+        return {
+            'user_id': user_id,
+            'note_count': stats.note_count if stats else 0,
+            'content_size': stats.content_size if stats else 0,
+        }
+    
+    @staticmethod
+    def get_top_users(limit: int) -> List[Dict]:
+        """Користувачі з найбільшою кількістю нотаток"""
+        return [{'user_id': stats.user_id, 'note_count': stats.note_count,
+                 'content_size': stats.content_size}
+                for stats in StatsRepository.find_top_users(limit)]
+    
+    @staticmethod
+    def reconcile() -> None:
+        """
+        Перерахувати всі лічильники з нуля
+        Кількість створених за день після цього враховує лише нотатки, що існують
+        """
+        StatsRepository.reconcile()
+    
+    @staticmethod
+    def _utcnow() -> datetime:
+        """Поточний час UTC (як CURRENT_TIMESTAMP у SQLite)"""
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
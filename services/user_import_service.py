@@ -0,0 +1,230 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+import bcrypt as bcrypt_lib
+from app.repositories.user_repository import UserRepository
+from app.repositories.note_repository import db_timestamp
+from app.services.user_service import UserService
+from app.services.note_export_service import NoteExportService, EXPORT_FORMATS
+from app.services.stats_service import StatsService
+from app.database import retry_on_busy
+from typing import IO, Dict, List, Optional, Tuple
+
+# Поля файлу імпорту (role необов'язкове, за замовчуванням USER)
+IMPORT_FIELDS = ['username', 'email', 'password', 'role']
+
+# Створення пулу процесів хешування (перший імпорт у процесі)
+_pool_lock = threading.Lock()
+
+
+class UserImportService:
+    """Service для масового імпорту користувачів (CSV / NDJSON)"""
+    
+    @staticmethod
+    def import_users(stream: IO[bytes], fmt: str = 'ndjson', batch_size: int = 1000) -> Dict:
+        """
+        Імпортувати користувачів з потоку порціями по batch_size рядків
+        
+        На порцію: валідація рядків, одна перевірка унікальності username /
+        email запитом з IN, хешування паролів у пулі процесів (усі ядра,
+        поза GIL і поза потоками веб-сервера) і одна транзакція вставки.
+        Повертає звіт з результатом для кожного рядка файлу.
+        """
+        if fmt not in EXPORT_FORMATS:
+            return {'success': False, 'error': 'Невідомий формат імпорту'}
+        
+        stream = NoteExportService._maybe_decompress(stream)
+        
+        report = {'success': True, 'created': 0, 'failed': 0, 'rows': []}
+        # Username / email (нижній регістр), уже взяті попередніми рядками файлу
+        seen_usernames, seen_emails = set(), set()
+        batch = []
+        
+        def fail(line: int, username: Optional[str], error: str):
+            report['failed'] += 1
+            report['rows'].append({'line': line, 'username': username, 'status': 'failed', 'error': error})
+        
+        def flush():
+            if batch:
+                UserImportService._import_batch(batch, report, fail)
+                batch.clear()
+        
+        for line, record in NoteExportService._read_records(stream, fmt):
+            if isinstance(record, str):
+                fail(line, None, record)
+                continue
+            
+            row = UserImportService._to_row(record)
+            if isinstance(row, str):
+                fail(line, record.get('username') if isinstance(record.get('username'), str) else None, row)
+                continue
+            
+            email = row['email'].lower()
+            if row['username'] in seen_usernames:
+                fail(line, row['username'], 'Username повторюється у файлі')
+                continue
+            if email in seen_emails:
+                fail(line, row['username'], 'Email повторюється у файлі')
+                continue
+            seen_usernames.add(row['username'])
+            seen_emails.add(email)
+            
+            batch.append((line, row))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        
+        # Помилки валідації фіксуються одразу, а рядки порції - після вставки
+        report['rows'].sort(key=lambda row: row['line'])
+        return report
+    
+    @staticmethod
+    def _to_row(record: Dict):
+        """Перевірити запис (ті самі правила, що й у create_user) або повернути текст помилки"""
+        values = {}
+        for field in IMPORT_FIELDS:
+            value = record.get(field)
+            if value is not None and not isinstance(value, str):
+                return f'Поле {field} має бути рядком'
+            values[field] = value
+        values['username'], values['email'] = UserService.normalize_user(values['username'],
+                                                                         values['email'])
+        values['role'] = values['role'] or 'USER'
+        
+        error = UserService.validate_user(values['username'], values['email'],
+                                          values['password'], values['role'])
+        return error or values
+    
+    @staticmethod
+    def _import_batch(batch: List[Tuple[int, Dict]], report: Dict, fail) -> None:
+        """Перевірити унікальність, захешувати паролі й вставити порцію"""
+        batch = UserImportService._drop_taken(batch, fail)
+        if not batch:
+            return
+        
+        # Сіль генерується тут, а процес пулу виконує лише bcrypt.hashpw:
+        # йому не потрібно імпортувати застосунок. Формат хешу той самий,
+        # що й у Flask-Bcrypt ('$2b$<rounds>$...')
+        rounds = current_app.config['BCRYPT_LOG_ROUNDS']
+        passwords = [row['password'].encode('utf-8') for _, row in batch]
+        salts = [bcrypt_lib.gensalt(rounds) for _ in batch]
+        pool = UserImportService._pool()
+        if pool is None:
+            # Пул вимкнено (USERS_IMPORT_PROCESSES = 0) - хешування в потоці запиту
+            hashes = map(bcrypt_lib.hashpw, passwords, salts)
+        else:
+            # Кілька порцій на процес: рівномірне навантаження без передачі паролів по одному
+            chunksize = max(1, len(passwords) // (UserImportService._processes(current_app.config) * 4))
+            hashes = pool.map(bcrypt_lib.hashpw, passwords, salts, chunksize=chunksize)
+        
+        now = db_timestamp(datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0))
+        rows = [{'username': row['username'], 'email': row['email'],
+                 'password_hash': password_hash.decode('utf-8'),
+                 'role': row['role'], 'created_at': now, 'updated_at': now}
+                for (_, row), password_hash in zip(batch, hashes)]
+        
+        try:
+            UserImportService._insert_batch(rows)
+        except IntegrityError:
+            # Паралельна реєстрація зайняла username / email після перевірки:
+            # відкидаємо конфліктні рядки й повторюємо вставку один раз
+            UserRepository.rollback()
+            kept = {line for line, _ in UserImportService._drop_taken(batch, fail)}
+            rows = [row for (line, _), row in zip(batch, rows) if line in kept]
+            batch = [(line, row) for line, row in batch if line in kept]
+            try:
+                if rows:
+                    UserImportService._insert_batch(rows)
+            except IntegrityError:
+                # Конфлікт повторився - вставляємо по одному рядку, щоб помилку
+                # отримали лише рядки, які її спричинили
+                UserRepository.rollback()
+                batch = UserImportService._insert_each(batch, rows, fail)
+        
+        ids = UserRepository.find_ids_by_usernames(row['username'] for _, row in batch)
+        for line, row in batch:
+            report['rows'].append({'line': line, 'username': row['username'], 'status': 'created',
+                                   'id': ids.get(row['username'])})
+        report['created'] += len(batch)
+    
+    @staticmethod
+    def _drop_taken(batch: List[Tuple[int, Dict]], fail) -> List[Tuple[int, Dict]]:
+        """Відкинути рядки з уже зайнятими username / email (один запит на порцію)"""
+        taken_usernames, taken_emails = UserRepository.find_taken(
+            (row['username'] for _, row in batch), (row['email'] for _, row in batch)
+        )
+        if not taken_usernames and not taken_emails:
+            return batch
+        
+        kept = []
+        for line, row in batch:
+            if row['username'] in taken_usernames:
+                fail(line, row['username'], 'Користувач з таким username вже існує')
+            elif row['email'].lower() in taken_emails:
+                fail(line, row['username'], 'Користувач з таким email вже існує')
+            else:
+                kept.append((line, row))
+        return kept
+    
+    @staticmethod
+    @retry_on_busy
+    def _insert_batch(rows: List[Dict]) -> None:
+        """Вставити порцію користувачів і оновити лічильник статистики однією транзакцією"""
+        UserRepository.bulk_insert(rows, commit=False)
+        StatsService.user_created(len(rows))
+        UserRepository.commit()
+    
+    @staticmethod
+    def _insert_each(batch: List[Tuple[int, Dict]], rows: List[Dict], fail) -> List[Tuple[int, Dict]]:
+        """Вставити рядки порції окремими транзакціями; повертає вставлені"""
+        inserted = []
+        for (line, row), values in zip(batch, rows):
+            try:
+                UserImportService._insert_batch([values])
+            except IntegrityError:
+                UserRepository.rollback()
+                fail(line, row['username'], 'Користувач з таким username або email вже існує')
+                continue
+            inserted.append((line, row))
+        return inserted
+    
+    @staticmethod
+    def _pool() -> Optional[ProcessPoolExecutor]:
+        """
+        Пул процесів хешування поточного процесу (None - USERS_IMPORT_PROCESSES = 0)
+        
+        Запускається першим імпортом, окремо в кожному процесі сервера: CLI,
+        тести й master gunicorn --preload не тримають зайвих процесів, а
+        воркер після fork не успадковує непридатний пул батька. Процеси
+        створюються через forkserver (fork з багатопотокового сервера
+        небезпечний), де його немає - через spawn. Пул зупиняється при виході.
+        """
+        config = current_app.config
+        if config['USERS_IMPORT_PROCESSES'] == 0:
+            return None
+        
+        pools = current_app.extensions.setdefault('user_import_pools', {})
+        pid = os.getpid()
+        pool = pools.get(pid)
+        if pool is None:
+            with _pool_lock:
+                pool = pools.get(pid)
+                if pool is None:
+                    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() \
+                        else 'spawn'
+                    pool = ProcessPoolExecutor(max_workers=UserImportService._processes(config),
+                                               mp_context=multiprocessing.get_context(method))
+                    pools[pid] = pool
+                    atexit.register(pool.shutdown)
+        return pool
+    
+    @staticmethod
+    def _processes(config) -> int:
+        """Кількість процесів хешування (USERS_IMPORT_PROCESSES, None - усі ядра)"""
+        return config['USERS_IMPORT_PROCESSES'] or os.cpu_count() or 1
+
@@ -1,28 +1,32 @@
+from flask import current_app
 from app import bcrypt
 from app.models.user import User
+from app.models.user_snapshot import UserSnapshot
+from app.models.read_models import UserView
 from app.repositories.user_repository import UserRepository
-from typing import Optional, List, Dict
+from app.repositories.note_repository import NoteRepository
+from app.services.note_service import NoteService
+from app.services.stats_service import StatsService
+from app.services.cache import LRUCache
+from app.services.password_hasher import PasswordHasher
+from app.database import retry_on_busy
+from typing import Optional, List, Dict, Tuple
 
 
 class UserService:
     """Service для бізнес-логіки роботи з користувачами"""
     
     @staticmethod
+    @retry_on_busy
     def create_user(username: str, email: str, password: str, role: str = 'USER') -> Dict:
         """Створити нового користувача з валідацією"""
         
-        # Валідація
-        if not username or len(username) < 3:
-            return {'success': False, 'error': 'Username має містити мінімум 3 символи'}
-        
-        if not email or '@' not in email:
-            return {'success': False, 'error': 'Невалідний email'}
-        
-        if not password or len(password) < 6:
-            return {'success': False, 'error': 'Пароль має містити мінімум 6 символів'}
+        username, email = UserService.normalize_user(username, email)
         
-        if role not in ['USER', 'ADMIN']:
-            return {'success': False, 'error': 'Невалідна роль'}
+        # Валідація
+        error = UserService.validate_user(username, email, password, role)
+        if error:
+            return {'success': False, 'error': error}
         
         # Перевірка чи існує користувач
         if UserRepository.exists_by_username(username):
@@ -32,7 +36,7 @@ class UserService:
             return {'success': False, 'error': 'Користувач з таким email вже існує'}
         
         # Хешування пароля
-        password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        password_hash = UserService.hash_password(password)
         
         # Створення користувача
         user = User(
@@ -42,35 +46,165 @@ class UserService:
             role=role
         )
         
-        created_user = UserRepository.create(user)
+        created_user = UserRepository.create(user, commit=False)
+        StatsService.user_created()
+        UserRepository.commit()
         return {'success': True, 'user': created_user}
     
+    @staticmethod
+    def normalize_user(username: Optional[str], email: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Привести username і email до збереженого вигляду (без пробілів по краях)"""
+        return (username.strip() if username else username,
+                email.strip() if email else email)
+    
+    @staticmethod
+    def validate_user(username: str, email: str, password: str, role: str = 'USER') -> Optional[str]:
+        """Перевірити поля нового користувача; повертає текст помилки або None"""
+        if not username or len(username) < 3:
+            return 'Username має містити мінімум 3 символи'
+        
+        if not email or '@' not in email:
+            return 'Невалідний email'
+        
+        if not password or len(password) < 6:
+            return 'Пароль має містити мінімум 6 символів'
+        
+        if role not in ['USER', 'ADMIN']:
+            return 'Невалідна роль'
+        
+        return None
+    
     @staticmethod
     def authenticate(username: str, password: str) -> Optional[User]:
         """Автентифікація користувача"""
         user = UserRepository.find_by_username(username)
         
-        if user and bcrypt.check_password_hash(user.password_hash, password):
+        if user and PasswordHasher.current().check(user.password_hash, password):
+            UserService._rehash_if_needed(user, password)
             return user
         
         return None
     
+    @staticmethod
+    def hash_password(password: str) -> str:
+        """Захешувати пароль у пулі bcrypt з налаштованою вартістю BCRYPT_LOG_ROUNDS"""
+        return PasswordHasher.current().hash(password, current_app.config['BCRYPT_LOG_ROUNDS'])
+    
+    @staticmethod
+    def _rehash_if_needed(user: User, password: str) -> None:
+        """
+        Якщо вартість збереженого хешу відрізняється від BCRYPT_LOG_ROUNDS,
+        перехешувати пароль у фоні. Відповідь на логін не чекає; якщо пул
+        зайнятий, перехешування відкладається до наступного входу.
+        """
+        rounds = current_app.config['BCRYPT_LOG_ROUNDS']
+        if PasswordHasher.get_rounds(user.password_hash) == rounds:
+            return
+        
+        app = current_app._get_current_object()
+        user_id, old_hash = user.id, user.password_hash
+        
+        def rehash():
+            new_hash = bcrypt.generate_password_hash(password, rounds).decode('utf-8')
+            with app.app_context():
+                UserRepository.replace_password_hash(user_id, old_hash, new_hash)
+        
+        PasswordHasher.current().submit(rehash, block=False)
+    
     @staticmethod
     def get_user_by_id(user_id: int) -> Optional[User]:
         """Отримати користувача за ID"""
         return UserRepository.find_by_id(user_id)
     
+    @staticmethod
+    def get_user_snapshot(user_id: int) -> Optional[UserSnapshot]:
+        """
+        Отримати знімок користувача для current_user (через кеш)
+        None - користувача не існує (Flask-Login вважатиме сесію анонімною)
+        """
+        cache = UserService._cache()
+        snapshot = cache.get(user_id) if cache else None
+        if snapshot is None:
+            # Знімок, під час читання якого кеш скинули, не зберігається
+            generation = cache.generation(user_id) if cache else None
+            # Лише з основної БД: знімок зі старою роллю з репліки жив би в кеші до TTL
+            user = UserRepository.load_for_auth(user_id)
+            if user is None:
+                return None
+            snapshot = UserSnapshot.from_user(user)
+            if cache:
+                cache.set(user_id, snapshot, generation)
+        return snapshot
+    
+    @staticmethod
+    def _cache() -> Optional[LRUCache]:
+        """Кеш знімків користувачів поточного застосунку (None - кеш вимкнено)"""
+        config = current_app.config
+        if not config['USER_CACHE_ENABLED']:
+            return None
+        cache = current_app.extensions.get('user_cache')
+        if cache is None:
+            cache = current_app.extensions.setdefault('user_cache', LRUCache(
+                max_entries=config['USER_CACHE_MAX_ENTRIES'],
+                ttl=config['USER_CACHE_TTL']
+            ))
+        return cache
+    
+    @staticmethod
+    def invalidate_user_cache(user_id: int) -> None:
+        """Скинути знімок користувача (зміна ролі, email, пароля або видалення)"""
+        cache = current_app.extensions.get('user_cache')
+        if cache is not None:
+            cache.delete(user_id)
+    
+    @staticmethod
+    def get_cache_stats() -> Optional[Dict]:
+        """Лічильники кешу знімків користувачів (None - кеш вимкнено)"""
+        cache = UserService._cache()
+        return cache.stats() if cache else None
+    
     @staticmethod
     def get_user_by_username(username: str) -> Optional[User]:
         """Отримати користувача за username"""
         return UserRepository.find_by_username(username)
     
     @staticmethod
-    def get_all_users() -> List[User]:
-        """Отримати всіх користувачів"""
-        return UserRepository.find_all()
+    def get_all_users() -> List[UserView]:
+        """Отримати всіх користувачів (легкі UserView для списку)"""
+        return UserRepository.find_all_views()
+    
+    @staticmethod
+    def get_users_page(page: int = 1, per_page: int = 25, sort: str = 'id',
+                       descending: bool = False) -> Dict:
+        """
+        Сторінка користувачів з кількістю нотаток (для адмін-панелі)
+        Кількості для всієї сторінки - одним GROUP BY, без завантаження user.notes
+        """
+        if sort not in UserRepository.SORT_COLUMNS:
+            sort = 'id'
+        page = max(page, 1)
+        # Один зайвий рядок показує, чи є наступна сторінка, без COUNT(*)
+        users = UserRepository.find_page(per_page + 1, (page - 1) * per_page, sort, descending)
+        has_next = len(users) > per_page
+        users = users[:per_page]
+        counts = NoteRepository.count_by_user_ids(user.id for user in users)
+        
+        return {
+            'users': [(user, counts.get(user.id, 0)) for user in users],
+            'page': page,
+            'per_page': per_page,
+            'sort': sort,
+            'descending': descending,
+            'has_next': has_next,
+        }
+    
+    @staticmethod
+    def get_users_version() -> Tuple[int, int]:
+        """Отримати версію списку користувачів: (кількість, ревізія)"""
+        return StatsService.get_users_version()
     
     @staticmethod
+    @retry_on_busy
     def update_user(user: User, **kwargs) -> Dict:
         """Оновити користувача"""
         
@@ -96,13 +230,23 @@ class UserService:
             password = kwargs['password']
             if len(password) < 6:
                 return {'success': False, 'error': 'Пароль має містити мінімум 6 символів'}
-            user.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+            user.password_hash = UserService.hash_password(password)
         
+        if 'email' in kwargs or 'role' in kwargs:
+            StatsService.user_updated()
         updated_user = UserRepository.update(user)
+        UserService.invalidate_user_cache(user.id)
         return {'success': True, 'user': updated_user}
     
     @staticmethod
+    @retry_on_busy
     def delete_user(user: User) -> None:
         """Видалити користувача"""
-        UserRepository.delete(user)
+        user_id = user.id
+        StatsService.user_deleted(user_id)
+        UserRepository.delete(user, commit=False)
+        UserRepository.commit()
+        UserService.invalidate_user_cache(user_id)
+        # Нотатки користувача видалено каскадом - скинути його списки та список усіх
+        NoteService.invalidate_cache(user_id)
 
@@ -0,0 +1,69 @@
+"""
+Маршрутизація запитів сесії між основною БД і read-реплікою
+
+Під час запитів, що лише читають (GET / HEAD, див. allow_replica), методи
+репозиторіїв find_* / count_* / exists_* (див. route_reads) виконуються на
+рушії REPLICA_BIND_KEY, якщо його налаштовано (Config.SQLALCHEMY_REPLICA_URI).
+Усе інше - запити, що змінюють дані, CLI, flush, lazy-завантаження поза цими
+методами - йде на основну БД. Після першого запису сесія закріплюється за
+основною БД до кінця запиту (сесія Flask-SQLAlchemy живе в межах контексту
+застосунку), тож запит бачить власні зміни, навіть якщо репліка ще відстає.
+"""
+import functools
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+REPLICA_BIND_KEY = 'replica'
+
+# Префікси методів репозиторіїв, що лише читають дані
+READ_METHOD_PREFIXES = ('find_', 'count_', 'exists_')
+
+
+class RoutingSession(Session):
+    """Сесія, що направляє читання з методів репозиторіїв на репліку"""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('replica_allowed') and self.info.get('read_only') \
+                and not self.info.get('pinned') and not self._flushing \
+                and REPLICA_BIND_KEY in self._db.engines:
+            return self._db.engines[REPLICA_BIND_KEY]
+        
+        # INSERT / UPDATE / DELETE (ORM flush або Core) та сирий SQL - це запис
+        if self._flushing or isinstance(clause, (UpdateBase, TextClause)):
+            self.info['pinned'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def allow_replica() -> None:
+    """Дозволити поточній сесії читати з репліки в методах route_reads"""
+    current_app.extensions['sqlalchemy'].session.info['replica_allowed'] = True
+
+
+def pin_primary() -> None:
+    """Надалі в поточній сесії виконувати всі запити на основній БД"""
+    current_app.extensions['sqlalchemy'].session.info['pinned'] = True
+
+
+def read_replica(fn):
+    """Виконувати запити всередині методу на репліці (якщо сесія ще нічого не записала)"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        info = current_app.extensions['sqlalchemy'].session.info
+        previous = info.get('read_only', False)
+        info['read_only'] = True
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            info['read_only'] = previous
+    return wrapper
+
+
+def route_reads(cls):
+    """Декоратор класу репозиторію: обгорнути read_replica методи з READ_METHOD_PREFIXES"""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith(READ_METHOD_PREFIXES) and isinstance(attr, staticmethod):
+            setattr(cls, name, staticmethod(read_replica(attr.__func__)))
+    return cls
+
@@ -0,0 +1,166 @@
+"""
+Журнал повільних SQL-запитів
+
+init_slow_query_log(app) слухає події рушіїв: запит, що виконувався довше
+за Config.SLOW_QUERY_THRESHOLD_MS, записується в app.logger разом із
+параметрами (рядки замінено на довжину), методом репозиторію, що його
+викликав, endpoint запиту та EXPLAIN QUERY PLAN, виконаним на тому ж
+з'єднанні. Записи агрегуються за нормалізованим текстом запиту
+(GET /api/slow-queries показує найгірші).
+"""
+import re
+import sys
+import threading
+import time
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+from typing import Dict, List, Optional
+
+# Запити, для яких EXPLAIN QUERY PLAN не має сенсу
+NO_EXPLAIN_PREFIXES = ('EXPLAIN', 'PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE',
+                       'CREATE', 'DROP', 'ALTER')
+
+_WHITESPACE = re.compile(r'\s+')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r'IN \((?:\?(?:, )?)+\)', re.IGNORECASE)
+
+
+def normalize_statement(statement: str) -> str:
+    """Текст запиту без літералів і з IN (?, ?, ...) -> IN (...) для групування"""
+    statement = _WHITESPACE.sub(' ', statement).strip()
+    statement = _LITERALS.sub('?', statement)
+    return _IN_LIST.sub('IN (...)', statement)
+
+
+def redact_parameters(parameters):
+    """Параметри для журналу: числа та None як є, рядки й байти - лише довжина"""
+    if isinstance(parameters, dict):
+        return {key: _redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(value) for value in parameters]
+    return parameters
+
+
+def _redact(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f'<{type(value).__name__} len={len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+def find_caller() -> Optional[str]:
+    """Найближчий метод репозиторію в стеку викликів ('NoteRepository.find_page')"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_globals.get('__name__', '').startswith('app.repositories.'):
+            code = frame.f_code
+            return getattr(code, 'co_qualname', code.co_name)
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """Агрегати повільних запитів за нормалізованим текстом (потокобезпечно)"""
+    
+    def __init__(self, max_statements: int = 500):
+        self.max_statements = max_statements
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, statement: str, elapsed_ms: float, caller: Optional[str],
+               endpoint: Optional[str], plan: List[str]) -> None:
+        """Додати повільне виконання запиту"""
+        key = normalize_statement(statement)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_statements:
+                    # Витіснити запит з найменшим сумарним часом
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k]['total_ms'])]
+                entry = self._entries[key] = {
+                    'statement': key, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'callers': set(), 'endpoints': set(), 'plan': plan,
+                }
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            if elapsed_ms >= entry['max_ms']:
+                entry['max_ms'] = elapsed_ms
+                entry['plan'] = plan
+            if caller:
+                entry['callers'].add(caller)
+            if endpoint:
+                entry['endpoints'].add(endpoint)
+    
+    def worst(self, limit: int = 20, sort: str = 'total_ms') -> List[Dict]:
+        """Найгірші запити за total_ms, max_ms або count"""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e[sort], reverse=True)[:limit]
+            return [{
+                'statement': entry['statement'],
+                'count': entry['count'],
+                'total_ms': round(entry['total_ms'], 3),
+                'max_ms': round(entry['max_ms'], 3),
+                'avg_ms': round(entry['total_ms'] / entry['count'], 3),
+                'callers': sorted(entry['callers']),
+                'endpoints': sorted(entry['endpoints']),
+                'plan': entry['plan'],
+            } for entry in entries]
+    
+    def clear(self) -> None:
+        """Очистити агрегати"""
+        with self._lock:
+            self._entries.clear()
+
+
+def get_slow_query_log() -> Optional[SlowQueryLog]:
+    """Журнал повільних запитів поточного застосунку (None - вимкнено)"""
+    return current_app.extensions.get('slow_queries')
+
+
+def init_slow_query_log(app) -> None:
+    """Зареєструвати журнал повільних запитів (потребує контексту застосунку)"""
+    threshold_ms = app.config['SLOW_QUERY_THRESHOLD_MS']
+    if not threshold_ms:
+        return
+    
+    from app import db
+    
+    log = SlowQueryLog(app.config['SLOW_QUERY_MAX_STATEMENTS'])
+    app.extensions['slow_queries'] = log
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info['slow_query_started'] = time.perf_counter()
+    
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info['slow_query_started']) * 1000
+        if elapsed_ms < threshold_ms:
+            return
+        
+        plan = []
+        if not executemany and not statement.lstrip().upper().startswith(NO_EXPLAIN_PREFIXES):
+            # Окремий DBAPI-курсор того ж з'єднання: та сама транзакція й схема,
+            # без повторного проходу через події рушія
+            explain = cursor.connection.cursor()
+            try:
+                explain.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+                plan = [row[-1] for row in explain.fetchall()]
+            except Exception as error:
+                plan = [f'EXPLAIN недоступний: {error}']
+            finally:
+                explain.close()
+        
+        caller = find_caller()
+        endpoint = request.endpoint if has_request_context() else None
+        log.record(statement, elapsed_ms, caller, endpoint, plan)
+        app.logger.warning(
+            'Повільний запит %.1f мс (%s, endpoint %s): %s; параметри: %s; план: %s',
+            elapsed_ms, caller or '-', endpoint or '-', _WHITESPACE.sub(' ', statement),
+            redact_parameters(parameters) if not executemany else f'<{len(parameters)} рядків>',
+            ' | '.join(plan) or '-'
+        )
+    
+    for engine in db.engines.values():
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
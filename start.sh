@@ -31,6 +31,10 @@ if [ ! -f "app.db" ]; then
     echo "🗄️ База даних не знайдена. Ініціалізація..."
     flask --app run init-db
     echo ""
+else
+    # Нові міграції схеми (create_app їх не застосовує)
+    flask --app run db upgrade
+    echo ""
 fi
 
 echo "✅ Все готово!"
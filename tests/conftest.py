@@ -0,0 +1,128 @@
+"""
+Спільні фікстури тестів
+
+Корінь репозиторію - це сам пакет app (поруч лежать config.py і застарілий
+app.py магазину), тож пакет завантажується під ім'ям app явно, незалежно від
+назви каталогу, в який його склоновано.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+if 'app' not in sys.modules or not hasattr(sys.modules['app'], 'create_app'):
+    _spec = importlib.util.spec_from_file_location(
+        'app', ROOT / '__init__.py', submodule_search_locations=[str(ROOT)])
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules['app'] = _module
+    _spec.loader.exec_module(_module)
+
+from config import Config  # noqa: E402
+from app import create_app, db  # noqa: E402
+
+
+def make_config(database: Path, replica: Path = None, **overrides):
+    """
+    Конфігурація тестового застосунку з БД у файлі database (і, за потреби, реплікою)
+    Пул процесів імпорту користувачів вимкнено, якщо overrides не кажуть інакше
+    """
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+        SQLALCHEMY_REPLICA_URI = f'sqlite:///{replica}' if replica else None
+        TESTING = True
+        WTF_CSRF_ENABLED = False
+        BCRYPT_LOG_ROUNDS = 4
+        SLOW_QUERY_THRESHOLD_MS = 0
+        COMPRESS_STATIC = False
+        USERS_IMPORT_PROCESSES = 0
+        AUTO_MIGRATE = True
+    for name, value in overrides.items():
+        setattr(TestConfig, name, value)
+    return TestConfig
+
+
+def seed(app, notes: int = 3):
+    """Створити admin/admin123, user/user123 і notes нотаток користувача user"""
+    from app.services.user_service import UserService
+    from app.services.note_service import NoteService
+    with app.app_context():
+        UserService.create_user('admin', 'admin@example.com', 'admin123', 'ADMIN')
+        user = UserService.create_user('user', 'user@example.com', 'user123', 'USER')['user']
+        for i in range(notes):
+            NoteService.create_note(f'note {i}', f'content {i}', user.id)
+
+
+def login(client, username: str, password: str) -> None:
+    """Увійти через форму /login"""
+    response = client.post('/login', data={'username': username, 'password': password})
+    assert response.status_code == 302, response.status_code
+
+
+def dispose(app) -> None:
+    """Зупинити пул імпорту й закрити з'єднання застосунку"""
+    for pool in app.extensions.get('user_import_pools', {}).values():
+        pool.shutdown()
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Застосунок з окремою БД для кожного тесту"""
+    app = create_app(make_config(tmp_path / 'app.db'))
+    yield app
+    dispose(app)
+
+
+@pytest.fixture
+def pooled_app(tmp_path):
+    """Застосунок з пулом процесів хешування для імпорту користувачів"""
+    app = create_app(make_config(tmp_path / 'app.db', USERS_IMPORT_PROCESSES=2))
+    yield app
+    dispose(app)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class ReplicaSync:
+    """Два файли SQLite: основна БД і репліка, що оновлюється лише явним sync()"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    def sync(self) -> None:
+        """Скопіювати основну БД у репліку (репліка 'наздоганяє' основну)"""
+        from app.database import sync_replica
+        with self.app.app_context():
+            assert sync_replica()
+            # Пул репліки міг тримати з'єднання зі знімком до копіювання
+            from app.session_routing import REPLICA_BIND_KEY
+            db.engines[REPLICA_BIND_KEY].dispose()
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    """Застосунок з основною БД і реплікою у двох файлах; репліка відстає до sync()"""
+    app = create_app(make_config(tmp_path / 'primary.db', tmp_path / 'replica.db'))
+    yield app
+    dispose(app)
+
+
+@pytest.fixture
+def replica(replica_app):
+    """Керування реплікою replica_app; початковий стан уже скопійовано"""
+    replica = ReplicaSync(replica_app)
+    replica.sync()
+    return replica
+
@@ -0,0 +1,82 @@
+"""Адмін-панель: перша сторінка таблиць і довантаження фрагментів за X-Next-Page"""
+import re
+
+import pytest
+
+from app import create_app
+from conftest import make_config, login, dispose, seed
+
+ROW_IDS = re.compile(r'<tr>\s*<td>(\d+)</td>')
+
+
+@pytest.fixture
+def admin_app(tmp_path):
+    app = create_app(make_config(tmp_path / 'app.db', ADMIN_PAGE_SIZE=2, ADMIN_NOTE_PREVIEW_LENGTH=10))
+    seed(app, notes=5)
+    from app.services.user_service import UserService
+    from app.services.note_service import NoteService
+    with app.app_context():
+        for i in range(3):
+            user = UserService.create_user(f'extra{i}', f'extra{i}@example.com', 'secret1')['user']
+            for _ in range(i):
+                NoteService.create_note('extra', 'x' * 50, user.id)
+    yield app
+    dispose(app)
+
+
+def walk_rows(client, url):
+    """Пройти всі сторінки фрагмента; повертає (id рядків по сторінках)"""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append([int(row_id) for row_id in ROW_IDS.findall(response.get_data(as_text=True))])
+        url = response.headers.get('X-Next-Page')
+    return pages
+
+
+def test_admin_panel_renders_only_first_pages(admin_app):
+    client = admin_app.test_client()
+    login(client, 'admin', 'admin123')
+    
+    html = client.get('/admin').get_data(as_text=True)
+    # Дві таблиці по ADMIN_PAGE_SIZE рядків
+    assert len(ROW_IDS.findall(html)) == 4
+
+
+def test_user_rows_pages_cover_all_users_once(admin_app):
+    client = admin_app.test_client()
+    login(client, 'admin', 'admin123')
+    
+    pages = walk_rows(client, '/admin/users/rows')
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == [1, 2, 3, 4, 5]
+
+
+def test_user_rows_sorted_by_note_count(admin_app):
+    client = admin_app.test_client()
+    login(client, 'admin', 'admin123')
+    
+    pages = walk_rows(client, '/admin/users/rows?sort=note_count&order=desc')
+    # user: 5 нотаток, extra2: 2, extra1: 1, далі без нотаток за id у зворотному порядку
+    assert sum(pages, []) == [2, 5, 4, 3, 1]
+
+
+def test_note_rows_pages_and_previews(admin_app):
+    client = admin_app.test_client()
+    login(client, 'admin', 'admin123')
+    
+    pages = walk_rows(client, '/admin/notes/rows?sort=id&order=asc')
+    assert sum(pages, []) == list(range(1, 9))
+    assert all(len(page) <= 2 for page in pages)
+    
+    html = client.get('/admin/notes/rows?sort=id&order=desc&per_page=1').get_data(as_text=True)
+    assert 'x' * 10 + '…' in html
+    assert 'x' * 11 not in html
+
+
+def test_rows_fragments_are_admin_only(admin_app):
+    client = admin_app.test_client()
+    login(client, 'user', 'user123')
+    assert client.get('/admin/users/rows').status_code == 403
+    assert client.get('/admin/notes/rows').status_code == 403
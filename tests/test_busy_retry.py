@@ -0,0 +1,94 @@
+"""retry_on_busy: запис, що впирається в чуже блокування SQLite, повторюється"""
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from config import Config
+from conftest import make_config, dispose, seed
+
+
+@pytest.fixture
+def busy_app(tmp_path):
+    # Коротке очікування блокування всередині SQLite, щоб до повторів доходило швидко
+    app = create_app(make_config(tmp_path / 'app.db', SQLITE_BUSY_RETRIES=3, SQLITE_BUSY_BACKOFF=0.05,
+                                 SQLITE_PRAGMAS={**Config.SQLITE_PRAGMAS, 'busy_timeout': 20}))
+    seed(app, notes=0)
+    yield app
+    dispose(app)
+
+
+def hold_write_lock(app, seconds: float) -> None:
+    """Тримати блокування запису з окремого з'єднання seconds секунд"""
+    with app.app_context():
+        from app import db
+        path = db.engine.url.database
+    locked = threading.Event()
+    
+    def hold():
+        conn = sqlite3.connect(path)
+        conn.execute('BEGIN IMMEDIATE')
+        locked.set()
+        threading.Event().wait(seconds)
+        conn.rollback()
+        conn.close()
+    
+    threading.Thread(target=hold, daemon=True).start()
+    locked.wait()
+
+
+def user_id(app) -> int:
+    from app.services.user_service import UserService
+    with app.app_context():
+        return UserService.get_user_by_username('user').id
+
+
+def test_write_succeeds_after_lock_is_released(busy_app, monkeypatch):
+    from app import database
+    from app.services.note_service import NoteService
+    owner = user_id(busy_app)
+    sleeps = []
+    sleep = database.time.sleep
+    monkeypatch.setattr(database.time, 'sleep', lambda delay: (sleeps.append(delay), sleep(delay)))
+    
+    hold_write_lock(busy_app, 0.15)
+    with busy_app.app_context():
+        result = NoteService.create_note('title', 'content', owner)
+        assert result['success']
+        assert len(NoteService.get_notes_by_user(owner)) == 1
+    assert sleeps
+
+
+def test_write_fails_once_retries_are_exhausted(busy_app, monkeypatch):
+    from app import database
+    from app.services.note_service import NoteService
+    owner = user_id(busy_app)
+    sleeps = []
+    monkeypatch.setattr(database.time, 'sleep', sleeps.append)
+    
+    hold_write_lock(busy_app, 2)
+    with busy_app.app_context():
+        with pytest.raises(OperationalError):
+            NoteService.create_note('title', 'content', owner)
+    
+    assert len(sleeps) == busy_app.config['SQLITE_BUSY_RETRIES']
+    # Експоненційна затримка з випадковим множником 0.5-1.5
+    for attempt, delay in enumerate(sleeps):
+        assert 0.05 * 2 ** attempt * 0.5 <= delay <= 0.05 * 2 ** attempt * 1.5
+
+
+def test_nested_write_is_not_retried(busy_app, monkeypatch):
+    from app import database
+    from app.services.note_service import NoteService
+    owner = user_id(busy_app)
+    sleeps = []
+    monkeypatch.setattr(database.time, 'sleep', sleeps.append)
+    
+    hold_write_lock(busy_app, 2)
+    with busy_app.app_context():
+        with pytest.raises(OperationalError):
+            # commit=False - частина чужої транзакції, повторює її власник
+            NoteService.create_note('title', 'content', owner, commit=False)
+    assert sleeps == []
@@ -0,0 +1,67 @@
+"""Кеш списків нотаток: заповнення не має пережити паралельну інвалідацію"""
+from app.services.cache import LRUCache
+from conftest import seed
+
+
+def test_set_skips_value_loaded_before_delete_or_clear():
+    cache = LRUCache()
+    
+    generation = cache.generation('key')
+    cache.delete('key')
+    cache.set('key', 'stale', generation)
+    assert cache.get('key') is None
+    
+    generation = cache.generation('key')
+    cache.clear()
+    cache.set('key', 'stale', generation)
+    assert cache.get('key') is None
+    
+    cache.set('key', 'fresh', cache.generation('key'))
+    assert cache.get('key') == 'fresh'
+
+
+def test_notes_list_invalidated_during_fill_is_not_cached(app):
+    seed(app, notes=2)
+    from app.services.note_service import NoteService
+    from app.repositories.note_repository import NoteRepository
+    
+    with app.app_context():
+        user_id = NoteRepository.find_all()[0].user_id
+        
+        def load():
+            notes = NoteRepository.find_views(user_id)
+            # Паралельний запис фіксується й скидає кеш, поки список завантажується
+            NoteService.create_note('late', 'content', user_id)
+            return notes
+        
+        assert len(NoteService._cached_list(('user', user_id), load)) == 2
+        assert len(NoteService.get_notes_by_user(user_id)) == 3
+
+
+def test_delete_log_is_bounded_by_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('app.services.cache.time.monotonic', lambda: now[0])
+    cache = LRUCache(ttl=10)
+    
+    for key in range(100):
+        cache.delete(key)
+    now[0] += 11
+    cache.delete('last')
+    assert list(cache._deleted) == ['last']
+    
+    # Заповнення, що почалося раніше за забуті скидання, не зберігається
+    generation = (0, 1000.0)
+    cache.set(5, 'stale', generation)
+    assert cache.get(5) is None
+
+
+def test_cached_notes_list_is_returned_without_per_note_work(app):
+    seed(app, notes=3)
+    from app.services.note_service import NoteService
+    from app.models.read_models import NoteView
+    
+    with app.app_context():
+        user_id = NoteService.get_all_notes()[0].user_id
+        first = NoteService.get_notes_by_user(user_id)
+        assert NoteService.get_notes_by_user(user_id) is first
+        assert all(isinstance(note, NoteView) for note in first)
@@ -0,0 +1,48 @@
+"""Серверні кошики магазину: копії для читання та видалення покинутих кошиків"""
+import sqlite3
+import time
+
+from app.cart_store import CartStore
+
+PIZZA = {'id': 1, 'name': 'Піца', 'price': 120, 'image': None}
+TEA = {'id': 2, 'name': 'Чай', 'price': 30, 'image': None}
+
+
+def test_get_returns_a_copy(tmp_path):
+    store = CartStore(str(tmp_path / 'shop.db'))
+    store.add('a', PIZZA)
+    cart = store.get('a')
+    
+    # Зміна кошика іншим запитом не зачіпає копію, яку ще перебирає шаблон
+    store.add('a', TEA)
+    store.add('a', PIZZA)
+    assert list(cart.items) == [1]
+    assert cart.items[1]['quantity'] == 1
+    assert cart.total == 120
+    assert store.get('a').total == 270
+
+
+def test_abandoned_carts_expire(tmp_path):
+    path = str(tmp_path / 'shop.db')
+    store = CartStore(path, ttl=60)
+    store.add('old', PIZZA)
+    store.add('fresh', TEA)
+    store._conn.execute("UPDATE carts SET updated_at = ? WHERE cart_id = 'old'", (int(time.time()) - 120,))
+    store._conn.commit()
+    
+    assert store.expire() == 1
+    assert store.get('old').items == {}
+    assert store.get('fresh').total == 30
+    
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT DISTINCT cart_id FROM cart_items').fetchall() == [('fresh',)]
+
+
+def test_cleanup_runs_on_write_after_interval(tmp_path):
+    store = CartStore(str(tmp_path / 'shop.db'), ttl=60, cleanup_interval=0)
+    store.add('old', PIZZA)
+    store._conn.execute('UPDATE carts SET updated_at = 0')
+    store._conn.commit()
+    
+    store.add('new', TEA)
+    assert store.get('old').items == {}
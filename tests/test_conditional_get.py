@@ -0,0 +1,67 @@
+"""
+Умовні GET: ETag нотатки та списків змінюється кожним записом, навіть
+кількома за одну секунду (updated_at має точність до секунди)
+"""
+from conftest import login, seed
+
+
+def test_note_etag_changes_on_update_within_a_second(app, client):
+    seed(app, notes=1)
+    login(client, 'user', 'user123')
+    note_id = client.get('/api/notes').json['notes'][0]['id']
+    
+    first = client.get(f'/api/notes/{note_id}')
+    etag = first.headers['ETag']
+    assert client.get(f'/api/notes/{note_id}', headers={'If-None-Match': etag}).status_code == 304
+    
+    assert client.put(f'/api/notes/{note_id}', json={'title': 'renamed'}).status_code == 200
+    
+    fresh = client.get(f'/api/notes/{note_id}', headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.json['note']['title'] == 'renamed'
+    assert fresh.headers['ETag'] != etag
+
+
+def test_admin_list_etag_changes_on_update_within_a_second(app, client):
+    seed(app, notes=2)
+    login(client, 'admin', 'admin123')
+    first = client.get('/api/notes')
+    etag = first.headers['ETag']
+    note_id = first.json['notes'][0]['id']
+    
+    assert client.put(f'/api/notes/{note_id}', json={'content': 'edited'}).status_code == 200
+    
+    fresh = client.get('/api/notes', headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.headers['ETag'] != etag
+
+
+def test_users_etag_changes_on_update_within_a_second(app, client):
+    seed(app, notes=0)
+    login(client, 'admin', 'admin123')
+    first = client.get('/api/users')
+    etag = first.headers['ETag']
+    
+    from app.services.user_service import UserService
+    with app.app_context():
+        user = UserService.get_user_by_username('user')
+        assert UserService.update_user(user, role='ADMIN')['success']
+    
+    fresh = client.get('/api/users', headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.headers['ETag'] != etag
+
+
+def test_own_list_etag_changes_on_update_within_a_second(app, client):
+    seed(app, notes=1)
+    login(client, 'user', 'user123')
+    first = client.get('/api/notes')
+    etag = first.headers['ETag']
+    note_id = first.json['notes'][0]['id']
+    
+    assert client.put(f'/api/notes/{note_id}', json={'title': 'renamed'}).status_code == 200
+    
+    fresh = client.get('/api/notes', headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.json['notes'][0]['title'] == 'renamed'
+
@@ -0,0 +1,72 @@
+"""
+GET /api/metrics: лічильники й гістограми запитів, SQL на запит і кеші
+у текстовому форматі Prometheus
+"""
+import pytest
+
+from app import create_app
+from conftest import make_config, login, seed, dispose
+
+
+def parse_metrics(text: str) -> dict:
+    """Рядки зразків Prometheus -> {'назва{мітки}': значення} (без HELP/TYPE)"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_count_requests_sql_and_cache(app, client):
+    seed(app, notes=3)
+    login(client, 'admin', 'admin123')
+    for _ in range(2):
+        assert client.get('/api/notes').status_code == 200
+        assert client.get('/notes').status_code == 200
+    
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert '# TYPE app_request_duration_seconds histogram' in response.text
+    assert '# TYPE app_cache_entries gauge' in response.text
+    samples = parse_metrics(response.text)
+    
+    labels = 'endpoint="api.get_notes",method="GET"'
+    assert samples[f'app_requests_total{{{labels},status="200"}}'] == 2
+    assert samples[f'app_request_duration_seconds_count{{{labels}}}'] == 2
+    assert samples[f'app_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 2
+    assert samples[f'app_request_duration_seconds_sum{{{labels}}}'] > 0
+    
+    # Кошики кумулятивні, SQL-запити рахуються для endpoint
+    buckets = [value for name, value in samples.items()
+               if name.startswith('app_request_sql_statements_bucket{endpoint="api.get_notes"')]
+    assert buckets == sorted(buckets) and buckets[-1] == 2
+    assert samples['app_sql_statements_total{endpoint="api.get_notes"}'] >= 2
+    
+    # Друга сторінка /notes бере список нотаток з кешу
+    assert samples['app_cache_hits_total{cache="notes"}'] >= 1
+    assert samples['app_cache_entries{cache="notes"}'] >= 1
+    assert 0 < samples['app_cache_hit_ratio{cache="notes"}'] <= 1
+    
+    # Запит самих метрик потрапляє в лічильники після відповіді
+    samples = parse_metrics(client.get('/api/metrics').text)
+    assert samples['app_requests_total{endpoint="api.get_metrics",method="GET",status="200"}'] == 1
+
+
+def test_metrics_are_admin_only(app, client):
+    seed(app, notes=0)
+    assert client.get('/api/metrics').status_code in (302, 401)
+    login(client, 'user', 'user123')
+    assert client.get('/api/metrics').status_code == 403
+
+
+def test_metrics_disabled(tmp_path):
+    app = create_app(make_config(tmp_path / 'app.db', METRICS_ENABLED=False))
+    try:
+        seed(app, notes=0)
+        client = app.test_client()
+        login(client, 'admin', 'admin123')
+        assert client.get('/api/metrics').status_code == 404
+    finally:
+        dispose(app)
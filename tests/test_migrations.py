@@ -0,0 +1,52 @@
+"""Міграції схеми застосовуються явно (flask db upgrade), а не кожним create_app"""
+from app import create_app
+from app.migrations import current_version, downgrade
+from app.migrations.versions import MIGRATIONS
+from conftest import make_config, dispose, seed
+
+LATEST = MIGRATIONS[-1][0]
+
+
+def test_create_app_does_not_undo_downgrade(tmp_path):
+    database = tmp_path / 'app.db'
+    app = create_app(make_config(database))
+    with app.app_context():
+        assert current_version() == LATEST
+        downgrade(LATEST - 1)
+    dispose(app)
+    
+    app = create_app(make_config(database, AUTO_MIGRATE=False))
+    with app.app_context():
+        assert current_version() == LATEST - 1
+    dispose(app)
+
+
+def test_db_upgrade_command_creates_schema(tmp_path):
+    app = create_app(make_config(tmp_path / 'app.db', AUTO_MIGRATE=False))
+    with app.app_context():
+        assert current_version() == 0
+    
+    result = app.test_cli_runner().invoke(args=['db', 'upgrade'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert current_version() == LATEST
+    seed(app, notes=1)
+    dispose(app)
+
+
+def test_unused_list_version_indexes_are_dropped(tmp_path):
+    from sqlalchemy import text
+    from app import db
+    
+    def indexes():
+        rows = db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))
+        return {row[0] for row in rows}
+    
+    unused = {'ix_notes_user_id_updated_at', 'ix_users_updated_at'}
+    app = create_app(make_config(tmp_path / 'app.db'))
+    with app.app_context():
+        assert not unused & indexes()
+        assert 'ix_notes_updated_at' in indexes()
+        downgrade(6)
+        assert unused <= indexes()
+    dispose(app)
@@ -0,0 +1,42 @@
+"""POST /api/notes/batch"""
+from conftest import login, seed
+
+
+def test_atomic_batch_reports_rolled_back_operations(app, client):
+    seed(app, notes=1)
+    login(client, 'user', 'user123')
+    note_id = client.get('/api/notes').json['notes'][0]['id']
+    
+    response = client.post('/api/notes/batch', json={'atomic': True, 'operations': [
+        {'op': 'create', 'title': 'new', 'content': 'content'},
+        {'op': 'update', 'id': note_id, 'title': 'renamed'},
+        {'op': 'delete', 'id': 999999},
+    ]})
+    
+    assert response.status_code == 400
+    body = response.json
+    assert body['committed'] is False
+    assert body['failed'] == 1
+    assert [item['status'] for item in body['results']] == [409, 409, 404]
+    assert not any(item['success'] for item in body['results'])
+    assert not any('note' in item for item in body['results'])
+    
+    notes = client.get('/api/notes').json['notes']
+    assert [note['title'] for note in notes] == ['note 0']
+
+
+def test_non_atomic_batch_commits_successful_operations(app, client):
+    seed(app, notes=0)
+    login(client, 'user', 'user123')
+    
+    response = client.post('/api/notes/batch', json={'operations': [
+        {'op': 'create', 'title': 'new', 'content': 'content'},
+        {'op': 'delete', 'id': 999999},
+    ]})
+    
+    assert response.status_code == 200
+    results = response.json['results']
+    assert results[0]['status'] == 201
+    assert results[0]['note']['title'] == 'new'
+    assert results[1]['status'] == 404
+    assert client.get('/api/notes').json['count'] == 1
@@ -0,0 +1,62 @@
+"""Outbox замовлень магазину: фоновий потік переживає помилки запису"""
+import sqlite3
+import time
+
+from app.cart_store import Cart
+from app.orders import OrderQueue
+
+
+def make_cart() -> Cart:
+    cart = Cart()
+    cart.items[1] = {'id': 1, 'name': 'Піца', 'price': 120, 'quantity': 2, 'image': None}
+    cart.total, cart.count = 240, 2
+    return cart
+
+
+def wait_until_drained(queue: OrderQueue, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while queue.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert queue.pending == 0
+
+
+def test_poison_rows_are_set_aside(tmp_path):
+    path = str(tmp_path / 'shop.db')
+    queue = OrderQueue(path, flush_interval=0)
+    queue.enqueue('a@example.com', 'addr', make_cart())
+    for payload in ('not json', '{"lines": 5}', '{"email": null}'):
+        queue._conn.execute('INSERT INTO order_outbox (payload) VALUES (?)', (payload,))
+        queue._pending += 1
+    queue._conn.commit()
+    queue.enqueue('b@example.com', 'addr', make_cart())
+    
+    queue.start()
+    wait_until_drained(queue)
+    queue.stop()
+    
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT email FROM orders ORDER BY id').fetchall() == \
+        [('a@example.com',), ('b@example.com',)]
+    assert conn.execute('SELECT count(*) FROM order_outbox_failed').fetchone()[0] == 3
+    assert conn.execute('SELECT count(*) FROM order_outbox').fetchone()[0] == 0
+
+
+def test_worker_retries_after_database_error(tmp_path, monkeypatch):
+    queue = OrderQueue(str(tmp_path / 'shop.db'), flush_interval=0, retry_delay=0.01)
+    write = queue._write
+    failures = []
+    
+    def flaky_write(conn, rows, error=None):
+        if len(failures) < 2:
+            failures.append(rows)
+            raise sqlite3.OperationalError('database is locked')
+        return write(conn, rows, error)
+    
+    monkeypatch.setattr(queue, '_write', flaky_write)
+    queue.enqueue('a@example.com', 'addr', make_cart())
+    queue.start()
+    wait_until_drained(queue)
+    queue.stop()
+    
+    assert len(failures) == 2
+    assert queue._worker is None
@@ -0,0 +1,85 @@
+"""
+Кількість SQL-запитів на сторінку не залежить від кількості нотаток
+(без N+1 на авторів, підрахунків тощо)
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from conftest import make_config, login, dispose
+
+PAGES = ('/api/notes', '/notes', '/admin')
+
+
+@contextmanager
+def count_queries(app):
+    """Рахувати запити, виконані всіма рушіями застосунку"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def populated_app(path, authors: int, notes_per_author: int):
+    """Застосунок з admin/admin123 і authors авторів по notes_per_author нотаток"""
+    # Кеш списків вимкнено: рахуються запити до БД, а не влучання в кеш
+    app = create_app(make_config(path, NOTES_CACHE_ENABLED=False))
+    from app.services.user_service import UserService
+    from app.services.note_service import NoteService
+    with app.app_context():
+        UserService.create_user('admin', 'admin@example.com', 'admin123', 'ADMIN')
+        for author in range(authors):
+            user = UserService.create_user(f'author{author}', f'author{author}@example.com',
+                                           'secret1')['user']
+            for i in range(notes_per_author):
+                NoteService.create_note(f'note {i}', f'content {i}', user.id)
+    return app
+
+
+def page_query_counts(app):
+    """Кількість запитів на кожну сторінку PAGES для адміністратора"""
+    client = app.test_client()
+    login(client, 'admin', 'admin123')
+    counts = {}
+    for page in PAGES:
+        # Перший запит прогріває кеш знімка користувача
+        assert client.get(page).status_code == 200
+        with count_queries(app) as statements:
+            assert client.get(page).status_code == 200
+        counts[page] = len(statements)
+    return counts
+
+
+@pytest.fixture
+def small_app(tmp_path):
+    app = populated_app(tmp_path / 'small.db', authors=2, notes_per_author=2)
+    yield app
+    dispose(app)
+
+
+@pytest.fixture
+def large_app(tmp_path):
+    app = populated_app(tmp_path / 'large.db', authors=12, notes_per_author=10)
+    yield app
+    dispose(app)
+
+
+def test_page_query_count_does_not_grow_with_notes(small_app, large_app):
+    small = page_query_counts(small_app)
+    large = page_query_counts(large_app)
+    
+    assert small == large
+    assert all(count <= 5 for count in large.values()), large
+
@@ -0,0 +1,33 @@
+"""
+Плани запитів репозиторіїв: жоден запит не переходить на повний прохід таблиці
+(крім проб, де він закладений самим запитом - див. PROBES)
+"""
+from app.migrations.query_plans import PROBES, collect_query_plans, find_full_scans
+from app.repositories.note_repository import NoteRepository
+from app.repositories.stats_repository import StatsRepository
+from app.repositories.user_repository import UserRepository
+from conftest import seed
+
+# Методи, що читають дані, мають проби
+READ_PREFIXES = ('find_', 'count_', 'exists_', 'get_', 'load_', 'iter_', 'search')
+
+
+def test_every_repository_read_has_a_probe():
+    probed = {name.split('(')[0] for name, _, _ in PROBES}
+    missing = []
+    for repository in (NoteRepository, UserRepository, StatsRepository):
+        for name, attr in vars(repository).items():
+            qualified = f'{repository.__name__}.{name}'
+            if isinstance(attr, staticmethod) and name.startswith(READ_PREFIXES) and qualified not in probed:
+                missing.append(qualified)
+    assert missing == []
+
+
+def test_repository_queries_do_not_scan_tables(app):
+    seed(app, notes=3)
+    with app.app_context():
+        plans = collect_query_plans()
+    
+    assert set(plans) == {name for name, _, _ in PROBES}
+    assert all(plans.values()), [name for name, statements in plans.items() if not statements]
+    assert find_full_scans(plans) == []
@@ -0,0 +1,64 @@
+"""
+Моделі читання (NoteView, UserView) серіалізуються так само, як to_dict()
+ORM-моделей: ті самі ключі та значення, включно з форматом часу
+"""
+from datetime import datetime
+
+import pytest
+
+from app import db
+from conftest import login, seed
+
+
+@pytest.fixture
+def timestamps(app):
+    """Нотатки й користувач з мікросекундами в часі та без них"""
+    seed(app, notes=3)
+    from app.models import Note, User
+    with app.app_context():
+        notes = Note.query.order_by(Note.id).all()
+        notes[0].created_at = datetime(2024, 1, 2, 3, 4, 5, 123456)
+        notes[0].updated_at = datetime(2024, 1, 2, 3, 4, 6, 500)
+        notes[1].created_at = datetime(2024, 1, 2, 3, 4, 5)
+        User.query.filter_by(username='user').one().created_at = datetime(2023, 5, 6, 7, 8, 9, 10)
+        db.session.commit()
+
+
+def orm_dicts(app, model):
+    """to_dict() усіх рядків моделі з нової сесії: {id: словник}"""
+    with app.app_context():
+        return {row.id: row.to_dict() for row in model.query.all()}
+
+
+def test_note_views_match_orm(app, client, timestamps):
+    from app.models import Note
+    from app.repositories.note_repository import NoteRepository
+    expected = orm_dicts(app, Note)
+    assert {'2024-01-02T03:04:05.123456', '2024-01-02T03:04:05'} <= \
+        {note['created_at'] for note in expected.values()}
+    
+    with app.app_context():
+        views = NoteRepository.find_views()
+        page = NoteRepository.find_page(10)
+    assert {view.id: view.to_dict() for view in views} == expected
+    assert {view.id: view.to_dict() for view in page} == expected
+    assert list(views[0].to_dict()) == list(expected[views[0].id])
+    
+    login(client, 'admin', 'admin123')
+    notes = client.get('/api/notes').json['notes']
+    assert {note['id']: note for note in notes} == expected
+
+
+def test_user_views_match_orm(app, client, timestamps):
+    from app.models import User
+    from app.repositories.user_repository import UserRepository
+    expected = orm_dicts(app, User)
+    
+    with app.app_context():
+        views = UserRepository.find_all_views()
+    assert {view.id: view.to_dict() for view in views} == expected
+    assert list(views[0].to_dict()) == list(expected[views[0].id])
+    
+    login(client, 'admin', 'admin123')
+    users = client.get('/api/users').json['users']
+    assert {user['id']: user for user in users} == expected
@@ -0,0 +1,91 @@
+"""
+ETag списків і read-репліка: версія списку та сама сторінка мають читатися
+з однієї БД, інакше відстала репліка віддає стару сторінку під новим ETag
+"""
+from conftest import login, seed
+
+
+def test_notes_etag_follows_replica_snapshot(replica_app, replica):
+    seed(replica_app, notes=3)
+    replica.sync()
+    client = replica_app.test_client()
+    login(client, 'user', 'user123')
+    
+    first = client.get('/api/notes')
+    assert first.status_code == 200
+    assert first.json['count'] == 3
+    etag = first.headers['ETag']
+    
+    # Запис іде на основну БД, репліка ще відстає
+    created = client.post('/api/notes', json={'title': 'new', 'content': 'fresh'})
+    assert created.status_code == 201
+    
+    stale = client.get('/api/notes')
+    assert stale.json['count'] == 3
+    assert stale.headers['ETag'] == etag
+    assert client.get('/api/notes', headers={'If-None-Match': etag}).status_code == 304
+    
+    replica.sync()
+    fresh = client.get('/api/notes', headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.json['count'] == 4
+    assert fresh.headers['ETag'] != etag
+
+
+def test_users_etag_follows_replica_snapshot(replica_app, replica):
+    seed(replica_app, notes=0)
+    replica.sync()
+    client = replica_app.test_client()
+    login(client, 'admin', 'admin123')
+    
+    first = client.get('/api/users')
+    assert first.json['count'] == 2
+    etag = first.headers['ETag']
+    
+    created = client.post('/api/users', json={'username': 'third', 'email': 'third@example.com',
+                                              'password': 'third123'})
+    assert created.status_code == 201
+    
+    stale = client.get('/api/users')
+    assert stale.json['count'] == 2
+    assert stale.headers['ETag'] == etag
+    
+    replica.sync()
+    fresh = client.get('/api/users', headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.json['count'] == 3
+    assert fresh.headers['ETag'] != etag
+
+
+
+def test_role_change_applies_while_replica_lags(replica_app, replica):
+    seed(replica_app, notes=0)
+    replica.sync()
+    client = replica_app.test_client()
+    login(client, 'admin', 'admin123')
+    assert client.get('/api/users').status_code == 200
+    
+    from app.services.user_service import UserService
+    with replica_app.app_context():
+        admin = UserService.get_user_by_username('admin')
+        assert UserService.update_user(admin, role='USER')['success']
+    
+    # Репліка ще бачить ADMIN, але автентифікація читає основну БД
+    assert client.get('/api/users').status_code == 403
+    replica.sync()
+    assert client.get('/api/users').status_code == 403
+
+
+def test_new_user_stays_logged_in_while_replica_lags(replica_app, replica):
+    seed(replica_app, notes=0)
+    replica.sync()
+    
+    from app.services.user_service import UserService
+    with replica_app.app_context():
+        assert UserService.create_user('fresh', 'fresh@example.com', 'fresh123')['success']
+    
+    client = replica_app.test_client()
+    login(client, 'fresh', 'fresh123')
+    me = client.get('/api/me')
+    assert me.status_code == 200
+    assert me.json['user']['username'] == 'fresh'
@@ -0,0 +1,77 @@
+"""
+Журнал повільних запитів: з ненульовим порогом запити агрегуються за
+нормалізованим текстом разом із методом репозиторію, endpoint і планом
+"""
+import logging
+
+import pytest
+
+from app import create_app
+from conftest import make_config, login, seed, dispose
+
+
+@pytest.fixture
+def slow_app(tmp_path):
+    """Поріг менший за будь-який запит: кожен SQL-запит вважається повільним"""
+    app = create_app(make_config(tmp_path / 'app.db', SLOW_QUERY_THRESHOLD_MS=1e-6))
+    yield app
+    dispose(app)
+
+
+def find_entry(queries, caller):
+    """Агрегат запиту, виконаного методом репозиторію caller"""
+    matches = [entry for entry in queries if caller in entry['callers']]
+    assert len(matches) == 1, [entry['callers'] for entry in queries]
+    return matches[0]
+
+
+def test_slow_queries_are_aggregated_with_caller_and_plan(slow_app, caplog):
+    seed(slow_app, notes=3)
+    client = slow_app.test_client()
+    with caplog.at_level(logging.WARNING, logger=slow_app.logger.name):
+        login(client, 'admin', 'admin123')
+        for _ in range(2):
+            assert client.get('/api/notes').status_code == 200
+    
+    response = client.get('/api/slow-queries?limit=500')
+    assert response.status_code == 200
+    assert response.json['threshold_ms'] == 1e-6
+    queries = response.json['queries']
+    
+    page = find_entry(queries, 'NoteRepository.find_page')
+    assert page['count'] >= 2
+    assert page['endpoints'] == ['api.get_notes']
+    assert page['statement'].startswith('SELECT')
+    assert page['plan'] and not any(line.startswith('EXPLAIN') for line in page['plan'])
+    assert page['max_ms'] <= page['total_ms']
+    assert page['avg_ms'] == pytest.approx(page['total_ms'] / page['count'], abs=1e-3)
+    
+    # Сортування за кількістю виконань
+    counts = [entry['count'] for entry in
+              client.get('/api/slow-queries?sort=count&limit=500').json['queries']]
+    assert counts == sorted(counts, reverse=True)
+    assert len(client.get('/api/slow-queries?limit=1').json['queries']) == 1
+    
+    # Рядкові параметри в журналі замінено на довжину
+    messages = [record.getMessage() for record in caplog.records
+                if record.getMessage().startswith('Повільний запит')]
+    assert any('NoteRepository.find_page' in message for message in messages)
+    assert any('<str len=5>' in message for message in messages)
+    assert not any('admin123' in message or "'admin'" in message for message in messages)
+
+
+def test_slow_queries_validation_and_access(slow_app):
+    seed(slow_app, notes=0)
+    client = slow_app.test_client()
+    login(client, 'user', 'user123')
+    assert client.get('/api/slow-queries').status_code == 403
+    
+    client = slow_app.test_client()
+    login(client, 'admin', 'admin123')
+    assert client.get('/api/slow-queries?sort=plan').status_code == 400
+
+
+def test_slow_queries_disabled_without_threshold(app, client):
+    seed(app, notes=0)
+    login(client, 'admin', 'admin123')
+    assert client.get('/api/slow-queries').status_code == 404
@@ -0,0 +1,72 @@
+"""Інкрементальні лічильники статистики збігаються з перерахунком з нуля (reconcile-stats)"""
+import io
+
+from conftest import login, seed
+
+
+def stats_snapshot(client, daily: bool = False):
+    """
+    Загальні лічильники /api/stats і лічильники користувачів /api/stats/users
+    Створені за день - лише з daily: після видалень reconcile рахує тільки
+    нотатки, що існують
+    """
+    stats = client.get('/api/stats?days=7').json['stats']
+    keys = ['total_users', 'total_notes', 'total_content_size']
+    if daily:
+        keys += ['notes_created_today', 'notes_created_per_day']
+    return {key: stats[key] for key in keys}, client.get('/api/stats/users?limit=100').json['users']
+
+
+def test_counters_match_reconcile_after_writes(app, client):
+    seed(app, notes=3)
+    login(client, 'admin', 'admin123')
+    
+    created = client.post('/api/notes', json={'title': 'admin note', 'content': 'abc'}).json['note']
+    assert client.put(f"/api/notes/{created['id']}", json={'content': 'longer content'}).status_code == 200
+    other = client.get('/api/notes').json['notes'][-1]
+    assert client.delete(f"/api/notes/{other['id']}").status_code == 200
+    client.post('/api/notes/batch', json={'operations': [
+        {'op': 'create', 'title': 'batch', 'content': 'batch content'},
+        {'op': 'delete', 'id': 999999},
+    ]})
+    user_id = other['user_id']
+    imported = client.post('/api/notes/import', data={'file': (io.BytesIO(
+        b'{"title": "imported", "content": "x", "user_id": %d}\n' % user_id * 4), 'notes.ndjson')},
+        content_type='multipart/form-data')
+    assert imported.json['imported'] == 4
+    third = client.post('/api/users', json={'username': 'third', 'email': 'third@example.com',
+                                            'password': 'third123'}).json['user']
+    
+    from app.services.note_service import NoteService
+    from app.services.user_service import UserService
+    from app.services.stats_service import StatsService
+    with app.app_context():
+        NoteService.create_note('third note', 'content', third['id'])
+        UserService.delete_user(UserService.get_user_by_id(third['id']))
+    
+    incremental = stats_snapshot(client)
+    assert incremental[0]['total_users'] == 2
+    assert incremental[0]['total_notes'] == 3 + 1 - 1 + 1 + 4
+    
+    with app.app_context():
+        StatsService.reconcile()
+    assert stats_snapshot(client) == incremental
+
+
+def test_reconcile_repairs_drift(app, client):
+    seed(app, notes=2)
+    login(client, 'admin', 'admin123')
+    expected = stats_snapshot(client, daily=True)
+    
+    from app import db
+    with app.app_context():
+        db.session.execute(db.text("UPDATE stat_counters SET value = value + 5 WHERE name = 'notes'"))
+        db.session.execute(db.text('UPDATE user_note_stats SET note_count = 0'))
+        db.session.execute(db.text('DELETE FROM note_daily_stats'))
+        db.session.commit()
+    assert stats_snapshot(client, daily=True) != expected
+    
+    from app.services.stats_service import StatsService
+    with app.app_context():
+        StatsService.reconcile()
+    assert stats_snapshot(client, daily=True) == expected